@@ -0,0 +1,306 @@
+"""
+Access Modes enforced in the search server (Admin / Actual / Alias)
+
+data/access_mode.json selects the mode and data/platform_names.json maps actual
+platform names to aliases (see ARCHITECTURE.md). The server applies them itself,
+so no raw name reaches the LLM layer and no extra round trip is needed to rewrite
+answers:
+- input: the platform argument is validated for the mode and resolved to the
+  actual name before any filter is built; other text arguments naming a platform
+  the mode hides are refused the same way ("This facility is not available.")
+- output: every answer is rewritten in one pass by an Aho-Corasick matcher compiled
+  for the mode (alias mode: actual -> alias, case-insensitive; actual mode:
+  alias -> actual; admin mode: unchanged)
+
+Names only match as whole words, but "_", "-", digits and a case change into a
+capital all count as word boundaries, and separator runs match any separator run
+(or none), so file names such as "Atlantis_OandM_Rev3.pdf", "AtlantisPQ" or
+"Mad_Dog" are caught as well. The policy is rebuilt only when either file
+changes (checked by mtime/size on each call). LANCEDB_ACCESS_MODE overrides the
+mode file; CLI clients send their effective override with each daemon request, so a
+shared daemon answers every client in that client's mode.
+"""
+
+import json
+import os
+import re
+import threading
+from collections import deque
+from pathlib import Path
+
+from ingest import ALIASES_PATH, load_platform_aliases
+
+MODE_PATH = Path(os.environ.get("LANCEDB_ACCESS_MODE_FILE", str(Path(__file__).parent / "data" / "access_mode.json")))
+ACCESS_MODES = ["admin", "actual", "alias"]
+DEFAULT_MODE = "admin"
+
+NOT_AVAILABLE = "This facility is not available."
+
+# Arguments holding a platform name, and free-text arguments that may mention one
+PLATFORM_KEYS = ("platform",)
+TEXT_KEYS = ("query", "queries", "channel", "channel_name", "source", "target", "source_channel",
+             "target_channel", "document", "sensor", "sensors", "device")
+
+# Pagination cursors in text ("cursor=...") and JSON ("next_cursor": "...") answers:
+# opaque base64, so never rewritten
+_CURSORS = re.compile(r'(?:cursor=|"next_cursor": ")[A-Za-z0-9_-]+')
+
+
+class PlatformUnavailable(ValueError):
+    """A platform (or platform mention) the current access mode does not allow"""
+
+    def __init__(self):
+        super().__init__(NOT_AVAILABLE)
+
+
+def _fold(text: str) -> str:
+    """Lowercase without changing the length (so match offsets stay valid)"""
+    return "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+def _squeeze(text: str):
+    """
+    text with every run of separators (whitespace, "_" and "-") as one space, and the
+    index in text of each character kept, so "Mad  Dog" and "Mad_Dog" match "Mad Dog"
+    """
+    chars, index = [], []
+    separator = False
+    for i, c in enumerate(text):
+        if c.isspace() or c in "_-":
+            if separator:
+                continue
+            separator, c = True, " "
+        else:
+            separator = False
+        chars.append(c)
+        index.append(i)
+    return "".join(chars), index
+
+
+def _bounded(text: str, start: int, end: int) -> bool:
+    """
+    text[start:end] is a word of its own: digits, separators and punctuation are
+    boundaries, and so is a case change into a capital ("AtlantisPQ", "PQAtlantis")
+    """
+    if start > 0 and text[start - 1].isalpha() and not text[start].isupper():
+        return False
+    if end < len(text) and text[end].isalpha() and not text[end].isupper():
+        return False
+    return True
+
+
+class NameMatcher:
+    """Aho-Corasick automaton over whole-word names: one pass finds and replaces them all"""
+
+    def __init__(self, replacements: dict, ignore_case: bool = False):
+        self.ignore_case = ignore_case
+        self.goto = [{}]   # node -> {char: node}
+        self.fail = [0]
+        self.output = [0]  # node -> length of the name ending exactly here (0 = none)
+        self.dict_link = [0]  # node -> nearest node on its fail chain where a name ends
+        self.replacement = {}
+        for name, replacement in replacements.items():
+            if name and name != replacement:
+                key = self._key(name.strip())
+                # "Mad Dog" is also written "MadDog" (file names, tags)
+                for variant in (key, key.replace(" ", "")):
+                    if variant not in self.replacement:
+                        self._add(variant)
+                        self.replacement[variant] = replacement
+        self._link()
+
+    def _key(self, text: str) -> str:
+        squeezed = _squeeze(text)[0]
+        return _fold(squeezed) if self.ignore_case else squeezed
+
+    def _add(self, name: str):
+        node = 0
+        for c in name:
+            if c not in self.goto[node]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(0)
+                self.dict_link.append(0)
+                self.goto[node][c] = len(self.goto) - 1
+            node = self.goto[node][c]
+        self.output[node] = len(name)
+
+    def _link(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for c, child in self.goto[node].items():
+                queue.append(child)
+                fail = self.fail[node]
+                while fail and c not in self.goto[fail]:
+                    fail = self.fail[fail]
+                self.fail[child] = self.goto[fail].get(c, 0) if node else 0
+                target = self.fail[child]
+                self.dict_link[child] = target if self.output[target] else self.dict_link[target]
+
+    def _ends(self, node: int):
+        """Lengths of every name ending at node, longest first"""
+        if self.output[node]:
+            yield self.output[node]
+        node = self.dict_link[node]
+        while node:
+            yield self.output[node]
+            node = self.dict_link[node]
+
+    def _matches(self, text: str) -> list:
+        """Non-overlapping whole-word matches as (start, end, name key), leftmost-longest"""
+        if len(self.goto) == 1 or not text:
+            return []
+        squeezed, index = _squeeze(text)
+        haystack = _fold(squeezed) if self.ignore_case else squeezed
+        candidates = []
+        node = 0
+        for end, c in enumerate(haystack, 1):
+            while node and c not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(c, 0)
+            for length in self._ends(node):
+                if _bounded(squeezed, end - length, end):
+                    candidates.append((end - length, end))
+
+        matches, last_end = [], 0
+        for start, end in sorted(candidates, key=lambda m: (m[0], -m[1])):
+            if start >= last_end:
+                matches.append((index[start], index[end - 1] + 1, haystack[start:end]))
+                last_end = end
+        return matches
+
+    def find(self, text: str) -> list:
+        """Non-overlapping whole-word matches as (start, end), leftmost-longest"""
+        return [(start, end) for start, end, _ in self._matches(text)]
+
+    def replace(self, text: str) -> str:
+        matches = self._matches(text)
+        if not matches:
+            return text
+        parts, position = [], 0
+        for start, end, key in matches:
+            parts.append(text[position:start])
+            parts.append(self.replacement[key])
+            position = end
+        parts.append(text[position:])
+        return "".join(parts)
+
+
+class AccessPolicy:
+    """Mode, name mapping and the compiled matchers for one version of the data files"""
+
+    def __init__(self, mode: str, aliases: dict):
+        self.mode = mode if mode in ACCESS_MODES else DEFAULT_MODE
+        self.aliases = {actual: alias for actual, alias in aliases.items() if alias}
+        self.actuals = {alias: actual for actual, alias in self.aliases.items()}
+        self._actual_folded = {_fold(_squeeze(a.strip())[0]): a for a in self.aliases}
+        self._alias_folded = {_fold(_squeeze(a.strip())[0]): a for a in self.actuals}
+
+        if self.mode == "alias":
+            self.masker = NameMatcher(self.aliases, ignore_case=True)
+            self.hidden = self.masker
+        elif self.mode == "actual":
+            self.masker = NameMatcher(self.actuals)
+            self.hidden = self.masker
+        else:
+            self.masker = self.hidden = None
+
+    def resolve(self, platform: str) -> str:
+        """Actual platform name to filter on, or PlatformUnavailable"""
+        if not platform:
+            return platform
+        folded = _fold(_squeeze(platform.strip())[0])
+        actual = self._actual_folded.get(folded)
+        from_alias = self.actuals.get(self._alias_folded.get(folded, ""))
+        if self.mode == "alias":
+            if from_alias is None:
+                raise PlatformUnavailable()
+            return from_alias
+        if self.mode == "actual":
+            if actual is None and from_alias is not None:
+                raise PlatformUnavailable()
+            return actual or platform
+        return actual or from_alias or platform
+
+    def check_text(self, text: str):
+        """Refuse free text (queries, channel names) that names a platform the mode hides"""
+        if self.hidden is not None and isinstance(text, str) and self.hidden.find(text):
+            raise PlatformUnavailable()
+
+    def mask(self, text: str) -> str:
+        """Rewrite platform names in an answer for the mode (cursor values are left as they are)"""
+        if self.masker is None or not isinstance(text, str):
+            return text
+        parts, position = [], 0
+        for cursor in _CURSORS.finditer(text):
+            parts.append(self.masker.replace(text[position:cursor.start()]))
+            parts.append(cursor.group())
+            position = cursor.end()
+        parts.append(self.masker.replace(text[position:]))
+        return "".join(parts)
+
+
+_policies = {}  # mode override -> (file stamps, AccessPolicy)
+_lock = threading.Lock()
+
+
+def _stamp(path: Path):
+    try:
+        st = path.stat()
+        return st.st_mtime_ns, st.st_size
+    except OSError:
+        return None
+
+
+def _read_mode(path: Path) -> str:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return str(json.load(f).get("mode", DEFAULT_MODE)).lower()
+    except (OSError, ValueError, AttributeError):
+        return DEFAULT_MODE
+
+
+def get_policy(mode_path: Path = MODE_PATH, aliases_path: Path = ALIASES_PATH, override: str = None) -> AccessPolicy:
+    """
+    Current policy, recompiled only when access_mode.json or platform_names.json changed.
+    override replaces LANCEDB_ACCESS_MODE ("" = use the mode file), e.g. the mode of the
+    client a shared daemon is answering.
+    """
+    override = (os.environ.get("LANCEDB_ACCESS_MODE", "") if override is None else override).lower()
+    stamps = (_stamp(mode_path), _stamp(aliases_path))
+    cached = _policies.get(override)
+    if cached is None or cached[0] != stamps:
+        with _lock:
+            cached = _policies.get(override)
+            if cached is None or cached[0] != stamps:
+                mode = override or _read_mode(mode_path)
+                cached = _policies[override] = (stamps, AccessPolicy(mode, load_platform_aliases(aliases_path)))
+    return cached[1]
+
+
+def enforce(params: dict, platform_keys=PLATFORM_KEYS, text_keys=TEXT_KEYS, policy: AccessPolicy = None) -> dict:
+    """
+    Validated copy of tool/command arguments: platform arguments resolved to actual
+    names, and the free-text arguments that can name a platform (queries, channels,
+    documents, sensors) checked for hidden platform names. Cursors, modes, output
+    formats and other arguments are passed through untouched.
+    """
+    policy = policy or get_policy()
+    if policy.mode == "admin" and not policy.aliases:
+        return params
+    checked = {}
+    for key, value in params.items():
+        if key in platform_keys and isinstance(value, str):
+            value = policy.resolve(value)
+        elif key == "requests" and isinstance(value, list):  # batch JSONL lines
+            value = [dict(r, platform=policy.resolve(r["platform"])) if r.get("platform") else r for r in value]
+            for r in value:
+                policy.check_text(r.get("query"))
+        elif key in text_keys and isinstance(value, str):
+            policy.check_text(value)
+        elif key in text_keys and isinstance(value, list):
+            for item in value:
+                policy.check_text(item)
+        checked[key] = value
+    return checked
@@ -0,0 +1,82 @@
+"""
+Non-blocking tool execution for the MCP server
+
+FastMCP runs plain synchronous tools on the event loop, so one CPU-heavy encode or
+Lance scan blocks every other tool call. This module provides:
+- offload(): wraps a sync tool into an async one that runs on a bounded I/O pool
+- MicroBatcher: coalesces concurrent encode requests from those worker threads into
+  a single batched model.encode call on a dedicated encode pool
+"""
+
+import asyncio
+import functools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+ENCODE_WORKERS = int(os.environ.get("LANCEDB_ENCODE_WORKERS", "1"))
+IO_WORKERS = int(os.environ.get("LANCEDB_IO_WORKERS", "8"))
+
+# Micro-batching window: wait at most this long for more requests, up to this many
+BATCH_MAX_WAIT = float(os.environ.get("LANCEDB_BATCH_MAX_WAIT_MS", "5")) / 1000
+BATCH_MAX_SIZE = 64
+
+
+class MicroBatcher:
+    """Coalesce concurrent encode(text) calls into encode_many(texts) batches"""
+
+    def __init__(self, encode_many, workers: int = ENCODE_WORKERS,
+                 max_wait: float = BATCH_MAX_WAIT, max_size: int = BATCH_MAX_SIZE):
+        self.encode_many = encode_many
+        self.max_wait = max_wait
+        self.max_size = max_size
+        self.batches = 0
+        self.requests = 0
+        self._queue = queue.Queue()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="encode")
+        threading.Thread(target=self._collect, name="encode-batcher", daemon=True).start()
+
+    def encode(self, text: str) -> list:
+        """Vector for text, encoded together with any concurrent requests"""
+        future = Future()
+        self._queue.put((text, future))
+        return future.result()
+
+    def _collect(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._pool.submit(self._encode, batch)
+
+    def _encode(self, batch: list):
+        self.batches += 1
+        self.requests += len(batch)
+        try:
+            vectors = self.encode_many([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), vector in zip(batch, vectors):
+            future.set_result(list(vector))
+
+
+def offload(fn, pool: ThreadPoolExecutor):
+    """Async variant of a sync tool that runs it on `pool` (same name, signature and docstring)"""
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, functools.partial(fn, *args, **kwargs))
+
+    return wrapper
@@ -0,0 +1,89 @@
+"""
+Batch / Multi-Query Search across all four tables
+
+The documented search workflow walks descriptions -> dependencies -> coordinates ->
+oandm one call at a time, re-encoding the same query for each table. A batch instead:
+1. encodes every query in one batched model.encode call (filling the embedding cache)
+2. runs the per-table searches concurrently on a thread pool; each search then finds
+   its query vector in the cache
+3. returns results grouped per query and table
+"""
+
+import contextvars
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+BATCH_WORKERS = int(os.environ.get("LANCEDB_BATCH_WORKERS", str(min(8, os.cpu_count() or 1))))
+
+
+def parse_batch_lines(lines) -> list:
+    """
+    Batch requests from JSONL: each line is a query string or an object with
+    "query" and optional "platform" / "limit" overrides. Blank lines are skipped.
+    """
+    requests = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        item = json.loads(line)
+        requests.append(item if isinstance(item, dict) else {"query": str(item)})
+    return requests
+
+
+def run_batch(requests: list, searches: dict, embed_many=None, tables: list = None,
+              platform: str = "", limit: int = 5, mode: str = "vector", output: str = "text") -> str:
+    """
+    Run every request against every table and format the grouped results.
+
+    Args:
+        requests: [{"query": str, "platform": optional str, "limit": optional int}]
+        searches: table name -> search(query, platform, limit, mode, output) returning text or JSON
+        embed_many: embed_many(queries) batch-encodes queries into the embedding cache
+        tables: tables to search (default all in `searches`)
+        platform, limit, mode: defaults for requests that do not override them
+        output: "text" (grouped sections) or "json" ({"queries": [{query, platform, tables}]})
+    """
+    tables = tables or list(searches)
+    unknown = [t for t in tables if t not in searches]
+    if unknown:
+        raise ValueError(f"Unknown table(s): {', '.join(unknown)}")
+    if not requests:
+        return "No queries given."
+
+    if embed_many is not None and mode != "fts":
+        embed_many([r["query"] for r in requests])
+
+    jobs = [
+        (i, table_name, r["query"], r.get("platform", platform), r.get("limit", limit))
+        for i, r in enumerate(requests)
+        for table_name in tables
+    ]
+    with ThreadPoolExecutor(max_workers=BATCH_WORKERS) as pool:
+        # Each job runs in a copy of the caller's context, so pinned table snapshots carry over
+        futures = [pool.submit(contextvars.copy_context().run, searches[t], q, p, n, mode, output)
+                   for _, t, q, p, n in jobs]
+
+        if output == "json":
+            groups = [{"query": r["query"], "platform": r.get("platform", platform), "tables": {}}
+                      for r in requests]
+            for (i, table_name, _, _, _), future in zip(jobs, futures):
+                try:
+                    groups[i]["tables"][table_name] = json.loads(future.result())
+                except Exception as e:
+                    groups[i]["tables"][table_name] = {"error": f"{type(e).__name__}: {e}"}
+            return json.dumps({"queries": groups}, default=str)
+
+        output = []
+        for (i, table_name, query, query_platform, _), future in zip(jobs, futures):
+            if table_name == tables[0]:
+                scope = f" | platform: {query_platform}" if query_platform else ""
+                output.append(f"=== Query {i + 1}: {query}{scope} ===")
+            try:
+                result = future.result()
+            except Exception as e:
+                result = f"Error: {type(e).__name__}: {e}"
+            output.append(f"--- {table_name} ---\n{result}")
+
+    return "\n\n".join(output)
@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+"""
+Retrieval Benchmark: golden-set quality and latency for the search functions
+
+Runs the versioned golden set (bench_golden.json) through the per-table search
+functions of lancedb_cli.py or lancedb_mcp.py and reports:
+- cold latency (first pass in a fresh process: model load, table opens, index builds)
+- warm latency (repeated passes), p50/p95/p99
+- QPS and latency under concurrent clients
+- peak RSS
+- recall@k and MRR: a result matches when its identity fields (platform_name plus
+  channame / name / sensor_name, or document_name + chunk_id) equal one of the
+  case's expected identities. Searches run with output="json", so matching is on
+  result rows rather than formatted text (which echoes the query)
+
+The query embedding cache and the search result cache are off unless
+--keep-embed-cache / --keep-result-cache is given, so warm passes measure retrieval.
+
+The full report is written as JSON (stdout or --output) so runs before and after an
+index, encoder or cache change can be compared; --baseline prints the deltas.
+
+Usage:
+    python bench.py --output bench.json
+    python bench.py --label                # top-k identities per case, to write expected ones
+    python bench.py --target mcp --mode hybrid --clients 1 4 8 --baseline bench.json
+    LANCEDB_ENCODER=onnx-int8 python bench.py --output bench-int8.json --baseline bench.json
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from encoder_check import peak_rss_mb
+
+GOLDEN_PATH = Path(__file__).parent / "bench_golden.json"
+
+
+def percentiles(latencies: list) -> dict:
+    """p50/p95/p99 in milliseconds"""
+    latencies = sorted(latencies)
+    if not latencies:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+
+    def pick(q):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000
+
+    return {"p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
+
+
+def _same(value, expected) -> bool:
+    """Identity field comparison: case- and whitespace-insensitive for text"""
+    if isinstance(expected, str):
+        return " ".join(str(value or "").split()).lower() == " ".join(expected.split()).lower()
+    return value == expected
+
+
+def rank_of(records: list, expected: list, k: int) -> int:
+    """1-based rank of the first result whose identity fields match an expected identity within k, else 0"""
+    for rank, record in enumerate(records[:k], 1):
+        if any(all(_same(record.get(field), value) for field, value in identity.items()) for identity in expected):
+            return rank
+    return 0
+
+
+def lineage_record(text: str) -> list:
+    """The channel get_channel_lineage resolved to, as a [{name, platform_name}] result list"""
+    name = re.search(r"(?m)^Channel: (.*)$", text)
+    platform = re.search(r"(?m)^Platform: (.*?)(?: \(.*\))?$", text)
+    return [{"name": name.group(1), "platform_name": platform.group(1) if platform else ""}] if name else []
+
+
+def load_searches(target: str) -> dict:
+    """table -> search(query, platform, limit, mode) returning ranked result records"""
+    if target == "mcp":
+        import lancedb_mcp as module
+    else:
+        import lancedb_cli as module
+    searches = {table: lambda q, p, n, m, search=search: json.loads(search(q, p, n, m, "json"))["results"]
+                for table, search in module.BATCH_SEARCHES.items()}
+    searches["lineage"] = lambda q, p, n, m: lineage_record(module.get_channel_lineage(q, p))
+    return searches
+
+
+def run_case(searches: dict, case: dict, k: int, mode: str) -> tuple:
+    """(latency seconds, rank, records) for one golden case"""
+    start = time.perf_counter()
+    records = searches[case["table"]](case["query"], case.get("platform", ""), k, mode)
+    return time.perf_counter() - start, rank_of(records, case["expected"], k), records
+
+
+def label(searches: dict, cases: list, k: int, mode: str) -> str:
+    """Identity fields of the top-k results of every case, for writing / checking expected identities"""
+    fields = ["platform_name", "channame", "name", "sensor_name", "document_name", "chunk_id"]
+    output = []
+    for case in cases:
+        _, rank, records = run_case(searches, case, k, mode)
+        output.append(f"{case['table']}: {case['query']!r} ({case.get('platform') or 'all'}) - rank {rank or 'miss'}")
+        for i, record in enumerate(records[:k], 1):
+            output.append(f"  [{i}] " + json.dumps({f: record[f] for f in fields if record.get(f) not in (None, "")}))
+    return "\n".join(output)
+
+
+def quality(cases: list, ranks: list, k: int) -> dict:
+    """recall@k and MRR overall and per table"""
+    def summarize(pairs):
+        return {
+            "cases": len(pairs),
+            f"recall_at_{k}": sum(1 for _, r in pairs if r) / len(pairs) if pairs else 0.0,
+            "mrr": sum(1 / r for _, r in pairs if r) / len(pairs) if pairs else 0.0,
+        }
+
+    # Cases without expected identities yet (see --label) only count towards latency
+    pairs = [(c, r) for c, r in zip(cases, ranks) if c["expected"]]
+    tables = sorted({c["table"] for c, _ in pairs})
+    return {
+        **summarize(pairs),
+        "unlabelled": len(cases) - len(pairs),
+        "tables": {t: summarize([(c, r) for c, r in pairs if c["table"] == t]) for t in tables},
+    }
+
+
+def concurrency_level(searches: dict, cases: list, k: int, mode: str, clients: int, repeat: int) -> dict:
+    jobs = [case for _ in range(repeat) for case in cases]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        latencies = [latency for latency, *_ in pool.map(lambda c: run_case(searches, c, k, mode), jobs)]
+    elapsed = time.perf_counter() - start
+    return {"clients": clients, "qps": len(jobs) / elapsed, **percentiles(latencies)}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(report: dict, baseline: dict) -> str:
+    """Readable deltas of the headline metrics against a previous report"""
+    k = report["config"]["k"]
+    metrics = [
+        ("cold p95 ms", lambda r: r["cold"]["p95_ms"]),
+        ("warm p50 ms", lambda r: r["warm"]["p50_ms"]),
+        ("warm p95 ms", lambda r: r["warm"]["p95_ms"]),
+        ("warm p99 ms", lambda r: r["warm"]["p99_ms"]),
+        ("peak RSS MB", lambda r: r["rss_mb"]),
+        (f"recall@{k}", lambda r: r["quality"].get(f"recall_at_{k}", 0.0)),
+        ("MRR", lambda r: r["quality"]["mrr"]),
+    ]
+    for level in report["concurrency"]:
+        clients = level["clients"]
+        metrics.append((f"QPS @{clients}", lambda r, c=clients: next(
+            (l["qps"] for l in r["concurrency"] if l["clients"] == c), 0.0)))
+
+    output = f"vs baseline {baseline.get('git_commit', '?')} (golden v{baseline.get('golden_version')}):"
+    for name, get in metrics:
+        try:
+            old, new = get(baseline), get(report)
+        except (KeyError, TypeError):
+            continue
+        if old is None or new is None:  # RSS unavailable on this platform
+            continue
+        change = f"{(new - old) / old:+.1%}" if old else "n/a"
+        output += f"\n  {name:<14} {old:>10.3f} -> {new:>10.3f}  ({change})"
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Golden-set retrieval benchmark")
+    parser.add_argument("--golden", default=str(GOLDEN_PATH), help="Golden set JSON")
+    parser.add_argument("--target", choices=["cli", "mcp"], default="cli", help="Search implementation")
+    parser.add_argument("--mode", "-m", choices=["vector", "fts", "hybrid"], default="vector")
+    parser.add_argument("--k", type=int, default=5, help="Results per search (recall@k)")
+    parser.add_argument("--repeat", type=int, default=3, help="Warm passes over the golden set")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 8], help="Concurrency levels")
+    parser.add_argument("--keep-embed-cache", action="store_true",
+                        help="Use the on-disk query embedding cache (cold runs then skip encodes)")
+    parser.add_argument("--keep-result-cache", action="store_true",
+                        help="Keep the search result cache on (warm passes then measure cache lookups)")
+    parser.add_argument("--output", "-o", default="", help="Write the JSON report here (default stdout)")
+    parser.add_argument("--baseline", default="", help="Previous JSON report to compare against")
+    parser.add_argument("--label", action="store_true",
+                        help="Print the top-k result identities of every case instead of benchmarking")
+    args = parser.parse_args()
+
+    if not args.keep_embed_cache:
+        os.environ["LANCEDB_EMBED_CACHE"] = ""  # must be set before the search module is imported
+    if not args.keep_result_cache:
+        # Otherwise every pass after the first is served from result_cache.RESULTS, not retrieval
+        os.environ["LANCEDB_RESULT_CACHE_SIZE"] = "0"
+
+    with open(args.golden) as f:
+        golden = json.load(f)
+    cases = golden["cases"]
+
+    searches = load_searches(args.target)
+    unknown = sorted({c["table"] for c in cases} - set(searches))
+    if unknown:
+        sys.exit(f"Golden set uses unknown table(s): {', '.join(unknown)}")
+    if args.label:
+        print(label(searches, cases, args.k, args.mode))
+        return
+
+    # Cold: first pass in this process
+    cold = [run_case(searches, case, args.k, args.mode)[:2] for case in cases]
+    ranks = [rank for _, rank in cold]
+
+    # Warm: repeated sequential passes
+    warm = [run_case(searches, case, args.k, args.mode)[0] for _ in range(args.repeat) for case in cases]
+
+    levels = [concurrency_level(searches, cases, args.k, args.mode, c, args.repeat) for c in args.clients]
+
+    report = {
+        "golden_version": golden.get("version"),
+        "git_commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": {
+            "target": args.target,
+            "mode": args.mode,
+            "k": args.k,
+            "repeat": args.repeat,
+            "encoder": os.environ.get("LANCEDB_ENCODER", "torch"),
+            "embed_cache": args.keep_embed_cache,
+            "result_cache": args.keep_result_cache,
+        },
+        "cold": {"first_call_ms": cold[0][0] * 1000 if cold else 0.0, **percentiles([l for l, _ in cold])},
+        "warm": percentiles(warm),
+        "concurrency": levels,
+        "rss_mb": peak_rss_mb(),  # None where it cannot be read
+        "quality": quality(cases, ranks, args.k),
+        "cases": [
+            {"table": c["table"], "query": c["query"], "platform": c.get("platform", ""),
+             "rank": rank, "cold_ms": latency * 1000}
+            for c, (latency, rank) in zip(cases, cold)
+        ],
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+
+    summary = (f"recall@{args.k} {report['quality'][f'recall_at_{args.k}']:.1%}  MRR {report['quality']['mrr']:.3f}  "
+               f"warm p50/p95/p99 {report['warm']['p50_ms']:.1f}/{report['warm']['p95_ms']:.1f}/"
+               f"{report['warm']['p99_ms']:.1f} ms  RSS " +
+               (f"{report['rss_mb']:.0f} MB" if report["rss_mb"] is not None else "n/a"))
+    print(summary, file=sys.stderr)
+    if args.baseline:
+        with open(args.baseline) as f:
+            print(compare(report, json.load(f)), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Query Embedding Cache shared by lancedb_cli.py and lancedb_mcp.py
+
+Agents repeat the same handful of queries, so query vectors are cached in two tiers:
+- a bounded in-memory LRU (per process)
+- an on-disk SQLite store keyed by model name + hash of the normalized text,
+  shared across processes and restarts
+
+A hit in either tier skips the embedding model entirely (it is never even loaded).
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+
+# On-disk cache location (set LANCEDB_EMBED_CACHE="" to keep the cache in memory only)
+CACHE_PATH = os.environ.get(
+    "LANCEDB_EMBED_CACHE", str(Path(__file__).parent / ".cache" / "query_embeddings.sqlite")
+)
+MAX_MEMORY_ENTRIES = int(os.environ.get("LANCEDB_EMBED_CACHE_SIZE", "1024"))
+
+
+def normalize_query(text: str) -> str:
+    """Collapse whitespace and lowercase (all-MiniLM-L6-v2 is uncased, so vectors are identical)"""
+    return " ".join(text.split()).lower()
+
+
+class EmbeddingCache:
+    """Normalized query text -> embedding vector, memory LRU in front of SQLite"""
+
+    def __init__(self, model_name: str, path: str = CACHE_PATH, max_entries: int = MAX_MEMORY_ENTRIES):
+        self.model_name = model_name
+        self.path = path
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha1(normalize_query(text).encode("utf-8")).hexdigest()
+
+    def _disk(self):
+        """Lazy open the SQLite store; disables the disk tier if it is unusable"""
+        if self._conn is None and self.path:
+            try:
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings ("
+                    " model TEXT NOT NULL, key TEXT NOT NULL, query TEXT NOT NULL,"
+                    " vector BLOB NOT NULL, PRIMARY KEY (model, key))"
+                )
+                conn.commit()
+                self._conn = conn
+            except (sqlite3.Error, OSError):
+                self.path = ""
+        return self._conn
+
+    def _remember(self, key: str, vector: list):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, text: str):
+        """Return the cached vector for text, or None"""
+        key = self._key(text)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return vector
+
+            conn = self._disk()
+            if conn is not None:
+                try:
+                    row = conn.execute(
+                        "SELECT vector FROM embeddings WHERE model = ? AND key = ?",
+                        (self.model_name, key),
+                    ).fetchone()
+                except sqlite3.Error:
+                    row = None
+                if row is not None:
+                    values = array("f")
+                    values.frombytes(row[0])
+                    vector = values.tolist()
+                    self._remember(key, vector)
+                    self.disk_hits += 1
+                    return vector
+
+            self.misses += 1
+            return None
+
+    def put(self, text: str, vector: list):
+        """Store a vector in both tiers"""
+        key = self._key(text)
+        with self._lock:
+            self._remember(key, vector)
+            conn = self._disk()
+            if conn is not None:
+                try:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO embeddings (model, key, query, vector) VALUES (?, ?, ?, ?)",
+                        (self.model_name, key, normalize_query(text), array("f", vector).tobytes()),
+                    )
+                    conn.commit()
+                except sqlite3.Error:
+                    pass
+
+    def encode(self, text: str, encode_fn) -> list:
+        """Return the cached vector for text, calling encode_fn(normalized_text) on a miss"""
+        vector = self.get(text)
+        if vector is None:
+            vector = list(encode_fn(normalize_query(text)))
+            self.put(text, vector)
+        return vector
+
+    def encode_many(self, texts: list, encode_fn) -> list:
+        """Vectors for several texts, encoding all misses with a single encode_fn(list) call"""
+        vectors = [self.get(text) for text in texts]
+        missing = list(dict.fromkeys(normalize_query(t) for t, v in zip(texts, vectors) if v is None))
+        if missing:
+            encoded = {text: list(vector) for text, vector in zip(missing, encode_fn(missing))}
+            for text, vector in encoded.items():
+                self.put(text, vector)
+            vectors = [v if v is not None else encoded[normalize_query(t)] for t, v in zip(texts, vectors)]
+        return vectors
+
+    def stats(self) -> dict:
+        """Hit/miss counters and tier sizes"""
+        with self._lock:
+            disk_entries = 0
+            conn = self._disk()
+            if conn is not None:
+                try:
+                    disk_entries = conn.execute(
+                        "SELECT COUNT(*) FROM embeddings WHERE model = ?", (self.model_name,)
+                    ).fetchone()[0]
+                except sqlite3.Error:
+                    pass
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "model": self.model_name,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+                "disk_path": self.path or "(disabled)",
+            }
+
+
+def format_stats(stats: dict) -> str:
+    """Format cache stats as readable text"""
+    output = f"Embedding Cache ({stats['model']}):\n" + "-" * 50
+    output += f"\nMemory hits: {stats['memory_hits']}"
+    output += f"\nDisk hits: {stats['disk_hits']}"
+    output += f"\nMisses (model encodes): {stats['misses']}"
+    output += f"\nHit rate: {stats['hit_rate']:.1%}"
+    output += f"\nEntries: {stats['memory_entries']} in memory, {stats['disk_entries']} on disk"
+    output += f"\nDisk store: {stats['disk_path']}"
+    return output
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""
+Encoder Backend Check: accuracy and cost of the ONNX backends against torch
+
+For each backend, in a fresh subprocess (so imports and memory are not shared):
+- load time (imports + model load), peak RSS (n/a on Windows without psutil),
+  single-query encode latency p50/p95
+Against the torch backend:
+- cosine agreement of the query vectors (mean / min)
+- top-k overlap of exact searches on the descriptions table
+
+Usage:
+    python encoder_check.py --export                  # write the ONNX files once (needs torch)
+    python encoder_check.py                           # torch vs onnx vs onnx-int8
+    python encoder_check.py --backends onnx-int8 --k 5
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from encoders import BACKENDS, export_onnx, load_encoder
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+DB_PATH = Path(__file__).parent / "channel_summary_vectordb"
+
+SAMPLE_QUERIES = [
+    "roll rate", "wind speed", "Northings", "heave acceleration", "GPS sensor",
+    "calibration procedure", "pitch angle", "current direction", "mooring line tension",
+    "riser top angle", "wave height", "air gap", "hull stress", "ballast tank level",
+    "platform heading", "accelerometer z axis", "replace the battery pack", "EC Wind Speed",
+    "anemometer", "strain gauge temperature compensation",
+]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where it cannot be read)"""
+    try:
+        import resource
+    except ImportError:  # Windows: psutil's peak working set, when installed
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / 2**20
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KB on Linux
+
+
+def measure(backend: str, queries: list) -> dict:
+    """Load + latency + RSS of one backend (run in a subprocess)"""
+    start = time.perf_counter()
+    encoder = load_encoder(MODEL_NAME, backend)
+    load_s = time.perf_counter() - start
+
+    encoder.encode("warm up")
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        encoder.encode(query)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        "backend": backend,
+        "load_s": load_s,
+        "rss_mb": peak_rss_mb(),
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[max(0, int(len(latencies) * 0.95) - 1)] * 1000,
+    }
+
+
+def measure_isolated(backend: str) -> dict:
+    result = subprocess.run([sys.executable, __file__, "--measure", backend],
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def agreement(backend: str, reference, queries: list, k: int) -> dict:
+    """Cosine agreement and top-k overlap of backend vs the reference (torch) encoder"""
+    import lancedb
+    import numpy as np
+
+    ref_vectors = np.asarray(reference.encode(queries))
+    vectors = np.asarray(load_encoder(MODEL_NAME, backend).encode(queries))
+    cosines = (ref_vectors * vectors).sum(axis=1)  # both are L2-normalized
+
+    table = lancedb.connect(str(DB_PATH)).open_table("descriptions")
+
+    def top_ids(vector):
+        search = table.search(vector.tolist()).bypass_vector_index()
+        rows = search.select(["platform_name"]).with_row_id(True).limit(k).to_list()
+        return {r["_rowid"] for r in rows}
+
+    overlaps = [len(top_ids(a) & top_ids(b)) / k for a, b in zip(ref_vectors, vectors)]
+    return {
+        "cos_mean": float(cosines.mean()),
+        "cos_min": float(cosines.min()),
+        "overlap": sum(overlaps) / len(overlaps),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare encoder backends against torch")
+    parser.add_argument("--export", action="store_true", help="Export the ONNX (fp32 + int8) models and exit")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--k", type=int, default=10, help="k for the top-k overlap")
+    parser.add_argument("--measure", choices=BACKENDS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, SAMPLE_QUERIES)))
+        return
+    if args.export:
+        print(export_onnx(MODEL_NAME))
+        return
+
+    reference = load_encoder(MODEL_NAME, "torch")
+
+    print(f"{'backend':>10} {'load s':>7} {'RSS MB':>7} {'p50 ms':>7} {'p95 ms':>7} "
+          f"{'cos mean':>9} {'cos min':>8} {f'top-{args.k}':>7}")
+    print("-" * 72)
+    for backend in args.backends:
+        r = measure_isolated(backend)
+        rss = f"{r['rss_mb']:>7.0f}" if r["rss_mb"] is not None else f"{'n/a':>7}"
+        line = f"{backend:>10} {r['load_s']:>7.2f} {rss} {r['p50_ms']:>7.2f} {r['p95_ms']:>7.2f}"
+        if backend != "torch":
+            a = agreement(backend, reference, SAMPLE_QUERIES, args.k)
+            line += f" {a['cos_mean']:>9.5f} {a['cos_min']:>8.5f} {a['overlap']:>7.1%}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
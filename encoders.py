@@ -0,0 +1,138 @@
+"""
+Pluggable Sentence Encoders for the query / document embedding model
+
+Backends (LANCEDB_ENCODER, default "torch"):
+- torch:     sentence-transformers on PyTorch (reference)
+- onnx:      the same model exported to ONNX, run with onnxruntime + tokenizers
+             (no torch/transformers import at query time)
+- onnx-int8: dynamically int8-quantized export of the ONNX model
+
+All backends produce the same 384-dimensional, L2-normalized mean-pooled vectors as
+SentenceTransformer("all-MiniLM-L6-v2"), so they work against the existing `vector`
+columns. The int8 vectors differ slightly, so they get their own embedding cache
+namespace (cache_name()).
+
+The ONNX files are exported once (needs torch) with:
+    python encoder_check.py --export
+"""
+
+import os
+from pathlib import Path
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+ENCODER_BACKEND = os.environ.get("LANCEDB_ENCODER", "torch")
+
+ONNX_DIR = Path(os.environ.get("LANCEDB_ONNX_DIR", str(Path(__file__).parent / ".cache" / "onnx")))
+ONNX_THREADS = int(os.environ.get("LANCEDB_ONNX_THREADS", "0"))  # 0 = onnxruntime default
+
+# all-MiniLM-L6-v2 truncates at 256 word pieces
+MAX_SEQ_LENGTH = 256
+
+
+def cache_name(model_name: str, backend: str = ENCODER_BACKEND) -> str:
+    """Embedding cache namespace: fp32 backends share vectors, int8 gets its own"""
+    return f"{model_name}:int8" if backend == "onnx-int8" else model_name
+
+
+def onnx_path(model_name: str, quantized: bool = False) -> Path:
+    return ONNX_DIR / model_name / ("model-int8.onnx" if quantized else "model.onnx")
+
+
+class TorchEncoder:
+    """SentenceTransformer on PyTorch"""
+
+    backend = "torch"
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts, batch_size: int = 32, **kwargs):
+        return self.model.encode(texts, batch_size=batch_size, **kwargs)
+
+
+class OnnxEncoder:
+    """Exported transformer on onnxruntime, with sentence-transformers' mean pooling + normalize"""
+
+    def __init__(self, model_name: str, quantized: bool = False):
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        path = onnx_path(model_name, quantized)
+        if not path.exists():
+            raise RuntimeError(f"{path} not found; export it with: python encoder_check.py --export")
+
+        self.backend = "onnx-int8" if quantized else "onnx"
+        self.tokenizer = Tokenizer.from_file(str(path.parent / "tokenizer.json"))
+        self.tokenizer.enable_truncation(MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding()
+
+        options = onnxruntime.SessionOptions()
+        if ONNX_THREADS:
+            options.intra_op_num_threads = ONNX_THREADS
+        self.session = onnxruntime.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def _encode_batch(self, texts: list):
+        import numpy as np
+
+        encodings = self.tokenizer.encode_batch(texts)
+        inputs = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        token_embeddings = self.session.run(None, {k: v for k, v in inputs.items() if k in self.input_names})[0]
+
+        mask = inputs["attention_mask"][..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+    def encode(self, texts, batch_size: int = 32, **kwargs):
+        """Same call shape as SentenceTransformer.encode: a str gives one vector, a list a matrix"""
+        import numpy as np
+
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        batches = [self._encode_batch(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)]
+        vectors = np.vstack(batches) if batches else np.zeros((0, 384), dtype=np.float32)
+        vectors = vectors.astype(np.float32)
+        return vectors[0] if single else vectors
+
+
+def load_encoder(model_name: str, backend: str = ENCODER_BACKEND):
+    """Encoder for model_name with the configured backend"""
+    if backend == "torch":
+        return TorchEncoder(model_name)
+    if backend in ("onnx", "onnx-int8"):
+        return OnnxEncoder(model_name, quantized=backend == "onnx-int8")
+    raise ValueError(f"Unknown encoder backend '{backend}' (choose from {', '.join(BACKENDS)})")
+
+
+def export_onnx(model_name: str) -> str:
+    """Export model_name to ONNX (fp32 + dynamic int8) next to its tokenizer; needs torch"""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+
+    path = onnx_path(model_name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer = st_model[0].auto_model.eval()
+    st_model.tokenizer.save_pretrained(str(path.parent))  # writes tokenizer.json
+
+    sample = st_model.tokenizer(["export sample"], return_tensors="pt")
+    names = ["input_ids", "attention_mask", "token_type_ids"]
+    dynamic = {name: {0: "batch", 1: "sequence"} for name in names}
+    dynamic["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer, tuple(sample[name] for name in names), str(path),
+            input_names=names, output_names=["last_hidden_state"],
+            dynamic_axes=dynamic, opset_version=14,
+        )
+
+    quantized = onnx_path(model_name, quantized=True)
+    quantize_dynamic(str(path), str(quantized), weight_type=QuantType.QInt8)
+    return f"Exported {path} and {quantized}"
@@ -0,0 +1,221 @@
+"""
+Cross-Platform Equivalent Channels precomputed from the descriptions table
+
+"Same channel type on other platforms" used to mean re-running search_descriptions
+without a platform filter and reading the results by hand. An offline job (CLI
+`cluster`) groups every channel of every platform into channel-type clusters and
+stores them in the channel_groups table; find_equivalents then answers from the
+group of the requested channel in one lookup.
+
+Clustering:
+1. Units are normalized to a quantity class (m/s and knots -> speed, deg and rad ->
+   angle, ...) and channels only cluster within the same class, so "Roll" and
+   "Roll Rate" never merge
+2. Device tokens are stripped from the channel name ("EC Wind Speed" on device
+   "EC" -> "Wind Speed") and the normalized "name | description" text is embedded
+   (platform, device and system are left out of the text on purpose)
+3. Leader clustering on cosine similarity (threshold, default 0.88), followed by a
+   reassignment pass against the final centroids
+
+channel_groups holds one row per cluster: id, label, units class, member count,
+platforms, the members (platform, device, channel, units, similarity to the
+centroid), the centroid vector and the descriptions version it was built from.
+"""
+
+import re
+from collections import Counter
+
+import numpy as np
+
+GROUPS_TABLE = "channel_groups"
+CLUSTER_THRESHOLD = 0.88
+ENCODE_BATCH_SIZE = 256
+
+SOURCE_COLUMNS = ["platform_name", "platform_alias", "device", "channame", "chanunits", "description"]
+
+# Normalized unit spelling -> quantity class (unknown units are their own class)
+UNIT_CLASSES = {
+    "angle": ["deg", "degree", "degrees", "°", "rad", "radian", "radians"],
+    "angular_rate": ["deg/s", "degs", "deg/sec", "°/s", "rad/s", "rads", "rpm"],
+    "acceleration": ["m/s2", "m/s^2", "m/s/s", "ms2", "g", "ft/s2", "ft/s^2"],
+    "speed": ["m/s", "mps", "kt", "kts", "knot", "knots", "ft/s", "km/h", "kph", "mph", "cm/s"],
+    "length": ["m", "mm", "cm", "km", "ft", "in", "meter", "meters", "metre", "metres", "feet"],
+    "pressure": ["pa", "kpa", "mpa", "bar", "mbar", "hpa", "psi", "psig", "psia", "inhg"],
+    "temperature": ["c", "degc", "°c", "f", "degf", "°f", "k", "kelvin"],
+    "force": ["n", "kn", "mn", "kip", "kips", "lbf", "te", "tonne", "tonnes", "mt"],
+    "moment": ["nm", "knm", "mnm", "kip-ft", "kipft", "lbf-ft", "ft-lb"],
+    "strain": ["ue", "με", "microstrain", "strain", "mm/m"],
+    "voltage": ["v", "mv", "kv", "volt", "volts"],
+    "current": ["a", "ma", "amp", "amps"],
+    "frequency": ["hz", "khz", "mhz"],
+    "time": ["s", "sec", "ms", "min", "h", "hr", "hours"],
+    "ratio": ["%", "percent", "pct", "ratio", "-", "none", "unitless", "dimensionless"],
+}
+_UNIT_CLASS = {spelling: quantity for quantity, spellings in UNIT_CLASSES.items() for spelling in spellings}
+
+# (table name, table version, EquivalentIndex) of the last loaded groups
+_index = None
+
+
+def units_class(units: str) -> str:
+    """Quantity class of a units string ("" when there are no units)"""
+    key = re.sub(r"[\s()\[\]]", "", (units or "").lower()).rstrip(".")
+    if not key:
+        return ""
+    return _UNIT_CLASS.get(key) or _UNIT_CLASS.get(key.replace("/sec", "/s")) or key
+
+
+def normalize_name(channame: str, device: str = "") -> str:
+    """Channel name without the tokens of its device name ("EC Wind Speed", "EC" -> "Wind Speed")"""
+    device_tokens = {t for t in re.split(r"[\W_]+", (device or "").lower()) if t}
+    tokens = [t for t in re.split(r"[\s_]+", channame or "") if t]
+    kept = [t for t in tokens if re.sub(r"\W", "", t.lower()) not in device_tokens]
+    return " ".join(kept or tokens)
+
+
+def cluster_text(row: dict) -> str:
+    """Text embedded for clustering: platform- and device-neutral name and description"""
+    return " | ".join(p for p in (normalize_name(row.get("channame", ""), row.get("device", "")),
+                                  row.get("description") or "") if p)
+
+
+def leader_clusters(vectors: np.ndarray, threshold: float) -> np.ndarray:
+    """Cluster labels for L2-normalized vectors: leader assignment, then one reassignment pass"""
+    sums = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+    for vector in vectors:
+        if len(sums):
+            centroids = sums / np.linalg.norm(sums, axis=1, keepdims=True)
+            similarities = centroids @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] >= threshold:
+                sums[best] += vector
+                continue
+        sums = np.vstack([sums, vector[None, :]])
+
+    centroids = sums / np.linalg.norm(sums, axis=1, keepdims=True)
+    labels = np.argmax(vectors @ centroids.T, axis=1)
+    return np.unique(labels, return_inverse=True)[1]  # drop clusters left empty
+
+
+def build_groups(db, encode_many, threshold: float = CLUSTER_THRESHOLD, source: str = "descriptions") -> str:
+    """Cluster all channels of the source table and (re)write the channel_groups table"""
+    table = db.open_table(source)
+    columns = [c for c in SOURCE_COLUMNS if c in table.schema.names]
+    rows = [r for r in table.to_lance().to_table(columns=columns).to_pylist() if r.get("channame")]
+    if not rows:
+        return f"No channels in '{source}' to cluster."
+
+    # Identical normalized texts share one encode
+    texts = [cluster_text(r) for r in rows]
+    unique_texts = sorted(set(texts))
+    unique_vectors = []
+    for start in range(0, len(unique_texts), ENCODE_BATCH_SIZE):
+        unique_vectors.extend(encode_many(unique_texts[start:start + ENCODE_BATCH_SIZE]))
+    unique_vectors = np.asarray(unique_vectors, dtype=np.float32)
+    unique_vectors /= np.maximum(np.linalg.norm(unique_vectors, axis=1, keepdims=True), 1e-12)
+    position = {text: i for i, text in enumerate(unique_texts)}
+
+    blocks = {}
+    for row, text in zip(rows, texts):
+        blocks.setdefault(units_class(row.get("chanunits", "")), set()).add(position[text])
+
+    groups = []         # (units class, centroid)
+    assignment = {}     # (units class, text id) -> group
+    for quantity, members in sorted(blocks.items()):
+        members = sorted(members)
+        labels = leader_clusters(unique_vectors[members], threshold)
+        for label in range(labels.max() + 1):
+            text_ids = [m for m, l in zip(members, labels) if l == label]
+            centroid = unique_vectors[text_ids].mean(axis=0)
+            centroid /= max(float(np.linalg.norm(centroid)), 1e-12)
+            assignment.update({(quantity, t): len(groups) for t in text_ids})
+            groups.append((quantity, centroid))
+
+    grouped = [[] for _ in groups]
+    for row, text in zip(rows, texts):
+        t = position[text]
+        grouped[assignment[(units_class(row.get("chanunits", "")), t)]].append((row, t))
+
+    records = []
+    for cluster_id, ((quantity, centroid), channels) in enumerate(zip(groups, grouped)):
+        names = Counter(normalize_name(r["channame"], r.get("device", "")) for r, _ in channels)
+        platforms = sorted({r["platform_name"] for r, _ in channels})
+        records.append({
+            "cluster_id": cluster_id,
+            "label": names.most_common(1)[0][0],
+            "units_class": quantity,
+            "size": len(channels),
+            "platform_count": len(platforms),
+            "platforms": ", ".join(platforms),
+            "members": [{
+                "platform_name": r["platform_name"],
+                "platform_alias": r.get("platform_alias") or "",
+                "device": r.get("device") or "",
+                "channame": r["channame"],
+                "chanunits": r.get("chanunits") or "",
+                "similarity": float(unique_vectors[t] @ centroid),
+            } for r, t in channels],
+            "source_version": table.version,
+            "vector": centroid.tolist(),
+        })
+
+    db.create_table(GROUPS_TABLE, data=records, mode="overwrite")
+    shared = sum(1 for r in records if r["platform_count"] > 1)
+    return (f"Clustered {len(rows)} channels ({len(unique_texts)} distinct texts) into {len(records)} groups; "
+            f"{shared} groups span more than one platform (threshold {threshold:g}, "
+            f"{source} v{table.version}).")
+
+
+class EquivalentIndex:
+    """(platform, channel) -> channel group, for platform names and aliases"""
+
+    def __init__(self, rows: list):
+        self.groups = rows
+        self.channels = {}
+        for position, group in enumerate(rows):
+            for member in group["members"]:
+                channel = " ".join(member["channame"].split()).lower()
+                for platform in (member["platform_name"], member["platform_alias"]):
+                    if platform:
+                        self.channels.setdefault((platform.lower(), channel), (position, member))
+
+    def find(self, channel: str, platform: str):
+        """(group row, member) for an exact (case-insensitive) channel on a platform, or None"""
+        return self.channels.get((platform.lower(), " ".join(channel.split()).lower()))
+
+
+def get_equivalent_index(table) -> EquivalentIndex:
+    """Loaded channel groups, reloaded on a new channel_groups version"""
+    global _index
+    if _index is None or _index[0] != table.name or _index[1] != table.version:
+        columns = [c for c in table.schema.names if c != "vector"]
+        rows = table.to_lance().to_table(columns=columns).to_pylist()
+        _index = (table.name, table.version, EquivalentIndex(rows))
+    return _index[2]
+
+
+def format_equivalents(index: EquivalentIndex, channel: str, platform: str, source_version: int = None,
+                       include_same_platform: bool = False) -> str:
+    """The channels grouped with channel, on other platforms first"""
+    found = index.find(channel, platform)
+    if found is None:
+        return f"Channel '{channel}' on platform '{platform}' is not in any channel group."
+    position, member = found
+    group = index.groups[position]
+
+    others = [m for m in group["members"] if m is not member and (
+        include_same_platform or m["platform_name"] != member["platform_name"])]
+    others.sort(key=lambda m: (m["platform_name"] == member["platform_name"], -m["similarity"]))
+
+    output = (f"Equivalents of {member['channame']} ({member['platform_name']}): group {group['cluster_id']} "
+              f"\"{group['label']}\" [{group['units_class'] or 'no units'}], "
+              f"{group['size']} channels on {group['platform_count']} platforms")
+    if not others:
+        output += "\n\nNo equivalent channels on other platforms."
+    for i, m in enumerate(others, 1):
+        output += (f"\n[{i}] {m['platform_name']} | {m['device']} | {m['channame']} ({m['chanunits']})"
+                   f"  similarity {m['similarity']:.2f}")
+    if source_version is not None and group.get("source_version") != source_version:
+        output += (f"\n\n(groups were built from descriptions v{group.get('source_version')}, now "
+                   f"v{source_version}; re-run `lancedb_cli.py cluster`)")
+    return output
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+Genie Client Load Test against a local stub Genie server
+
+Starts a stub of the Genie conversation API on localhost (answers complete after a
+random 0.3-1.5 s "query time") and measures ask_genie latency for concurrent
+questions with:
+- fixed:    the previous behaviour, polling every 2 s
+- adaptive: pooled client with exponential backoff + jitter (current)
+
+With --distinct N the questions repeat over N distinct texts, so the answer cache and
+in-flight coalescing come into play (the cache is cleared between runs).
+
+Usage:
+    python genie_loadtest.py --questions 40 --concurrency 10
+    python genie_loadtest.py --questions 40 --concurrency 10 --distinct 5
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubGenieHandler(BaseHTTPRequestHandler):
+    """Minimal start-conversation / message-status endpoints"""
+    protocol_version = "HTTP/1.1"  # keep-alive
+    ready_at = {}  # message_id -> time the answer becomes available
+    latency = (0.3, 1.5)
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, body: dict):
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        message_id = uuid.uuid4().hex
+        self.ready_at[message_id] = time.monotonic() + random.uniform(*self.latency)
+        self._reply({"conversation_id": uuid.uuid4().hex, "message_id": message_id})
+
+    def do_GET(self):
+        message_id = self.path.rstrip("/").split("/")[-1]
+        if time.monotonic() < self.ready_at.get(message_id, 0):
+            self._reply({"status": "EXECUTING_QUERY"})
+        else:
+            self._reply({
+                "status": "COMPLETED",
+                "attachments": [{"type": "TEXT", "text": {"content": "stub answer"}}],
+            })
+
+
+async def measure(genie, questions: int, concurrency: int, distinct: int = 0) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            await genie.ask_genie(f"question {i % distinct if distinct else i}")
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(i) for i in range(questions)))
+    latencies.sort()
+    return {
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[max(0, int(len(latencies) * 0.95) - 1)],
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="ask_genie latency against a stub Genie server")
+    parser.add_argument("--questions", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--distinct", type=int, default=0, help="Repeat over this many distinct questions")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubGenieHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ["DATABRICKS_HOST"] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ.setdefault("DATABRICKS_TOKEN", "stub-token")
+    import genie_mcp
+
+    adaptive_delays = genie_mcp.poll_delays
+    print(f"{'polling':>10} {'p50 s':>8} {'p95 s':>8}")
+    print("-" * 28)
+    for label, delays in [("fixed 2s", lambda: itertools.repeat(2.0)), ("adaptive", adaptive_delays)]:
+        genie_mcp.poll_delays = delays
+        genie_mcp._answers.clear()
+        r = await measure(genie_mcp, args.questions, args.concurrency, args.distinct)
+        print(f"{label:>10} {r['p50']:>8.2f} {r['p95']:>8.2f}")
+    if args.distinct:
+        print("\n" + await genie_mcp.genie_cache_stats())
+
+    await genie_mcp.get_client().aclose()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
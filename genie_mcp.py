@@ -1,68 +1,239 @@
 import os
 import asyncio
+import random
+import time
+from collections import OrderedDict
+
 import httpx
 from mcp.server.fastmcp import FastMCP
 
+from encoders import load_encoder
+
 mcp = FastMCP("Databricks Genie")
 
 DATABRICKS_HOST = os.environ.get("DATABRICKS_HOST", "https://bmt-deep-ci-2.cloud.databricks.com")
 DATABRICKS_TOKEN = os.environ["DATABRICKS_TOKEN"]
 GENIE_SPACE_ID = os.environ.get("GENIE_SPACE_ID", "01f0db00369b103d909729dd2bbfb6b6")
 
+# Polling: exponential backoff with jitter, starting fast and capped
+POLL_INITIAL_DELAY = float(os.environ.get("GENIE_POLL_INITIAL", "0.25"))
+POLL_MAX_DELAY = float(os.environ.get("GENIE_POLL_MAX", "4.0"))
+POLL_TIMEOUT = float(os.environ.get("GENIE_POLL_TIMEOUT", "120"))
+
+# Query results larger than this are truncated while streaming
+MAX_RESULT_BYTES = int(os.environ.get("GENIE_MAX_RESULT_BYTES", str(1024 * 1024)))
+
+# Answer cache: normalized question -> answer for GENIE_CACHE_TTL seconds
+CACHE_TTL = float(os.environ.get("GENIE_CACHE_TTL", "600"))
+CACHE_MAX_ENTRIES = int(os.environ.get("GENIE_CACHE_SIZE", "256"))
+
+# Optional near-duplicate lookup with the MiniLM model the LanceDB server uses
+SEMANTIC_CACHE = os.environ.get("GENIE_SEMANTIC_CACHE", "0") == "1"
+SEMANTIC_MODEL = "all-MiniLM-L6-v2"
+SEMANTIC_MIN_SIMILARITY = float(os.environ.get("GENIE_SEMANTIC_MIN_SIMILARITY", "0.95"))
+
+# Shared client: one connection pool (keep-alive, HTTP/2 if available) for all questions
+_client = None
+
+# normalized question -> (expires_at, answer, vector or None)
+_answers = OrderedDict()
+# normalized question -> pending task shared by identical concurrent questions
+_in_flight = {}
+_stats = {"hits": 0, "semantic_hits": 0, "coalesced": 0, "misses": 0}
+_model = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Lazy create the pooled Genie client"""
+    global _client
+    if _client is None or _client.is_closed:
+        try:
+            import h2  # noqa: F401  (httpx needs it for HTTP/2)
+            http2 = True
+        except ImportError:
+            http2 = False
+        _client = httpx.AsyncClient(
+            base_url=f"{DATABRICKS_HOST}/api/2.0/genie/spaces/{GENIE_SPACE_ID}",
+            headers={"Authorization": f"Bearer {DATABRICKS_TOKEN}"},
+            timeout=120.0,
+            http2=http2,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60.0),
+        )
+    return _client
+
+
+def poll_delays():
+    """Backoff delays: 0.25s, 0.5s, 1s, ... up to POLL_MAX_DELAY, each jittered to 50-100%"""
+    delay = POLL_INITIAL_DELAY
+    while True:
+        yield random.uniform(delay / 2, delay)
+        delay = min(delay * 2, POLL_MAX_DELAY)
+
+
+async def read_query_result(client: httpx.AsyncClient, url: str) -> tuple:
+    """
+    Stream a query result instead of buffering it whole, truncating very large payloads;
+    returns (text, cacheable): error responses and truncated (invalid JSON) results are not cacheable
+    """
+    async with client.stream("GET", url) as response:
+        if response.is_error:
+            return f"Query result download failed: HTTP {response.status_code} {response.reason_phrase}", False
+        chunks = []
+        size = 0
+        async for chunk in response.aiter_bytes():
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= MAX_RESULT_BYTES:
+                text = b"".join(chunks)[:MAX_RESULT_BYTES].decode("utf-8", errors="ignore")
+                return text + f"\n... [result truncated at {MAX_RESULT_BYTES} bytes]", False
+        return b"".join(chunks).decode(response.encoding or "utf-8", errors="replace"), True
+
+
+def normalize_question(question: str) -> str:
+    """Cache key: whitespace collapsed, case kept (it can matter in Genie / SQL questions)"""
+    return " ".join(question.split())
+
+
+def get_model():
+    """Lazy load the embedding model for the semantic cache"""
+    global _model
+    if _model is None:
+        _model = load_encoder(SEMANTIC_MODEL)
+    return _model
+
+
+def embed_question(key: str):
+    """Unit-length question vector, so a dot product is the cosine similarity"""
+    return get_model().encode(key, normalize_embeddings=True)
+
+
+def cached_answer(key: str, vector=None):
+    """Answer for an identical (or, given a vector, near-identical) recent question, or None"""
+    now = time.monotonic()
+    for expired in [k for k, (expires_at, _, _) in _answers.items() if expires_at <= now]:
+        del _answers[expired]
+
+    if key in _answers:
+        _answers.move_to_end(key)
+        _stats["hits"] += 1
+        return _answers[key][1]
+
+    if vector is not None:
+        best, best_similarity = None, SEMANTIC_MIN_SIMILARITY
+        for _, answer, other in _answers.values():
+            if other is not None:
+                similarity = float(vector @ other)
+                if similarity >= best_similarity:
+                    best, best_similarity = answer, similarity
+        if best is not None:
+            _stats["semantic_hits"] += 1
+            return best
+    return None
+
+
+def _finish(key: str, vector, task: asyncio.Task):
+    """Drop the in-flight entry and cache successful answers"""
+    _in_flight.pop(key, None)
+    if task.cancelled() or task.exception() is not None:
+        return
+    answer, cacheable = task.result()
+    if cacheable:
+        _answers[key] = (time.monotonic() + CACHE_TTL, answer, vector)
+        _answers.move_to_end(key)
+        while len(_answers) > CACHE_MAX_ENTRIES:
+            _answers.popitem(last=False)
+
 
 @mcp.tool()
 async def ask_genie(question: str) -> str:
     """Ask a natural language question about your data using Databricks Genie."""
-    async with httpx.AsyncClient(timeout=120.0) as client:
-        # Start conversation
-        response = await client.post(
-            f"{DATABRICKS_HOST}/api/2.0/genie/spaces/{GENIE_SPACE_ID}/start-conversation",
-            headers={"Authorization": f"Bearer {DATABRICKS_TOKEN}"},
-            json={"content": question}
-        )
-        response.raise_for_status()
-        data = response.json()
-
-        conversation_id = data["conversation_id"]
-        message_id = data["message_id"]
-
-        # Poll for completion
-        for _ in range(60):  # Max 60 attempts
-            status_response = await client.get(
-                f"{DATABRICKS_HOST}/api/2.0/genie/spaces/{GENIE_SPACE_ID}/conversations/{conversation_id}/messages/{message_id}",
-                headers={"Authorization": f"Bearer {DATABRICKS_TOKEN}"}
-            )
-            status_response.raise_for_status()
-            result = status_response.json()
-
-            status = result.get("status")
-
-            if status == "COMPLETED":
-                # Extract the response
-                attachments = result.get("attachments", [])
-                if attachments:
-                    # Get query result if available
-                    for att in attachments:
-                        if att.get("type") == "QUERY_RESULT":
-                            query_id = att.get("query", {}).get("query_id")
-                            if query_id:
-                                query_result = await client.get(
-                                    f"{DATABRICKS_HOST}/api/2.0/genie/spaces/{GENIE_SPACE_ID}/conversations/{conversation_id}/messages/{message_id}/query-result/{query_id}",
-                                    headers={"Authorization": f"Bearer {DATABRICKS_TOKEN}"}
-                                )
-                                return query_result.text
-                        elif att.get("type") == "TEXT":
-                            return att.get("text", {}).get("content", "No response content")
-                return "Query completed but no results returned"
-
-            elif status == "FAILED":
-                return f"Query failed: {result.get('error', 'Unknown error')}"
-
-            # Wait before polling again
-            await asyncio.sleep(2)
-
-        return "Query timed out after 120 seconds"
+    key = normalize_question(question)
+    answer = cached_answer(key)
+    if answer is not None:
+        return answer
+
+    vector = None
+    if SEMANTIC_CACHE:
+        vector = await asyncio.to_thread(embed_question, key)
+        answer = cached_answer(key, vector)
+        if answer is not None:
+            return answer
+
+    # Identical questions already in flight share one Genie conversation
+    task = _in_flight.get(key)
+    if task is not None:
+        _stats["coalesced"] += 1
+    else:
+        _stats["misses"] += 1
+        task = asyncio.ensure_future(_ask_genie(question))
+        task.add_done_callback(lambda t: _finish(key, vector, t))
+        _in_flight[key] = task
+
+    answer, _ = await asyncio.shield(task)
+    return answer
+
+
+@mcp.tool()
+async def genie_cache_stats() -> str:
+    """Report Genie answer cache usage (hits, near-duplicate hits, coalesced and new questions)."""
+    lookups = sum(_stats.values())
+    saved = _stats["hits"] + _stats["semantic_hits"] + _stats["coalesced"]
+    output = "Genie Answer Cache:\n" + "-" * 50
+    output += f"\nHits: {_stats['hits']}"
+    output += f"\nNear-duplicate hits: {_stats['semantic_hits']}" + ("" if SEMANTIC_CACHE else " (semantic cache off)")
+    output += f"\nCoalesced with in-flight: {_stats['coalesced']}"
+    output += f"\nMisses (new conversations): {_stats['misses']}"
+    output += f"\nSaved: {saved / lookups if lookups else 0.0:.1%}"
+    output += f"\nEntries: {len(_answers)} cached, {len(_in_flight)} in flight (TTL {CACHE_TTL:.0f}s)"
+    return output
+
+
+async def _ask_genie(question: str) -> tuple:
+    """Run one Genie conversation; returns (answer, cacheable)"""
+    client = get_client()
+
+    # Start conversation
+    response = await client.post("/start-conversation", json={"content": question})
+    response.raise_for_status()
+    data = response.json()
+
+    conversation_id = data["conversation_id"]
+    message_id = data["message_id"]
+    message_url = f"/conversations/{conversation_id}/messages/{message_id}"
+
+    # Poll for completion
+    deadline = time.monotonic() + POLL_TIMEOUT
+    for delay in poll_delays():
+        status_response = await client.get(message_url)
+        status_response.raise_for_status()
+        result = status_response.json()
+
+        status = result.get("status")
+
+        if status == "COMPLETED":
+            # Extract the response
+            attachments = result.get("attachments", [])
+            if attachments:
+                # Get query result if available
+                for att in attachments:
+                    if att.get("type") == "QUERY_RESULT":
+                        query_id = att.get("query", {}).get("query_id")
+                        if query_id:
+                            return await read_query_result(client, f"{message_url}/query-result/{query_id}")
+                    elif att.get("type") == "TEXT":
+                        return att.get("text", {}).get("content", "No response content"), True
+            return "Query completed but no results returned", True
+
+        elif status == "FAILED":
+            return f"Query failed: {result.get('error', 'Unknown error')}", False
+
+        # Wait before polling again
+        if time.monotonic() + delay > deadline:
+            break
+        await asyncio.sleep(delay)
+
+    return f"Query timed out after {POLL_TIMEOUT:.0f} seconds", False
 
 
 if __name__ == "__main__":
-    mcp.run()
\ No newline at end of file
+    mcp.run()
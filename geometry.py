@@ -0,0 +1,378 @@
+"""
+Sensor Geometry compiled from the coordinates table
+
+The coordinates table stores sensor positions, platform heading and lat/lon as text
+(or loosely typed numbers), so spatial questions were only answerable through
+semantic search on search_text. This module parses them once into per-platform
+float32 position arrays with a KD-tree over each, and answers:
+- sensors within R metres of a point or of another sensor
+- the k nearest sensors to a point or sensor
+- vectorized frame transforms for whole sensor sets:
+  local (+X/+Y/+Z of the platform) <-> enu (east/north/up about the platform
+  origin, rotated by the heading) <-> geo (latitude/longitude/up)
+
+Frame conventions:
+- heading_deg is the bearing of the platform +X axis, clockwise from True North
+- +Z is up and +Y lies 90 deg counter-clockwise of +X (right-handed), unless the
+  platform's +Z is described as "down", in which case +Y is 90 deg clockwise of +X
+- latitude/longitude are the platform origin; geo positions use a local tangent
+  plane, which is exact to well under a millimetre over a platform's extent
+- positions in m, mm, cm, km, ft or in are converted to metres; sensors without a
+  Z value are placed at Z=0 (shown as Z=N/A); sensors without X or Y, or with a
+  unit not listed in LENGTH_UNITS, are left out (unknown units are logged)
+- lat/lon accept signed degrees, degrees-minutes-seconds and N/S/E/W suffixes;
+  S and W are negative. Hemisphere letters are only read for lat/lon
+
+Positions are kept as float32 (sub-millimetre over hundreds of metres); transforms
+and lat/lon are computed in float64. The compiled geometry is rebuilt only when the
+table version changes.
+"""
+
+import heapq
+import logging
+import math
+import re
+
+import numpy as np
+
+GEOMETRY_COLUMNS = [
+    "platform_name", "platform_alias", "sensor_name", "x", "y", "z",
+    "coord_system_x", "coord_system_y", "coord_system_z", "heading_deg", "latitude", "longitude",
+]
+
+FRAMES = ["local", "enu", "geo"]
+
+EARTH_RADIUS_M = 6378137.0  # WGS84 equatorial radius
+LEAF_SIZE = 16
+
+_NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+# degrees, minutes and optional seconds: 29°45'30" or 29 deg 45'
+_DMS = re.compile(r"""([-+]?\d+(?:\.\d+)?)\s*(?:°|º|deg)\s*(\d+(?:\.\d+)?)\s*['′]\s*(?:(\d+(?:\.\d+)?)\s*(?:"|″|'')\s*)?""")
+
+# unit (lower case) -> factor to metres; positions with any other unit are left out
+LENGTH_UNITS = {
+    "": 1.0, "m": 1.0, "metre": 1.0, "metres": 1.0, "meter": 1.0, "meters": 1.0,
+    "mm": 0.001, "cm": 0.01, "km": 1000.0,
+    "ft": 0.3048, "feet": 0.3048, "foot": 0.3048, "'": 0.3048,
+    "in": 0.0254, "inch": 0.0254, "inches": 0.0254, '"': 0.0254,
+}
+ANGLE_UNITS = {"": 1.0, "°": 1.0, "º": 1.0, "deg": 1.0, "degs": 1.0, "degree": 1.0, "degrees": 1.0}
+
+log = logging.getLogger("lancedb.geometry")
+
+# (table name, table version, Geometry) of the last compiled geometry
+_geometry = None
+
+
+def parse_number(value, units: dict = LENGTH_UNITS):
+    """
+    Float from a number or text such as "12.5", "12.5 m" or "41 ft", scaled by its unit's
+    factor in units (lengths come out in metres); None if absent or the unit is unknown
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return None if math.isnan(value) else float(value)
+    text = str(value).strip()
+    match = _NUMBER.search(text)
+    if not match:
+        return None
+    unit = text[match.end():].strip()
+    factor = units.get(unit.lower().rstrip("."))
+    if factor is None:
+        log.warning("Ignoring %r: unknown unit %r", text, unit)
+        return None
+    return float(match.group()) * factor
+
+
+def parse_angle(value, hemispheres: str = ""):
+    """
+    Degrees from a number or text such as "45", "45°", "29.75 S" or "29°45'30\" S";
+    hemispheres lists the letters allowed ("NS" for latitude, "EW" for longitude) and
+    S/W make the angle negative. None if absent or not an angle
+    """
+    if value is None or isinstance(value, (int, float)):
+        return parse_number(value)
+    text = str(value).strip()
+    hemisphere = ""
+    for letter in (text[-1:].upper(), text[:1].upper()):
+        if letter and letter in hemispheres.upper():
+            hemisphere = letter
+            text = text[:-1] if text[-1:].upper() == letter else text[1:]
+            text = text.strip()
+            break
+    dms = _DMS.match(text)
+    if dms:
+        degrees, minutes, seconds = (float(part or 0) for part in dms.groups())
+        angle = math.copysign(abs(degrees) + minutes / 60 + seconds / 3600, degrees)
+    else:
+        angle = parse_number(text, ANGLE_UNITS)
+    if angle is not None and hemisphere in ("S", "W"):
+        angle = -abs(angle)
+    return angle
+
+
+class KDTree:
+    """Static 3-d KD-tree with bounding-box pruning over a float32 point array"""
+
+    def __init__(self, points: np.ndarray, leaf_size: int = LEAF_SIZE):
+        self.points = points
+        self.order = np.arange(len(points))
+        # Per node: [start, end) into order, children (-1 for leaves), bounding box
+        self.start, self.end, self.left, self.right, self.low, self.high = [], [], [], [], [], []
+        if len(points):
+            self._build(leaf_size)
+        self.low = np.asarray(self.low, dtype=np.float32).reshape(-1, 3)
+        self.high = np.asarray(self.high, dtype=np.float32).reshape(-1, 3)
+
+    def _build(self, leaf_size: int):
+        stack = [(self._node(0, len(self.points)), 0, len(self.points))]
+        while stack:
+            node, start, end = stack.pop()
+            if end - start <= leaf_size:
+                continue
+            block = self.points[self.order[start:end]]
+            axis = int(np.argmax(self.high[node] - self.low[node]))
+            self.order[start:end] = self.order[start:end][np.argsort(block[:, axis], kind="stable")]
+            middle = (start + end) // 2
+            self.left[node] = self._node(start, middle)
+            self.right[node] = self._node(middle, end)
+            stack.append((self.left[node], start, middle))
+            stack.append((self.right[node], middle, end))
+
+    def _node(self, start: int, end: int) -> int:
+        block = self.points[self.order[start:end]]
+        self.start.append(start)
+        self.end.append(end)
+        self.left.append(-1)
+        self.right.append(-1)
+        self.low.append(block.min(axis=0))
+        self.high.append(block.max(axis=0))
+        return len(self.start) - 1
+
+    def _box_distance2(self, node: int, point: np.ndarray) -> float:
+        gap = np.maximum(0.0, np.maximum(self.low[node] - point, point - self.high[node]))
+        return float(gap @ gap)
+
+    def _leaf(self, node: int, point: np.ndarray):
+        indices = self.order[self.start[node]:self.end[node]]
+        diff = self.points[indices] - point
+        return indices, np.einsum("ij,ij->i", diff, diff)
+
+    def within(self, point, radius: float) -> list:
+        """[(index, distance)] of points within radius, nearest first"""
+        point = np.asarray(point, dtype=np.float32)
+        limit = radius * radius
+        found = []
+        stack = [0] if len(self.points) else []
+        while stack:
+            node = stack.pop()
+            if self._box_distance2(node, point) > limit:
+                continue
+            if self.left[node] < 0:
+                indices, distances = self._leaf(node, point)
+                keep = distances <= limit
+                found.extend(zip(indices[keep].tolist(), distances[keep].tolist()))
+            else:
+                stack.extend((self.left[node], self.right[node]))
+        return [(i, math.sqrt(d)) for d, i in sorted((d, i) for i, d in found)]
+
+    def nearest(self, point, k: int) -> list:
+        """[(index, distance)] of the k nearest points, nearest first"""
+        point = np.asarray(point, dtype=np.float32)
+        best = []  # max-heap of (-distance², index)
+        queue = [(0.0, 0)] if len(self.points) and k > 0 else []
+        while queue:
+            bound, node = heapq.heappop(queue)
+            if len(best) == k and bound > -best[0][0]:
+                break
+            if self.left[node] < 0:
+                indices, distances = self._leaf(node, point)
+                for i, d in zip(indices.tolist(), distances.tolist()):
+                    if len(best) < k:
+                        heapq.heappush(best, (-d, i))
+                    elif d < -best[0][0]:
+                        heapq.heapreplace(best, (-d, i))
+            else:
+                for child in (self.left[node], self.right[node]):
+                    heapq.heappush(queue, (self._box_distance2(child, point), child))
+        return [(i, math.sqrt(-d)) for d, i in sorted(best, reverse=True)]
+
+
+class PlatformGeometry:
+    """Sensor positions of one platform in its local frame, with a KD-tree"""
+
+    def __init__(self, platform_name: str, rows: list):
+        self.platform_name = platform_name
+        self.platform_alias = next((r.get("platform_alias") for r in rows if r.get("platform_alias")), "")
+        self.axes = {axis: next((str(r.get(f"coord_system_{axis}")) for r in rows
+                                 if r.get(f"coord_system_{axis}")), "") for axis in "xyz"}
+        self.z_down = "down" in self.axes["z"].lower()
+
+        def first(column, hemispheres=""):
+            values = (parse_angle(r.get(column), hemispheres) for r in rows)
+            return next((v for v in values if v is not None), None)
+
+        self.heading_deg = first("heading_deg")
+        self.latitude = first("latitude", "NS")
+        self.longitude = first("longitude", "EW")
+
+        self.names, positions, has_z = [], [], []
+        for row in rows:
+            x, y, z = (parse_number(row.get(axis)) for axis in "xyz")
+            if not row.get("sensor_name") or x is None or y is None:
+                continue  # unplaced sensor
+            self.names.append(row["sensor_name"])
+            positions.append((x, y, z or 0.0))
+            has_z.append(z is not None)
+        self.positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+        self.has_z = np.asarray(has_z, dtype=bool)
+        self.ids = {" ".join(n.split()).lower(): i for i, n in enumerate(self.names)}
+        self.tree = KDTree(self.positions)
+
+    def find(self, sensor: str):
+        """Index of a sensor by exact (case-insensitive) name, or None"""
+        return self.ids.get(" ".join(sensor.split()).lower())
+
+    def _rotation(self) -> np.ndarray:
+        """3x3 matrix taking local (x, y, z) to (east, north, up)"""
+        if self.heading_deg is None:
+            raise ValueError(f"Platform '{self.platform_name}' has no heading_deg; cannot leave the local frame")
+        h = math.radians(self.heading_deg)
+        sin, cos = math.sin(h), math.cos(h)
+        if self.z_down:  # +Y is 90 deg clockwise of +X, +Z points down
+            return np.array([[sin, cos, 0.0], [cos, -sin, 0.0], [0.0, 0.0, -1.0]])
+        return np.array([[sin, -cos, 0.0], [cos, sin, 0.0], [0.0, 0.0, 1.0]])
+
+    def _origin(self):
+        if self.latitude is None or self.longitude is None:
+            raise ValueError(f"Platform '{self.platform_name}' has no latitude/longitude; cannot use the geo frame")
+        return self.latitude, self.longitude
+
+    def transform(self, points, source: str, target: str) -> np.ndarray:
+        """(n, 3) points from one frame to another (geo columns: latitude, longitude, up)"""
+        for frame in (source, target):
+            if frame not in FRAMES:
+                raise ValueError(f"Unknown frame '{frame}'; use one of {', '.join(FRAMES)}")
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if source == target:
+            return points
+
+        if source == "geo":
+            lat0, lon0 = self._origin()
+            enu = np.column_stack([
+                np.radians(points[:, 1] - lon0) * EARTH_RADIUS_M * math.cos(math.radians(lat0)),
+                np.radians(points[:, 0] - lat0) * EARTH_RADIUS_M,
+                points[:, 2],
+            ])
+        elif source == "local":
+            enu = points @ self._rotation().T
+        else:
+            enu = points
+
+        if target == "enu":
+            return enu
+        if target == "local":
+            return enu @ self._rotation()  # rotations are orthonormal: inverse = transpose
+        lat0, lon0 = self._origin()
+        return np.column_stack([
+            lat0 + np.degrees(enu[:, 1] / EARTH_RADIUS_M),
+            lon0 + np.degrees(enu[:, 0] / (EARTH_RADIUS_M * math.cos(math.radians(lat0)))),
+            enu[:, 2],
+        ])
+
+    def locate(self, sensor: str = "", point=None, frame: str = "local"):
+        """Local-frame query point from a sensor name or a point given in frame"""
+        if sensor:
+            index = self.find(sensor)
+            if index is None:
+                raise ValueError(f"No placed sensor named '{sensor}' on platform '{self.platform_name}'")
+            return self.positions[index]
+        if point is None or len(point) != 3:
+            raise ValueError("Give a sensor name or a point of three coordinates")
+        return self.transform([point], frame, "local")[0].astype(np.float32)
+
+
+class Geometry:
+    """Per-platform sensor geometry, addressable by actual platform name or alias"""
+
+    def __init__(self, rows: list):
+        grouped = {}
+        for row in rows:
+            if row.get("platform_name"):
+                grouped.setdefault(row["platform_name"], []).append(row)
+        self.platforms = {name: PlatformGeometry(name, group) for name, group in grouped.items()}
+        self.aliases = {g.platform_alias: name for name, g in self.platforms.items() if g.platform_alias}
+
+    def platform(self, platform: str):
+        """PlatformGeometry for an actual name or alias, or None"""
+        return self.platforms.get(platform) or self.platforms.get(self.aliases.get(platform, ""))
+
+
+def get_geometry(table) -> Geometry:
+    """Compiled sensor geometry for the coordinates table, rebuilt on a new table version"""
+    global _geometry
+    if _geometry is None or _geometry[0] != table.name or _geometry[1] != table.version:
+        columns = [c for c in GEOMETRY_COLUMNS if c in table.schema.names]
+        rows = table.to_lance().to_table(columns=columns).to_pylist()
+        _geometry = (table.name, table.version, Geometry(rows))
+    return _geometry[2]
+
+
+def _position(geometry: PlatformGeometry, index: int) -> str:
+    x, y, z = geometry.positions[index].tolist()
+    return f"X={x:.3f}, Y={y:.3f}, Z={f'{z:.3f}' if geometry.has_z[index] else 'N/A'}"
+
+
+def _origin_label(sensor: str, point, frame: str) -> str:
+    return f"'{sensor}'" if sensor else f"{frame} point ({', '.join(f'{v:g}' for v in point)})"
+
+
+def format_within(geometry: PlatformGeometry, radius: float, sensor: str = "", point=None,
+                  frame: str = "local") -> str:
+    """Sensors within radius metres of a sensor or point"""
+    center = geometry.locate(sensor, point, frame)
+    hits = [(i, d) for i, d in geometry.tree.within(center, radius) if not (sensor and i == geometry.find(sensor))]
+    output = (f"Sensors within {radius:g} m of {_origin_label(sensor, point, frame)} "
+              f"on {geometry.platform_name}: {len(hits)}")
+    for rank, (i, distance) in enumerate(hits, 1):
+        output += f"\n[{rank}] {geometry.names[i]}  {distance:.3f} m  ({_position(geometry, i)})"
+    return output
+
+
+def format_nearest(geometry: PlatformGeometry, k: int, sensor: str = "", point=None, frame: str = "local") -> str:
+    """The k nearest sensors to a sensor or point"""
+    center = geometry.locate(sensor, point, frame)
+    exclude = geometry.find(sensor) if sensor else None
+    hits = [(i, d) for i, d in geometry.tree.nearest(center, k + (exclude is not None)) if i != exclude][:k]
+    if not hits:
+        return f"No placed sensors found for platform '{geometry.platform_name}'."
+    output = f"Nearest sensors to {_origin_label(sensor, point, frame)} on {geometry.platform_name}:"
+    for rank, (i, distance) in enumerate(hits, 1):
+        output += f"\n[{rank}] {geometry.names[i]}  {distance:.3f} m  ({_position(geometry, i)})"
+    return output
+
+
+def format_transform(geometry: PlatformGeometry, sensors: list = None, frame: str = "enu") -> str:
+    """Sensor positions (all, or the named ones) transformed from the local frame to frame"""
+    if sensors:
+        indices = [geometry.find(s) for s in sensors]
+        missing = [s for s, i in zip(sensors, indices) if i is None]
+        if missing:
+            return f"No placed sensor(s) named {', '.join(repr(s) for s in missing)} on platform '{geometry.platform_name}'."
+    else:
+        indices = list(range(len(geometry.names)))
+    if not indices:
+        return f"No placed sensors found for platform '{geometry.platform_name}'."
+
+    points = geometry.transform(geometry.positions[indices], "local", frame)
+    labels = {"local": ("X", "Y", "Z"), "enu": ("East", "North", "Up"), "geo": ("Lat", "Lon", "Up")}[frame]
+    output = f"{geometry.platform_name} sensors in the {frame} frame"
+    output += f" (heading {geometry.heading_deg:g} deg, +Z {'down' if geometry.z_down else 'up'})" \
+        if geometry.heading_deg is not None else ""
+    output += ":\n" + "-" * 50
+    for i, values in zip(indices, points.tolist()):
+        digits = (7, 7, 3) if frame == "geo" else (3, 3, 3)
+        coords = ", ".join(f"{label}={v:.{n}f}" for label, v, n in zip(labels, values, digits))
+        output += f"\n{geometry.names[i]}: {coords}"
+    return output
@@ -0,0 +1,196 @@
+"""
+Vector, Full-Text (BM25) and Hybrid Search
+
+Every table stores a search_text column next to the vector. Semantic-only search is
+weak on unit codes, tag names and part numbers, so each search tool takes a mode:
+- vector: embedding similarity (default, previous behaviour)
+- fts:    BM25 full-text search on search_text; never loads the embedding model
+- hybrid: both, fused with reciprocal-rank fusion (RRF)
+
+Searches only project the columns the caller formats (never the vector), long text is
+cut to a snippet by Lance itself (snippet_columns; in Python when this Lance version
+cannot evaluate those projections), and vector / fts results come back as Arrow
+tables; to_rows() turns just the first `limit` rows into dicts for formatting.
+"""
+
+import re
+
+import pyarrow as pa
+
+from metrics import note, timed
+from scalar_index import apply_filters
+from vector_index import indexed_columns, tune_search
+
+SEARCH_MODES = ["vector", "fts", "hybrid"]
+FTS_COLUMN = "search_text"
+
+# RRF constant (score = sum of 1 / (RRF_K + rank)) and candidates fetched per list
+RRF_K = 60
+HYBRID_MIN_CANDIDATES = 20
+
+# Characters of long text returned per result, and how many of them precede the best match
+SNIPPET_CHARS = 500
+SNIPPET_LEAD = 150
+SNIPPET_STOPWORDS = {"the", "and", "for", "with", "how", "what", "does", "from", "this", "that", "are", "was"}
+
+# Whether Lance evaluates the snippet SQL (substr/strpos/greatest/nullif); None = not probed yet
+_snippet_sql = None
+
+
+def build_fts_index(table, rebuild: bool = False) -> str:
+    """Build the BM25 full-text index on search_text"""
+    if FTS_COLUMN not in table.schema.names:
+        return f"skipped: no {FTS_COLUMN} column"
+    if not rebuild and FTS_COLUMN in indexed_columns(table):
+        return "skipped: full-text index already exists (use --rebuild)"
+    table.create_fts_index(FTS_COLUMN, replace=True)
+    return f"built on {FTS_COLUMN}"
+
+
+def _snippet_terms(query: str) -> list:
+    """Longest (up to 4) non-stopword query terms, in the order they are looked for"""
+    return sorted({t for t in re.findall(r"\w+", query.lower()) if len(t) >= 3 and t not in SNIPPET_STOPWORDS},
+                  key=len, reverse=True)[:4]
+
+
+def snippet_columns(column: str, query: str, width: int = SNIPPET_CHARS, lead: int = SNIPPET_LEAD) -> dict:
+    """
+    Projections cutting a `width`-character window of `column` around the first
+    occurrence of the longest query terms (or its start). Lance evaluates them, so the
+    full text is never materialized in Python.
+    """
+    terms = _snippet_terms(query)
+    hits = ", ".join(f"nullif(strpos(lower({column}), '{t}'), 0)" for t in terms)  # \w+ has no quotes
+    start = f"greatest(1, coalesce({hits}, 1) - {lead})" if terms else "1"
+    return {
+        "snippet": f"substr({column}, {start}, {width})",
+        "snippet_start": start,
+        "content_length": f"length({column})",
+    }
+
+
+def cut_snippet(row: dict, column: str, query: str, width: int = SNIPPET_CHARS, lead: int = SNIPPET_LEAD) -> dict:
+    """snippet_columns computed in Python: the row with `column` replaced by the same snippet fields"""
+    row = dict(row)
+    text = row.pop(column, None) or ""
+    lowered = text.lower()
+    hit = next((lowered.find(t) + 1 for t in _snippet_terms(query) if t in lowered), 1)
+    start = max(1, hit - lead)  # 1-based, as in SQL
+    row.update(snippet=text[start - 1:start - 1 + width], snippet_start=start, content_length=len(text))
+    return row
+
+
+def _snippets_in_lance(table, column: str) -> bool:
+    """Whether this Lance version evaluates the snippet_columns projections (checked once per process)"""
+    global _snippet_sql
+    if _snippet_sql is None:
+        try:
+            table.search().select(snippet_columns(column, "snippet probe")).limit(1).to_arrow()
+            _snippet_sql = True
+        except Exception:
+            _snippet_sql = False
+    return _snippet_sql
+
+
+def snippet_search(table, query: str, filters: list, limit: int, mode: str, nprobes: int, refine_factor: int,
+                   embed, columns: dict, column: str = "content"):
+    """
+    run_search returning a snippet of `column` (snippet, snippet_start, content_length)
+    instead of the column: cut by Lance when it supports the projections, else cut in
+    Python from the full column
+    """
+    if _snippets_in_lance(table, column):
+        return run_search(table, query, filters, limit, mode, nprobes, refine_factor, embed,
+                          {**columns, **snippet_columns(column, query)})
+    note("snippets", "python")
+    results = run_search(table, query, filters, limit, mode, nprobes, refine_factor, embed,
+                         {**columns, column: column})
+    return [cut_snippet(r, column, query) for r in (results if isinstance(results, list) else results.to_pylist())]
+
+
+def format_snippet(row: dict) -> str:
+    """Snippet text with ... where content was cut before or after it"""
+    text = row.get("snippet") or ""
+    start = row.get("snippet_start") or 1
+    prefix = "..." if start > 1 else ""
+    suffix = "..." if start - 1 + len(text) < (row.get("content_length") or 0) else ""
+    return f"{prefix}{text}{suffix}"
+
+
+def to_rows(results, limit: int) -> list:
+    """First `limit` rows of a search result (Arrow table or list of dicts) as dicts"""
+    if isinstance(results, list):
+        return results[:limit]
+    return results.slice(0, limit).to_pylist()
+
+
+def fts_search(table, query: str, filters: list, limit: int, with_row_id: bool = False,
+               columns=None) -> pa.Table:
+    """BM25 search on search_text with filters applied first"""
+    search = table.search(query, query_type="fts")
+    if columns:
+        search = search.select(columns)
+    if filters:
+        search = search.where(" AND ".join(filters), prefilter=True)
+    if with_row_id:
+        search = search.with_row_id(True)
+    try:
+        return search.limit(limit).to_arrow()
+    except Exception as e:
+        raise RuntimeError(
+            f"Full-text search on '{table.name}' failed ({e}); "
+            f"build the index with `python lancedb_cli.py index`"
+        ) from e
+
+
+def rrf_fuse(ranked_lists: list, limit: int, k: int = RRF_K) -> list:
+    """
+    Reciprocal-rank fusion of several ranked result lists (rows keyed by _rowid). Rows
+    keep the columns of the list that found them first, so _score / _distance vary
+    from row to row; only _rrf_score is comparable.
+    """
+    scores, rows = {}, {}
+    for results in ranked_lists:
+        for rank, row in enumerate(results, 1):
+            key = row["_rowid"]
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            rows.setdefault(key, row)
+
+    order = sorted(scores, key=scores.get, reverse=True)[:limit]
+    return [dict(rows[key], _rrf_score=scores[key]) for key in order]
+
+
+def run_search(table, query: str, filters: list, limit: int, mode: str = "vector",
+               nprobes: int = 0, refine_factor: int = 0, embed=None, columns=None):
+    """
+    Run a search in the given mode and return up to `limit` rows: an Arrow table for
+    vector and fts, the fused list of dicts for hybrid (rows from the two lists have
+    different score columns, so no single Arrow schema fits them).
+
+    embed(query) -> vector is only called for the vector and hybrid modes. columns is
+    a list of column names or {name: SQL expression} to project (default all columns).
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode '{mode}' (expected one of {', '.join(SEARCH_MODES)})")
+
+    note("filters", filters)
+    if mode == "fts":
+        with timed("search"):
+            return fts_search(table, query, filters, limit, columns=columns)
+
+    fetch = limit if mode == "vector" else max(limit * 2, HYBRID_MIN_CANDIDATES)
+    query_vector = embed(query)
+    with timed("search"):
+        search = tune_search(table.search(query_vector), nprobes, refine_factor)
+        if columns:
+            search = search.select(columns)
+        if mode == "hybrid":
+            search = search.with_row_id(True)
+        search = apply_filters(table, search, filters, fetch)
+        note("search", search)
+        vector_rows = search.to_arrow().slice(0, fetch)
+
+        if mode == "vector":
+            return vector_rows
+        fts_rows = fts_search(table, query, filters, fetch, with_row_id=True, columns=columns)
+        return rrf_fuse([vector_rows.to_pylist(), fts_rows.to_pylist()], limit)
@@ -0,0 +1,533 @@
+"""
+Incremental, streaming ingestion of ChanDefResources/ into channel_summary_vectordb
+
+Source layout (platform = first sub-directory, or the file stem for top-level files):
+- ChannelDefinitions/<platform>.csv        -> descriptions
+- ChannelDependency/<platform>.json        -> dependencies
+- CoordinateSystems/<platform>.json|.csv   -> coordinates
+- OandM/<platform>/<manual>.pdf|.txt|.md   -> oandm_manuals (chunked)
+
+Each table is built as a stream: parse -> hash -> batched encode -> merge_insert.
+1. Files whose mtime and size match the manifest are skipped without being read
+2. Changed files are parsed on a process pool (all cores), a bounded number at a time,
+   so only a few files' rows are ever in memory
+3. Every row gets a deterministic id and a content hash; rows whose hash is unchanged
+   are never re-encoded or re-written
+4. New/changed rows are encoded in fixed-size batches and merge_insert-ed on id;
+   rows that disappeared from a file (or whose file was removed) are deleted
+
+The manifest (file stats and row hashes) lives in SQLite next to the embedding cache.
+A table that exists without manifest entries (built by other tooling), or whose
+schema differs from the parsed rows, is refused rather than merged into: its ids
+would never match, so every row would be duplicated. Ingest it with --rebuild.
+Coordinates keep the source text of x/y/z, latitude, longitude and heading, as the
+stored table does. Vectors must be fp32 like the stored ones (the CLI pins ingest to
+an fp32 encoder).
+"""
+
+import csv
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+
+from scalar_index import quote
+
+SOURCE_DIR = Path(__file__).parent / "ChanDefResources"
+ALIASES_PATH = Path(__file__).parent / "data" / "platform_names.json"
+MANIFEST_PATH = os.environ.get(
+    "LANCEDB_INGEST_MANIFEST", str(Path(__file__).parent / ".cache" / "ingest_manifest.sqlite")
+)
+
+PARSE_WORKERS = int(os.environ.get("LANCEDB_PARSE_WORKERS", str(os.cpu_count() or 1)))
+ENCODE_BATCH_SIZE = 256
+
+# O&M chunking (characters), overlapping so sentences split at a boundary stay searchable
+CHUNK_SIZE = 1500
+CHUNK_OVERLAP = 200
+
+
+def _key(name: str) -> str:
+    """Header / field name normalization: 'Chan Units' -> 'chanunits'"""
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def _pick(record: dict, *names, default=""):
+    """First non-empty value among several spellings of a field"""
+    for name in names:
+        value = record.get(name)
+        if value not in (None, ""):
+            return value
+    return default
+
+
+def _text(value) -> str:
+    """Source value as the stored text ("29.75 S", "12.5" ...; "" if absent)"""
+    return "" if value is None else str(value).strip()
+
+
+def _names(value) -> list:
+    """inputs/outputs as a list, from either a JSON list or a comma-joined string"""
+    if isinstance(value, list):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [v.strip() for v in str(value or "").split(",") if v.strip()]
+
+
+def _read_csv(path: Path) -> list:
+    with open(path, newline="", encoding="utf-8-sig", errors="replace") as f:
+        return [{_key(k): (v or "").strip() for k, v in row.items() if k} for row in csv.DictReader(f)]
+
+
+def _read_json_records(path: Path, *keys) -> tuple:
+    """(top-level object, list of records) from a JSON list or an object holding one"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return {}, data
+    for key in keys:
+        if isinstance(data.get(key), list):
+            return data, data[key]
+    return data, []
+
+
+def _search_text(*parts) -> str:
+    return " | ".join(str(p) for p in parts if p not in (None, ""))
+
+
+def parse_channel_definitions(path: Path, platform: str, alias: str) -> list:
+    """Channel definition CSV -> descriptions rows"""
+    rows = []
+    for record in _read_csv(path):
+        channame = _pick(record, "channame", "channelname", "name")
+        if not channame:
+            continue
+        row = {
+            "platform_name": platform,
+            "platform_alias": alias,
+            "system": _pick(record, "system"),
+            "device": _pick(record, "device"),
+            "channo": _pick(record, "channo", "channelnumber", "channel", "number"),
+            "channame": channame,
+            "chanunits": _pick(record, "chanunits", "units", "unit"),
+            "description": _pick(record, "description", "definition", "desc"),
+        }
+        row["search_text"] = _search_text(row["channame"], row["description"], row["chanunits"],
+                                          row["device"], row["system"])
+        row["_key"] = (row["device"], row["channo"] or row["channame"])
+        rows.append(row)
+    return rows
+
+
+def parse_dependencies(path: Path, platform: str, alias: str) -> list:
+    """Dependency JSON (list of nodes, or {"nodes": [...]}) -> dependencies rows"""
+    top, records = _read_json_records(path, "nodes", "channels", "dependencies")
+    rows = []
+    for record in records:
+        record = {_key(k): v for k, v in record.items()}
+        name = str(_pick(record, "name", "channame", "channelname"))
+        if not name:
+            continue
+        inputs = _names(record.get("inputs"))
+        outputs = _names(record.get("outputs"))
+        row = {
+            "platform_name": platform,
+            "platform_alias": alias,
+            "system": str(_pick(record, "system", default=top.get("system", ""))),
+            "node_id": str(_pick(record, "nodeid", "id", default=name)),
+            "node_type": str(_pick(record, "nodetype", "type")),
+            "name": name,
+            "units": str(_pick(record, "units", "unit")),
+            "category": str(_pick(record, "category")),
+            "device": str(_pick(record, "device")),
+            "inputs": ", ".join(inputs),
+            "outputs": ", ".join(outputs),
+            "input_count": len(inputs),
+            "output_count": len(outputs),
+        }
+        row["search_text"] = _search_text(name, row["category"], row["units"], row["device"],
+                                          row["inputs"] and f"inputs: {row['inputs']}")
+        row["_key"] = (row["node_id"],)
+        rows.append(row)
+    return rows
+
+
+def parse_coordinates(path: Path, platform: str, alias: str) -> list:
+    """
+    Coordinate system JSON ({platform fields..., "sensors": [...]}) or CSV (one sensor
+    per row with the platform fields repeated) -> coordinates rows
+    """
+    if path.suffix.lower() == ".csv":
+        top, records = {}, _read_csv(path)
+    else:
+        top, records = _read_json_records(path, "sensors")
+        top = {_key(k): v for k, v in top.items() if not isinstance(v, list)}
+        system = top.pop("coordsystem", None)
+        if isinstance(system, dict):
+            top.update({f"coordsystem{_key(k)}": v for k, v in system.items()})
+
+    rows = []
+    for record in records:
+        record = {**top, **{_key(k): v for k, v in record.items()}}
+        sensor = str(_pick(record, "sensorname", "sensor", "name"))
+        if not sensor:
+            continue
+        row = {
+            "platform_name": platform,
+            "platform_alias": alias,
+            "latitude": _text(record.get("latitude")),
+            "longitude": _text(record.get("longitude")),
+            "heading_deg": _text(_pick(record, "headingdeg", "heading")),
+            "coord_system_x": str(_pick(record, "coordsystemx")),
+            "coord_system_y": str(_pick(record, "coordsystemy")),
+            "coord_system_z": str(_pick(record, "coordsystemz")),
+            "sensor_name": sensor,
+            "x": _text(record.get("x")),
+            "y": _text(record.get("y")),
+            "z": _text(record.get("z")),
+        }
+        row["search_text"] = _search_text(sensor, f"{platform} coordinate system",
+                                          f"+X {row['coord_system_x']}", f"+Y {row['coord_system_y']}",
+                                          f"+Z {row['coord_system_z']}")
+        row["_key"] = (sensor,)
+        rows.append(row)
+    return rows
+
+
+def chunk_text(text: str, size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> list:
+    """Split text into ~size-character chunks on whitespace, overlapping by ~overlap"""
+    words = text.split()
+    chunks, current, length = [], [], 0
+    fresh = False  # words appended since the last chunk (the carried tail alone is not new)
+    for word in words:
+        current.append(word)
+        length += len(word) + 1
+        fresh = True
+        if length >= size:
+            chunks.append(" ".join(current))
+            # carry the tail of this chunk into the next one
+            tail, tail_length = [], 0
+            while current and tail_length < overlap:
+                tail_length += len(current[-1]) + 1
+                tail.insert(0, current.pop())
+            current, length, fresh = tail, tail_length, False
+    if fresh:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _read_manual(path: Path) -> str:
+    if path.suffix.lower() == ".pdf":
+        from pypdf import PdfReader
+        return "\n".join(page.extract_text() or "" for page in PdfReader(str(path)).pages)
+    return path.read_text(encoding="utf-8", errors="replace")
+
+
+def parse_manual(path: Path, platform: str, alias: str) -> list:
+    """O&M manual (PDF or text) -> oandm_manuals chunk rows"""
+    chunks = chunk_text(_read_manual(path))
+    return [
+        {
+            "platform_name": platform,
+            "document_name": path.name,
+            "chunk_id": i,
+            "total_chunks": len(chunks),
+            "content": content,
+            "source_path": str(path),
+            "search_text": content,
+            "_key": (path.name, i),
+        }
+        for i, content in enumerate(chunks)
+    ]
+
+
+# table -> (source sub-directory, file patterns, parser)
+SOURCES = {
+    "descriptions": ("ChannelDefinitions", ("*.csv",), parse_channel_definitions),
+    "dependencies": ("ChannelDependency", ("*.json",), parse_dependencies),
+    "coordinates": ("CoordinateSystems", ("*.json", "*.csv"), parse_coordinates),
+    "oandm_manuals": ("OandM", ("*.pdf", "*.txt", "*.md"), parse_manual),
+}
+
+
+def load_platform_aliases(path: Path = ALIASES_PATH) -> dict:
+    """Actual platform name -> alias from data/platform_names.json ({} if absent)"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if isinstance(data, dict) and isinstance(data.get("platforms"), list):
+        data = data["platforms"]
+    if isinstance(data, list):
+        return {p["actual"]: p.get("alias", "") for p in data if isinstance(p, dict) and "actual" in p}
+    return {k: v for k, v in data.items() if isinstance(v, str)}
+
+
+def _finish_rows(table_name: str, platform: str, rows: list) -> list:
+    """Deterministic ids and content hashes (computed before the vector exists), one row per id"""
+    for row in rows:
+        key = row.pop("_key")
+        row["id"] = hashlib.sha1(json.dumps([table_name, platform, *key]).encode()).hexdigest()[:20]
+        row["_hash"] = hashlib.sha1(json.dumps(row, sort_keys=True, default=str).encode()).hexdigest()
+    return list({row["id"]: row for row in rows}.values())  # last definition of a key wins
+
+
+def _parse_file(table_name: str, path: str, platform: str, alias: str) -> tuple:
+    """Worker entry point: (path, rows, error)"""
+    try:
+        rows = SOURCES[table_name][2](Path(path), platform, alias)
+        return path, _finish_rows(table_name, platform, rows), None
+    except Exception as e:
+        return path, [], f"{type(e).__name__}: {e}"
+
+
+class IngestManifest:
+    """File stats and per-row content hashes from previous ingests"""
+
+    def __init__(self, path: str = MANIFEST_PATH):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " table_name TEXT NOT NULL, path TEXT NOT NULL, mtime REAL NOT NULL, size INTEGER NOT NULL,"
+            " PRIMARY KEY (table_name, path))"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS rows ("
+            " table_name TEXT NOT NULL, id TEXT NOT NULL, path TEXT NOT NULL, hash TEXT NOT NULL,"
+            " PRIMARY KEY (table_name, id))"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS rows_by_path ON rows (table_name, path)")
+        self.conn.commit()
+
+    def files(self, table_name: str) -> dict:
+        return {
+            path: (mtime, size)
+            for path, mtime, size in self.conn.execute(
+                "SELECT path, mtime, size FROM files WHERE table_name = ?", (table_name,)
+            )
+        }
+
+    def row_hashes(self, table_name: str, path: str) -> dict:
+        return dict(self.conn.execute(
+            "SELECT id, hash FROM rows WHERE table_name = ? AND path = ?", (table_name, path)
+        ))
+
+    def record_file(self, table_name: str, path: str, stat, rows: list):
+        """Replace a file's entry and row hashes (call after its rows are written)"""
+        self.conn.execute("DELETE FROM rows WHERE table_name = ? AND path = ?", (table_name, path))
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO rows (table_name, id, path, hash) VALUES (?, ?, ?, ?)",
+            [(table_name, row_id, path, row_hash) for row_id, row_hash in rows],
+        )
+        if stat is None:
+            self.conn.execute("DELETE FROM files WHERE table_name = ? AND path = ?", (table_name, path))
+        else:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO files (table_name, path, mtime, size) VALUES (?, ?, ?, ?)",
+                (table_name, path, stat.st_mtime, stat.st_size),
+            )
+        self.conn.commit()
+
+    def forget(self, table_name: str):
+        self.conn.execute("DELETE FROM rows WHERE table_name = ?", (table_name,))
+        self.conn.execute("DELETE FROM files WHERE table_name = ?", (table_name,))
+        self.conn.commit()
+
+
+def source_files(table_name: str, source_dir: Path = SOURCE_DIR) -> list:
+    """(path, platform) for every source file of a table"""
+    subdir, patterns, _ = SOURCES[table_name]
+    root = source_dir / subdir
+    files = {path for pattern in patterns for path in root.rglob(pattern)} if root.is_dir() else set()
+    result = []
+    for path in sorted(files):
+        parts = path.relative_to(root).parts
+        result.append((path, parts[0] if len(parts) > 1 else path.stem))
+    return result
+
+
+def _parse_stream(table_name: str, jobs: list, aliases: dict, workers: int):
+    """Yield (path, rows, error) as files finish parsing, keeping at most 2 x workers in flight"""
+    if workers <= 1:
+        for path, platform in jobs:
+            yield _parse_file(table_name, str(path), platform, aliases.get(platform, ""))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = iter(jobs)
+        pending = set()
+        while True:
+            for path, platform in jobs:
+                pending.add(pool.submit(_parse_file, table_name, str(path), platform, aliases.get(platform, "")))
+                if len(pending) >= 2 * workers:
+                    break
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+class SchemaMismatch(ValueError):
+    """Parsed rows do not fit the existing table's columns / types"""
+
+
+def _kind(data_type) -> str:
+    import pyarrow as pa
+
+    for kind, test in (("string", pa.types.is_string), ("string", pa.types.is_large_string),
+                       ("integer", pa.types.is_integer), ("float", pa.types.is_floating),
+                       ("null", pa.types.is_null)):
+        if test(data_type):
+            return kind
+    return str(data_type)
+
+
+def check_schema(table, rows: list):
+    """Raise SchemaMismatch unless rows have exactly the table's columns with compatible types"""
+    import pyarrow as pa
+
+    expected = {f.name: _kind(f.type) for f in table.schema if f.name != "vector"}
+    found = {f.name: _kind(f.type) for f in pa.Table.from_pylist(rows).schema}
+    problems = [f"table has no column {name}" for name in sorted(set(found) - set(expected))]
+    problems += [f"source has no column {name}" for name in sorted(set(expected) - set(found))]
+    problems += [f"{name} is {expected[name]} in the table, {kind} in the source"
+                 for name, kind in sorted(found.items())
+                 if name in expected and kind not in ("null", expected[name])]
+    if problems:
+        raise SchemaMismatch(f"schema differs from '{table.name}' ({'; '.join(problems)}); "
+                             f"re-run with --rebuild")
+
+
+class _TableWriter:
+    """Batched encode + merge_insert into one table, creating it on first write"""
+
+    def __init__(self, db, table_name: str, encode_many, batch_size: int = ENCODE_BATCH_SIZE):
+        self.db = db
+        self.table_name = table_name
+        self.encode_many = encode_many
+        self.batch_size = batch_size
+        self.table = db.open_table(table_name) if table_name in db.table_names() else None
+        self.checked = False
+
+    def write(self, rows: list):
+        if rows and self.table is not None and not self.checked:
+            check_schema(self.table, rows)  # before the first write, so a mismatch changes nothing
+            self.checked = True
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            vectors = self.encode_many([row["search_text"] for row in batch])
+            data = [{**row, "vector": list(vector)} for row, vector in zip(batch, vectors)]
+            if self.table is None:
+                self.table = self.db.create_table(self.table_name, data=data)
+            else:
+                (self.table.merge_insert("id")
+                 .when_matched_update_all()
+                 .when_not_matched_insert_all()
+                 .execute(data))
+
+    def delete(self, ids: list):
+        if self.table is None:
+            return
+        for start in range(0, len(ids), 500):
+            id_list = ", ".join(quote(i) for i in ids[start:start + 500])
+            self.table.delete(f"id IN ({id_list})")
+
+
+def ingest_table(db, table_name: str, encode_many, manifest: IngestManifest, source_dir: Path = SOURCE_DIR,
+                 aliases: dict = None, rebuild: bool = False, workers: int = PARSE_WORKERS) -> dict:
+    """Bring one table up to date with its source files; returns counters"""
+    stats = {"files": 0, "changed_files": 0, "removed_files": 0, "rows": 0,
+             "written": 0, "unchanged": 0, "deleted": 0, "errors": []}
+
+    if rebuild:
+        if table_name in db.table_names():
+            db.drop_table(table_name)
+        manifest.forget(table_name)
+
+    files = source_files(table_name, source_dir)
+    known = manifest.files(table_name)
+    stats["files"] = len(files)
+
+    if not known and table_name in db.table_names() and db.open_table(table_name).count_rows():
+        # Not built by ingest: none of its ids would match, so merging would duplicate every row
+        stats["errors"].append(f"'{table_name}' exists but has no ingest manifest entries; "
+                               f"re-run with --rebuild to rebuild it from the sources")
+        return stats
+
+    changed, stats_before = [], {}
+    for path, platform in files:
+        st = path.stat()
+        if known.get(str(path)) != (st.st_mtime, st.st_size):
+            changed.append((path, platform))
+            # Recorded once the rows are written: an edit made meanwhile stays "changed"
+            stats_before[str(path)] = st
+    stats["changed_files"] = len(changed)
+
+    writer = _TableWriter(db, table_name, encode_many)
+
+    for path, rows, error in _parse_stream(table_name, changed, aliases or {}, workers):
+        if error:
+            stats["errors"].append(f"{path}: {error}")
+            continue
+        previous = manifest.row_hashes(table_name, path)
+        fresh = [row for row in rows if previous.get(row["id"]) != row["_hash"]]
+        stale = list(set(previous) - {row["id"] for row in rows})
+
+        try:
+            writer.write([{k: v for k, v in row.items() if k != "_hash"} for row in fresh])
+        except SchemaMismatch as e:
+            stats["errors"].append(str(e))
+            break
+        writer.delete(stale)
+        manifest.record_file(table_name, path, stats_before[path], [(row["id"], row["_hash"]) for row in rows])
+
+        stats["rows"] += len(rows)
+        stats["written"] += len(fresh)
+        stats["unchanged"] += len(rows) - len(fresh)
+        stats["deleted"] += len(stale)
+
+    # Source files that no longer exist: drop their rows
+    for path in set(known) - {str(p) for p, _ in files}:
+        stale = list(manifest.row_hashes(table_name, path))
+        writer.delete(stale)
+        manifest.record_file(table_name, path, None, [])
+        stats["removed_files"] += 1
+        stats["deleted"] += len(stale)
+
+    return stats
+
+
+def format_ingest(results: dict, elapsed: float) -> str:
+    """Format per-table ingest counters as readable text"""
+    output = "Ingest:\n" + "-" * 50
+    for table_name, s in results.items():
+        unchanged_files = s["files"] - s["changed_files"]
+        output += f"\n{table_name}: {s['files']} files ({s['changed_files']} changed, "
+        output += f"{unchanged_files} unchanged, {s['removed_files']} removed)"
+        output += f"\n    rows: {s['written']} encoded/written, {s['unchanged']} unchanged, {s['deleted']} deleted"
+        for error in s["errors"]:
+            output += f"\n    error: {error}"
+    output += f"\n\nElapsed: {elapsed:.1f}s"
+    if any(s["written"] or s["deleted"] for s in results.values()):
+        output += "\nRun `lancedb_cli.py index` after large ingests to fold new rows into the indexes."
+    return output
+
+
+def run_ingest(db, tables: list, encode_many, source_dir: Path = SOURCE_DIR, rebuild: bool = False,
+               workers: int = PARSE_WORKERS, manifest_path: str = MANIFEST_PATH) -> str:
+    """Ingest the given tables and return a readable report"""
+    start = time.perf_counter()
+    manifest = IngestManifest(manifest_path)
+    aliases = load_platform_aliases()
+    results = {
+        table_name: ingest_table(db, table_name, encode_many, manifest, Path(source_dir), aliases, rebuild, workers)
+        for table_name in tables
+    }
+    return format_ingest(results, time.perf_counter() - start)
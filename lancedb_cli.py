@@ -7,15 +7,67 @@ Usage:
     python lancedb_cli.py dependencies "wind speed" --platform Atlantis
     python lancedb_cli.py coordinates "GPS sensor" --platform Boomvang
     python lancedb_cli.py oandm "calibration procedure" --platform Constitution
-    python lancedb_cli.py lineage "Roll Rate" --platform Constitution
+    python lancedb_cli.py oandm "PT-1001" --mode fts
+    python lancedb_cli.py oandm "replace the seal" --expand 1
+    python lancedb_cli.py context "Pump_Manual.pdf" 4 --window 2
+    python lancedb_cli.py descriptions "wind speed" --json --cursor <next_cursor>
+    python lancedb_cli.py lineage "Roll Rate" --platform Constitution --depth 3
+    python lancedb_cli.py path "EC Wind Speed" "Best Wind Speed" --platform Atlantis
+    python lancedb_cli.py cycles --platform Atlantis
+    python lancedb_cli.py equivalents "Wind Speed" --platform Atlantis
+    python lancedb_cli.py within 25 --sensor "MRU" --platform Constitution
+    python lancedb_cli.py nearest --point 10 -5 30 --platform Constitution --k 3
+    python lancedb_cli.py transform --platform Constitution --frame geo
+    python lancedb_cli.py batch "roll rate" "wind speed" --platform Constitution
+    cat queries.jsonl | python lancedb_cli.py batch
     python lancedb_cli.py platforms
+    python lancedb_cli.py cache-stats
+    python lancedb_cli.py index --report
+    python lancedb_cli.py versions
+    python lancedb_cli.py ingest --table descriptions
+    python lancedb_cli.py cluster
+    python lancedb_cli.py maintain --dry-run
+
+Repeated calls are served by a warm background daemon (started on first use)
+so the embedding model and tables are only loaded once:
+    python lancedb_cli.py serve             # run the daemon in the foreground
+    python lancedb_cli.py stop              # stop a running daemon
+    python lancedb_cli.py --no-daemon ...   # always search in-process
+    python lancedb_cli.py --profile ...     # append a per-stage timing breakdown
 """
 
 import argparse
+import json
+import socket
+import socketserver
+import subprocess
+import sys
+import time
 import warnings
 import os
 from pathlib import Path
 
+from access_mode import PlatformUnavailable, enforce, get_policy
+from batch_search import parse_batch_lines, run_batch
+from embedding_cache import EmbeddingCache, format_stats
+from encoders import ENCODER_BACKEND, cache_name, load_encoder
+from equivalents import CLUSTER_THRESHOLD, GROUPS_TABLE, build_groups, format_equivalents, get_equivalent_index
+from geometry import FRAMES, format_nearest, format_transform, format_within, get_geometry
+from hybrid_search import SEARCH_MODES, build_fts_index, format_snippet, run_search, snippet_search
+from ingest import PARSE_WORKERS, SOURCE_DIR, run_ingest
+from lineage_graph import format_closure, format_cycles, format_path, get_lineage_graph
+from maintenance import (KEEP_VERSIONS_DAYS, MAX_DELETED_RATIO, MAX_FRAGMENTS, READER_GRACE_MINUTES,
+                         format_maintenance, maintain_table)
+from metrics import format_profile, request, start_metrics_server, timed
+from name_index import resolve_channel_names, resolve_then_search
+from oandm_context import expand_hits, format_context, format_passages
+from pagination import check_output, cursor_footer, format_json, page_offset, search_page
+from platform_catalog import format_catalog, platform_catalog
+from result_cache import RESULTS, format_result_stats
+from scalar_index import build_scalar_indexes, platform_filter, quote
+from table_registry import TableRegistry, format_versions
+from vector_index import INDEX_TYPES, build_vector_index, recall_report
+
 # Suppress warnings
 warnings.filterwarnings("ignore")
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
@@ -25,9 +77,34 @@ os.environ["TRANSFORMERS_VERBOSITY"] = "error"
 # Database path
 DB_PATH = Path(__file__).parent / "channel_summary_vectordb"
 
+# Search daemon (localhost only)
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = int(os.environ.get("LANCEDB_CLI_PORT", "47651"))
+DAEMON_IDLE_TIMEOUT = float(os.environ.get("LANCEDB_CLI_IDLE_TIMEOUT", "1800"))
+DAEMON_START_TIMEOUT = 15.0
+# Commands that write tables: always run locally, never accepted by the daemon
+LOCAL_COMMANDS = ("index", "ingest", "cluster", "maintain")
+
+TABLE_NAMES = ["descriptions", "dependencies", "coordinates", "oandm_manuals"]
+
+# Columns each search formats; searches never fetch the vector or search_text
+RESULT_COLUMNS = {
+    "descriptions": ["platform_name", "system", "device", "channame", "chanunits", "description"],
+    "dependencies": ["platform_name", "name", "device", "units", "inputs", "outputs", "input_count"],
+    "coordinates": ["platform_name", "sensor_name", "x", "y", "z", "coord_system_x", "coord_system_y",
+                    "coord_system_z", "heading_deg", "latitude", "longitude"],
+    "lineage": ["platform_name", "platform_alias", "system", "name", "device", "units", "category",
+                "inputs", "outputs", "input_count"],
+}
+
+# Embedding model
+MODEL_NAME = "all-MiniLM-L6-v2"
+
 # Lazy-loaded globals
 _db = None
 _model = None
+_embedding_cache = None
+_registry = None
 
 
 def get_db():
@@ -40,63 +117,115 @@ def get_db():
 
 
 def get_model():
-    """Lazy load embedding model"""
+    """Lazy load embedding model (backend from LANCEDB_ENCODER)"""
     global _model
     if _model is None:
-        from sentence_transformers import SentenceTransformer
-        _model = SentenceTransformer('all-MiniLM-L6-v2')
+        with timed("model_load"):
+            _model = load_encoder(MODEL_NAME)
     return _model
 
 
-def search_descriptions(query: str, platform: str = "", device: str = "", limit: int = 5) -> str:
-    """Search channel descriptions by semantic similarity."""
-    db = get_db()
+def get_document_model():
+    """Encoder for vectors written to the tables: always fp32 (torch) when queries use int8"""
+    if ENCODER_BACKEND != "onnx-int8":
+        return get_model()
+    with timed("model_load"):
+        return load_encoder(MODEL_NAME, "torch")
+
+
+def encode_texts(texts):
+    """Run the embedding model on a query or list of queries (the encode stage)"""
     model = get_model()
+    with timed("encode"):
+        return model.encode(texts).tolist()
+
+
+def get_embedding_cache():
+    """Lazy load the query embedding cache"""
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(cache_name(MODEL_NAME))
+    return _embedding_cache
 
-    table = db.open_table("descriptions")
-    query_vector = model.encode(query).tolist()
 
-    search = table.search(query_vector)
+def embed_query(query: str) -> list:
+    """Embed a query, skipping the model entirely on cache hits"""
+    return get_embedding_cache().encode(query, encode_texts)
+
+
+def embed_queries(queries: list) -> list:
+    """Embed several queries, encoding all cache misses in one batched model call"""
+    return get_embedding_cache().encode_many(queries, encode_texts)
+
+
+def get_registry() -> TableRegistry:
+    """Lazy create the version-aware table registry"""
+    global _registry
+    if _registry is None:
+        _registry = TableRegistry(DB_PATH, get_db)
+    return _registry
+
+
+def get_table(name: str):
+    """Open a table once and reuse the handle until a newer version is committed"""
+    return get_registry().get(name)
+
+
+def search_descriptions(query: str, platform: str = "", device: str = "", limit: int = 5,
+                        nprobes: int = 0, refine_factor: int = 0, mode: str = "vector",
+                        output: str = "text", cursor: str = "") -> str:
+    """Search channel descriptions by semantic similarity."""
+    check_output(output)
+    table = get_table("descriptions")
 
     filters = []
     if platform:
-        filters.append(f"(platform_name = '{platform}' OR platform_alias = '{platform}')")
+        filters.append(platform_filter(table, platform))
     if device:
-        filters.append(f"device = '{device}'")
+        filters.append(f"device = {quote(device)}")
 
-    if filters:
-        search = search.where(" AND ".join(filters))
+    def fetch(n):
+        # Literal channel names come first; the search fills the remaining slots
+        return resolve_then_search(table, query, lambda k: run_search(
+            table, query, filters, k, mode, nprobes, refine_factor, embed_query, RESULT_COLUMNS["descriptions"]),
+            platform, device, n, mode)
 
-    results = search.limit(limit).to_list()
+    results, next_cursor = search_page(table, (query, filters, mode, nprobes, refine_factor), fetch, limit, cursor)
+    if output == "json":
+        return format_json(table, query, results, next_cursor, page_offset(cursor))
 
-    output = []
-    for i, r in enumerate(results[:limit], 1):
+    lines = []
+    for i, r in enumerate(results, page_offset(cursor) + 1):
         line = f"[{i}] {r.get('platform_name', '')} | {r.get('device', '')} | {r.get('channame', '')}"
         line += f"\n    Units: {r.get('chanunits', '')}"
         line += f"\n    Description: {r.get('description', '')}"
         line += f"\n    System: {r.get('system', '')}"
-        output.append(line)
+        lines.append(line)
 
-    return "\n\n".join(output) if output else "No results found."
+    return "\n\n".join(lines) + cursor_footer(next_cursor) if lines else "No results found."
 
 
-def search_dependencies(query: str, platform: str = "", limit: int = 5) -> str:
+def search_dependencies(query: str, platform: str = "", limit: int = 5,
+                        nprobes: int = 0, refine_factor: int = 0, mode: str = "vector",
+                        output: str = "text", cursor: str = "") -> str:
     """Search channel dependencies and lineage."""
-    db = get_db()
-    model = get_model()
-
-    table = db.open_table("dependencies")
-    query_vector = model.encode(query).tolist()
+    check_output(output)
+    table = get_table("dependencies")
 
-    search = table.search(query_vector)
+    filters = [platform_filter(table, platform)] if platform else []
 
-    if platform:
-        search = search.where(f"(platform_name = '{platform}' OR platform_alias = '{platform}')")
+    def fetch(n):
+        # Literal channel names come first; the search fills the remaining slots
+        return resolve_then_search(table, query, lambda k: run_search(
+            table, query, filters, k, mode, nprobes, refine_factor, embed_query, RESULT_COLUMNS["dependencies"]),
+            platform, limit=n, mode=mode)
 
-    results = search.limit(limit).to_list()
+    results, next_cursor = search_page(table, (query, filters, mode, nprobes, refine_factor), fetch, limit, cursor)
+    if output == "json":
+        return format_json(table, query, results, next_cursor, page_offset(cursor))
 
-    output = []
-    for i, r in enumerate(results[:limit], 1):
+    lines = []
+    for i, r in enumerate(results, page_offset(cursor) + 1):
         node_type = "DERIVED" if r.get("input_count", 0) > 0 else "RAW"
         inputs = r.get("inputs", "")
         outputs = r.get("outputs", "")
@@ -107,88 +236,117 @@ def search_dependencies(query: str, platform: str = "", limit: int = 5) -> str:
             line += f"\n    <- Inputs: {inputs}"
         if outputs:
             line += f"\n    -> Outputs: {outputs}"
-        output.append(line)
+        lines.append(line)
 
-    return "\n\n".join(output) if output else "No results found."
+    return "\n\n".join(lines) + cursor_footer(next_cursor) if lines else "No results found."
 
 
-def search_coordinates(query: str, platform: str = "", limit: int = 5) -> str:
+def search_coordinates(query: str, platform: str = "", limit: int = 5,
+                       nprobes: int = 0, refine_factor: int = 0, mode: str = "vector",
+                       output: str = "text", cursor: str = "") -> str:
     """Search coordinate system information."""
-    db = get_db()
-    model = get_model()
+    check_output(output)
+    table = get_table("coordinates")
 
-    table = db.open_table("coordinates")
-    query_vector = model.encode(query).tolist()
+    filters = [platform_filter(table, platform)] if platform else []
 
-    search = table.search(query_vector)
+    def fetch(n):
+        return run_search(table, query, filters, n, mode, nprobes, refine_factor, embed_query,
+                          RESULT_COLUMNS["coordinates"])
 
-    if platform:
-        search = search.where(f"(platform_name = '{platform}' OR platform_alias = '{platform}')")
+    results, next_cursor = search_page(table, (query, filters, mode, nprobes, refine_factor), fetch, limit, cursor)
+    if output == "json":
+        return format_json(table, query, results, next_cursor, page_offset(cursor))
 
-    results = search.limit(limit).to_list()
-
-    output = []
-    for i, r in enumerate(results[:limit], 1):
+    lines = []
+    for i, r in enumerate(results, page_offset(cursor) + 1):
         line = f"[{i}] {r.get('platform_name', '')} | Sensor: {r.get('sensor_name', '')}"
         line += f"\n    Location: X={r.get('x', 'N/A')}, Y={r.get('y', 'N/A')}, Z={r.get('z', 'N/A')}"
         line += f"\n    Coord System: +X={r.get('coord_system_x', '')}, +Y={r.get('coord_system_y', '')}, +Z={r.get('coord_system_z', '')}"
         line += f"\n    Platform Heading: {r.get('heading_deg', 'N/A')} deg from True North"
         line += f"\n    Lat/Lon: {r.get('latitude', '')}, {r.get('longitude', '')}"
-        output.append(line)
+        lines.append(line)
 
-    return "\n\n".join(output) if output else "No results found."
+    return "\n\n".join(lines) + cursor_footer(next_cursor) if lines else "No results found."
 
 
-def search_oandm(query: str, platform: str = "", limit: int = 5) -> str:
-    """Search O&M manual content."""
-    db = get_db()
-    model = get_model()
+def search_oandm(query: str, platform: str = "", limit: int = 5,
+                 nprobes: int = 0, refine_factor: int = 0, mode: str = "vector",
+                 output: str = "text", cursor: str = "", expand: int = 0) -> str:
+    """Search O&M manual content (expand: also return N neighbor chunks on each side)."""
+    check_output(output)
+    table = get_table("oandm_manuals")
 
-    table = db.open_table("oandm_manuals")
-    query_vector = model.encode(query).tolist()
+    filters = [f"platform_name = {quote(platform)}"] if platform else []
+    # The snippet is cut around the best-matching terms (by Lance where it can), not returned whole
+    columns = {name: name for name in ["platform_name", "document_name", "chunk_id", "total_chunks"]}
 
-    search = table.search(query_vector)
+    def fetch(n):
+        return snippet_search(table, query, filters, n, mode, nprobes, refine_factor, embed_query, columns)
 
-    if platform:
-        search = search.where(f"platform_name = '{platform}'")
+    results, next_cursor = search_page(table, (query, filters, mode, nprobes, refine_factor), fetch, limit, cursor)
+    # Neighbor chunks of all hits, merged into passages and read with one take
+    passages = expand_hits(table, results, expand, page_offset(cursor) + 1) if expand else None
+    if output == "json":
+        return format_json(table, query, results, next_cursor, page_offset(cursor),
+                           {"passages": passages} if expand else None)
+    if expand:
+        return format_passages(passages) + cursor_footer(next_cursor)
 
-    results = search.limit(limit).to_list()
-
-    output = []
-    for i, r in enumerate(results[:limit], 1):
-        content = r.get("content", "")[:500]
+    lines = []
+    for i, r in enumerate(results, page_offset(cursor) + 1):
         line = f"[{i}] {r.get('platform_name', '')} | {r.get('document_name', '')}"
         line += f"\n    (Chunk {r.get('chunk_id', 0)+1} of {r.get('total_chunks', '?')})"
-        line += f"\n    Content: {content}..."
-        output.append(line)
+        line += f"\n    Content: {format_snippet(r)}"
+        lines.append(line)
 
-    return "\n\n".join(output) if output else "No results found."
+    return "\n\n".join(lines) + cursor_footer(next_cursor) if lines else "No results found."
 
 
-def get_channel_lineage(channel_name: str, platform: str) -> str:
-    """Get complete lineage for a specific channel."""
-    db = get_db()
-    model = get_model()
+# Per-table searches fanned out by batch queries: (query, platform, limit, mode, output) -> text/JSON
+BATCH_SEARCHES = {
+    "descriptions": lambda q, p, n, m, o="text": search_descriptions(q, p, "", n, mode=m, output=o),
+    "dependencies": lambda q, p, n, m, o="text": search_dependencies(q, p, n, mode=m, output=o),
+    "coordinates": lambda q, p, n, m, o="text": search_coordinates(q, p, n, mode=m, output=o),
+    "oandm_manuals": lambda q, p, n, m, o="text": search_oandm(q, p, n, mode=m, output=o),
+}
 
-    table = db.open_table("dependencies")
-    query_vector = model.encode(f"{channel_name} {platform}").tolist()
 
-    results = table.search(query_vector).where(
-        f"(platform_name = '{platform}' OR platform_alias = '{platform}')"
-    ).limit(10).to_list()
+def _semantic_channel_match(table, channel_name: str, platform: str):
+    """Fuzzy channel lookup: vector search, preferring a name containing channel_name"""
+    query_vector = embed_query(f"{channel_name} {platform}")
 
-    if not results:
-        return f"No channel matching '{channel_name}' found for platform '{platform}'."
+    results = table.search(query_vector).select(RESULT_COLUMNS["lineage"]).where(
+        platform_filter(table, platform), prefilter=True
+    ).limit(10).to_list()
 
-    # Find best match
-    best_match = None
     for r in results:
         if channel_name.lower() in r.get("name", "").lower():
-            best_match = r
-            break
+            return r
+
+    return results[0] if results else None  # closest semantic match
+
+
+def get_oandm_context(document: str, chunk_id: int, window: int = 1, platform: str = "") -> str:
+    """A chunk of an O&M document with its neighbors, read by position."""
+    return format_context(get_table("oandm_manuals"), document, chunk_id, window, platform)
 
-    if not best_match:
-        best_match = results[0]
+
+def get_channel_lineage(channel_name: str, platform: str, depth: int = 1) -> str:
+    """Get complete lineage for a specific channel."""
+    table = get_table("dependencies")
+
+    # Exact channel names are answered from the compiled lineage graph
+    graph = get_lineage_graph(table).platform(platform)
+    node = graph.find(channel_name) if graph else None
+    best_match = graph.rows[node] if node is not None else None
+
+    if best_match is None:
+        # Prefix/typo matches from the name index, then fuzzy semantic lookup
+        resolved = resolve_channel_names(table, channel_name, platform, limit=1)
+        best_match = resolved[0] if resolved else _semantic_channel_match(table, channel_name, platform)
+    if best_match is None:
+        return f"No channel matching '{channel_name}' found for platform '{platform}'."
 
     # Format detailed lineage
     output = f"Channel: {best_match.get('name', 'Unknown')}"
@@ -218,37 +376,350 @@ def get_channel_lineage(channel_name: str, platform: str) -> str:
     else:
         output += "\n\nDownstream Outputs: None (terminal channel)"
 
+    if depth > 1 and graph is not None:
+        node = graph.find(best_match.get("name", ""))
+        if node is not None:
+            output += format_closure(graph, node, depth)
+
     return output
 
 
+def get_derivation_path(source_channel: str, target_channel: str, platform: str) -> str:
+    """Shortest derivation path between two channels."""
+    graph = get_lineage_graph(get_table("dependencies")).platform(platform)
+    if graph is None:
+        return f"No lineage data found for platform '{platform}'."
+    return format_path(graph, source_channel, target_channel)
+
+
+def find_lineage_cycles(platform: str) -> str:
+    """Circular dependencies in a platform's lineage."""
+    graph = get_lineage_graph(get_table("dependencies")).platform(platform)
+    if graph is None:
+        return f"No lineage data found for platform '{platform}'."
+    return format_cycles(graph)
+
+
+def find_equivalents(channel: str, platform: str, include_same_platform: bool = False) -> str:
+    """Channels of the same type on other platforms, from the precomputed channel groups."""
+    if GROUPS_TABLE not in get_db().table_names():
+        return "Channel groups have not been built yet; run `python lancedb_cli.py cluster`."
+    index = get_equivalent_index(get_table(GROUPS_TABLE))
+    descriptions = get_table("descriptions")
+    if index.find(channel, platform) is None:
+        # Prefix/typo matches from the name index
+        resolved = resolve_channel_names(descriptions, channel, platform, limit=1)
+        if resolved:
+            channel = resolved[0].get("channame", channel)
+    return format_equivalents(index, channel, platform, descriptions.version, include_same_platform)
+
+
+def cluster_channels(threshold: float = CLUSTER_THRESHOLD) -> str:
+    """Rebuild the cross-platform channel groups from the descriptions table."""
+    get_registry().clear()  # re-open after writes
+    return build_groups(get_db(), lambda texts: get_model().encode(texts, batch_size=64).tolist(), threshold)
+
+
+def sensors_within(platform: str, radius: float, sensor: str = "", point: list = None,
+                   frame: str = "local") -> str:
+    """Sensors within radius metres of a sensor or point."""
+    geometry = get_geometry(get_table("coordinates")).platform(platform)
+    if geometry is None:
+        return f"No coordinate data found for platform '{platform}'."
+    try:
+        return format_within(geometry, radius, sensor, point, frame)
+    except ValueError as e:
+        return str(e)
+
+
+def nearest_sensors(platform: str, k: int = 5, sensor: str = "", point: list = None,
+                    frame: str = "local") -> str:
+    """The k nearest sensors to a sensor or point."""
+    geometry = get_geometry(get_table("coordinates")).platform(platform)
+    if geometry is None:
+        return f"No coordinate data found for platform '{platform}'."
+    try:
+        return format_nearest(geometry, k, sensor, point, frame)
+    except ValueError as e:
+        return str(e)
+
+
+def transform_sensors(platform: str, sensors: list = None, frame: str = "enu") -> str:
+    """Sensor positions transformed from the platform-local frame."""
+    geometry = get_geometry(get_table("coordinates")).platform(platform)
+    if geometry is None:
+        return f"No coordinate data found for platform '{platform}'."
+    try:
+        return format_transform(geometry, sensors, frame)
+    except ValueError as e:
+        return str(e)
+
+
 def list_platforms() -> str:
     """List all available platforms."""
+    return format_catalog(platform_catalog(get_table, TABLE_NAMES))
+
+
+def build_indexes(tables: list, index_type: str = "ivf_pq", rebuild: bool = False,
+                  force: bool = False, report: bool = False, k: int = 10, samples: int = 50) -> str:
+    """Build vector, scalar and full-text indexes and optionally print a recall-vs-latency report."""
+    output = "Indexes:\n" + "-" * 50
+    for table_name in tables or TABLE_NAMES:
+        table = get_table(table_name)
+        output += f"\n{table_name}:"
+        output += f"\n    vector: {build_vector_index(table, index_type, rebuild, force)}"
+        output += f"\n    scalar: {build_scalar_indexes(table, rebuild)}"
+        output += f"\n    fts: {build_fts_index(table, rebuild)}"
+        if report:
+            output += f"\n\n{recall_report(table, k, samples)}\n"
+    return output
+
+
+def ingest(tables: list, source: str = str(SOURCE_DIR), rebuild: bool = False,
+           workers: int = PARSE_WORKERS) -> str:
+    """Incrementally (re)build tables from the ChanDefResources source files."""
+    get_registry().clear()  # re-open after writes
+    model = get_document_model()
+    return run_ingest(get_db(), tables or TABLE_NAMES,
+                      lambda texts: model.encode(texts, batch_size=64).tolist(),
+                      Path(source), rebuild, workers)
+
+
+def maintain(tables: list, dry_run: bool = False, force: bool = False, max_fragments: int = MAX_FRAGMENTS,
+             max_deleted: float = MAX_DELETED_RATIO, keep_days: float = KEEP_VERSIONS_DAYS,
+             grace_minutes: float = READER_GRACE_MINUTES) -> str:
+    """Compact, reindex and prune tables when their fragment/deletion thresholds are exceeded."""
+    get_registry().clear()  # re-open after writes
     db = get_db()
+    results = [maintain_table(db.open_table(name), dry_run, force, max_fragments, max_deleted,
+                              keep_days, grace_minutes)
+               for name in tables or TABLE_NAMES]
+    return format_maintenance(results, dry_run)
+
+
+def run_command(command: str, params: dict, access_mode: str = None) -> str:
+    """
+    Run a CLI command in-process and return its output (one table snapshot per command).
+    access_mode overrides LANCEDB_ACCESS_MODE (the daemon passes the client's).
+    """
+    profile = params.get("profile", False)
+    policy = get_policy(override=access_mode)
+    try:
+        params = enforce(params, policy=policy)  # access mode: validate/resolve platform names before any filter
+    except PlatformUnavailable as e:
+        return str(e)
+    with get_registry().snapshot(), request(command, params, force=profile) as timings:
+        output = _run_command(command, params)
+    if profile and timings is not None:
+        output += "\n\n" + format_profile(timings)
+    return policy.mask(output)
+
+
+def _run_command(command: str, params: dict) -> str:
+    output = "json" if params.get("json") else "text"
+    if command == "descriptions":
+        return search_descriptions(params["query"], params["platform"], params["device"], params["limit"],
+                                   params["nprobes"], params["refine_factor"], params["mode"],
+                                   output, params["cursor"])
+    elif command == "dependencies":
+        return search_dependencies(params["query"], params["platform"], params["limit"],
+                                   params["nprobes"], params["refine_factor"], params["mode"],
+                                   output, params["cursor"])
+    elif command == "coordinates":
+        return search_coordinates(params["query"], params["platform"], params["limit"],
+                                  params["nprobes"], params["refine_factor"], params["mode"],
+                                  output, params["cursor"])
+    elif command == "oandm":
+        return search_oandm(params["query"], params["platform"], params["limit"],
+                            params["nprobes"], params["refine_factor"], params["mode"],
+                            output, params["cursor"], params["expand"])
+    elif command == "context":
+        return get_oandm_context(params["document"], params["chunk_id"], params["window"], params["platform"])
+    elif command == "lineage":
+        return get_channel_lineage(params["channel"], params["platform"], params["depth"])
+    elif command == "path":
+        return get_derivation_path(params["source"], params["target"], params["platform"])
+    elif command == "cycles":
+        return find_lineage_cycles(params["platform"])
+    elif command == "equivalents":
+        return find_equivalents(params["channel"], params["platform"], params["same_platform"])
+    elif command == "cluster":
+        return cluster_channels(params["threshold"])
+    elif command == "within":
+        return sensors_within(params["platform"], params["radius"], params["sensor"], params["point"],
+                              params["frame"])
+    elif command == "nearest":
+        return nearest_sensors(params["platform"], params["k"], params["sensor"], params["point"], params["frame"])
+    elif command == "transform":
+        return transform_sensors(params["platform"], params["sensors"], params["frame"])
+    elif command == "platforms":
+        return list_platforms()
+    elif command == "cache-stats":
+        return format_stats(get_embedding_cache().stats()) + "\n\n" + format_result_stats(RESULTS.stats())
+    elif command == "batch":
+        return run_batch(params["requests"], BATCH_SEARCHES, embed_queries, params["table"],
+                         params["platform"], params["limit"], params["mode"], output)
+    elif command == "index":
+        return build_indexes(params["table"], params["type"], params["rebuild"], params["force"],
+                             params["report"], params["k"], params["samples"])
+    elif command == "versions":
+        return format_versions(get_registry(), TABLE_NAMES)
+    elif command == "maintain":
+        return maintain(params["table"], params["dry_run"], params["force"], params["max_fragments"],
+                        params["max_deleted"], params["keep_days"], params["grace_minutes"])
+    elif command == "ingest":
+        return ingest(params["table"], params["source"], params["rebuild"], params["workers"])
+    raise ValueError(f"Unknown command: {command}")
+
+
+# ---------------------------------------------------------------------------
+# Warm search daemon
+# ---------------------------------------------------------------------------
+
+class _DaemonServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """Threaded localhost server that keeps the model and tables loaded"""
+    allow_reuse_address = True
+    daemon_threads = True
+    stopping = False
+    last_request = 0.0
+
+
+class _DaemonHandler(socketserver.StreamRequestHandler):
+    """Answer one JSON request per connection: {"command": ..., "params": {...}}"""
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line.strip():
+            return  # connection probe from start_daemon()
+
+        self.server.last_request = time.monotonic()
+        try:
+            request = json.loads(line)
+            command = request.get("command", "")
+            if command == "stop":
+                self.server.stopping = True
+                reply = {"output": "Search daemon stopped."}
+            elif command in LOCAL_COMMANDS:
+                reply = {"error": f"'{command}' writes tables and is not accepted by the search daemon"}
+            else:
+                reply = {"output": run_command(command, request.get("params", {}), request.get("access_mode"))}
+        except Exception as e:
+            reply = {"error": f"{type(e).__name__}: {e}"}
+
+        self.wfile.write((json.dumps(reply) + "\n").encode())
+        self.server.last_request = time.monotonic()
+
+
+def _watch_daemon(server: _DaemonServer, idle_timeout: float):
+    """Shut the daemon down on request or after idle_timeout seconds without queries"""
+    while not server.stopping:
+        time.sleep(0.5)
+        if idle_timeout > 0 and time.monotonic() - server.last_request > idle_timeout:
+            break
+    server.shutdown()
+
 
-    platforms = {}
+def serve(idle_timeout: float = DAEMON_IDLE_TIMEOUT):
+    """Run the search daemon in the foreground until stopped or idle."""
+    import threading
 
-    for table_name in ["descriptions", "dependencies", "coordinates", "oandm_manuals"]:
+    try:
+        server = _DaemonServer((DAEMON_HOST, DAEMON_PORT), _DaemonHandler)
+    except OSError as e:
+        sys.exit(f"Cannot listen on {DAEMON_HOST}:{DAEMON_PORT}: {e}")
+
+    # Warm everything up once; clients connecting meanwhile wait in the backlog
+    get_model()
+    for table_name in TABLE_NAMES:
         try:
-            table = db.open_table(table_name)
-            df = table.to_pandas()
-            for p in df["platform_name"].unique():
-                if p:
-                    if p not in platforms:
-                        platforms[p] = []
-                    platforms[p].append(table_name[:4])
+            get_table(table_name)
         except Exception:
             continue
 
-    output = "Available Platforms:\n" + "-" * 50
-    for p in sorted(platforms.keys()):
-        tables = ", ".join(platforms[p])
-        output += f"\n{p}: [{tables}]"
+    start_metrics_server()
+    server.last_request = time.monotonic()
+    threading.Thread(target=_watch_daemon, args=(server, idle_timeout), daemon=True).start()
+    with server:
+        server.serve_forever(poll_interval=0.5)
 
-    return output
+
+def start_daemon() -> bool:
+    """Spawn the search daemon in the background and wait until it is listening."""
+    kwargs = {}
+    if os.name == "nt":
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+
+    try:
+        proc = subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), "serve"],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            **kwargs,
+        )
+    except OSError:
+        return False
+
+    deadline = time.monotonic() + DAEMON_START_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((DAEMON_HOST, DAEMON_PORT), timeout=0.5).close()
+            return True
+        except OSError:
+            if proc.poll() is not None:
+                return False
+            time.sleep(0.1)
+    return False
+
+
+def query_daemon(command: str, params: dict, autostart: bool = True):
+    """
+    Run a command on the warm daemon.
+
+    Returns the command output, or None if no daemon is reachable (the caller
+    then falls back to searching in-process).
+    """
+    try:
+        sock = socket.create_connection((DAEMON_HOST, DAEMON_PORT), timeout=0.5)
+    except OSError:
+        if not autostart or not start_daemon():
+            return None
+        try:
+            sock = socket.create_connection((DAEMON_HOST, DAEMON_PORT), timeout=0.5)
+        except OSError:
+            return None
+
+    with sock:
+        sock.settimeout(None)  # first query may wait for the daemon to warm up
+        # The daemon may have been started under another LANCEDB_ACCESS_MODE: send this client's
+        request = {"command": command, "params": params, "access_mode": os.environ.get("LANCEDB_ACCESS_MODE", "")}
+        sock.sendall((json.dumps(request) + "\n").encode())
+        line = sock.makefile("rb").readline()
+
+    if not line:
+        return None
+    reply = json.loads(line)
+    if "error" in reply:
+        raise RuntimeError(reply["error"])
+    return reply["output"]
+
+
+def add_search_arguments(parser):
+    """Search mode and ANN tuning flags shared by the search subcommands"""
+    parser.add_argument("--mode", "-m", choices=SEARCH_MODES, default="vector",
+                        help="vector (semantic), fts (BM25 keywords) or hybrid (RRF-fused)")
+    parser.add_argument("--nprobes", type=int, default=0, help="IVF partitions to probe (0 = default)")
+    parser.add_argument("--refine-factor", type=int, default=0, help="Exact re-rank factor (0 = off)")
+    parser.add_argument("--json", action="store_true", help="Typed JSON records with scores and next_cursor")
+    parser.add_argument("--cursor", default="", help="next_cursor of a previous page (same query and filters)")
 
 
 def main():
     parser = argparse.ArgumentParser(description="LanceDB Channel Search CLI")
+    parser.add_argument("--no-daemon", action="store_true",
+                        help="Search in-process instead of using the warm daemon")
+    parser.add_argument("--profile", action="store_true",
+                        help="Append per-stage timings (model load, encode, open_table, search, ...)")
     subparsers = parser.add_subparsers(dest="command", help="Search commands")
 
     # descriptions
@@ -257,49 +728,173 @@ def main():
     desc_parser.add_argument("--platform", "-p", default="", help="Platform filter")
     desc_parser.add_argument("--device", "-d", default="", help="Device filter")
     desc_parser.add_argument("--limit", "-n", type=int, default=5, help="Max results")
+    add_search_arguments(desc_parser)
 
     # dependencies
     dep_parser = subparsers.add_parser("dependencies", help="Search channel dependencies")
     dep_parser.add_argument("query", help="Search query")
     dep_parser.add_argument("--platform", "-p", default="", help="Platform filter")
     dep_parser.add_argument("--limit", "-n", type=int, default=5, help="Max results")
+    add_search_arguments(dep_parser)
 
     # coordinates
     coord_parser = subparsers.add_parser("coordinates", help="Search coordinate systems")
     coord_parser.add_argument("query", help="Search query")
     coord_parser.add_argument("--platform", "-p", default="", help="Platform filter")
     coord_parser.add_argument("--limit", "-n", type=int, default=5, help="Max results")
+    add_search_arguments(coord_parser)
 
     # oandm
     oandm_parser = subparsers.add_parser("oandm", help="Search O&M manuals")
     oandm_parser.add_argument("query", help="Search query")
     oandm_parser.add_argument("--platform", "-p", default="", help="Platform filter")
     oandm_parser.add_argument("--limit", "-n", type=int, default=5, help="Max results")
+    oandm_parser.add_argument("--expand", "-e", type=int, default=0,
+                              help="Merge N neighbor chunks on each side of every hit into passages")
+    add_search_arguments(oandm_parser)
+
+    # context
+    context_parser = subparsers.add_parser("context", help="An O&M chunk with its neighboring chunks")
+    context_parser.add_argument("document", help="Document name (as shown by oandm)")
+    context_parser.add_argument("chunk_id", type=int, help="0-based chunk id (oandm shows it as chunk_id + 1)")
+    context_parser.add_argument("--window", "-w", type=int, default=1, help="Neighbor chunks on each side")
+    context_parser.add_argument("--platform", "-p", default="", help="Platform (if the document name is shared)")
 
     # lineage
     lineage_parser = subparsers.add_parser("lineage", help="Get channel lineage")
     lineage_parser.add_argument("channel", help="Channel name")
     lineage_parser.add_argument("--platform", "-p", required=True, help="Platform name")
+    lineage_parser.add_argument("--depth", type=int, default=1, help="Also list the closure up to N hops")
+
+    # path
+    path_parser = subparsers.add_parser("path", help="Shortest derivation path between two channels")
+    path_parser.add_argument("source", help="Source channel name")
+    path_parser.add_argument("target", help="Target channel name")
+    path_parser.add_argument("--platform", "-p", required=True, help="Platform name")
+
+    # cycles
+    cycles_parser = subparsers.add_parser("cycles", help="Detect circular channel dependencies")
+    cycles_parser.add_argument("--platform", "-p", required=True, help="Platform name")
+
+    # equivalents
+    equivalents_parser = subparsers.add_parser("equivalents", help="Same channel type on other platforms")
+    equivalents_parser.add_argument("channel", help="Channel name")
+    equivalents_parser.add_argument("--platform", "-p", required=True, help="Platform name")
+    equivalents_parser.add_argument("--same-platform", action="store_true",
+                                    help="Also list equivalents on the channel's own platform")
+
+    # cluster
+    cluster_parser = subparsers.add_parser("cluster", help="Rebuild the cross-platform channel groups")
+    cluster_parser.add_argument("--threshold", type=float, default=CLUSTER_THRESHOLD,
+                                help="Cosine similarity needed to join a group")
+
+    # within / nearest (spatial queries on the coordinates table)
+    within_parser = subparsers.add_parser("within", help="Sensors within a radius of a sensor or point")
+    within_parser.add_argument("radius", type=float, help="Radius in metres")
+    nearest_parser = subparsers.add_parser("nearest", help="Nearest sensors to a sensor or point")
+    nearest_parser.add_argument("--k", "-k", type=int, default=5, help="Number of sensors")
+    for spatial_parser in (within_parser, nearest_parser):
+        spatial_parser.add_argument("--platform", "-p", required=True, help="Platform name")
+        spatial_parser.add_argument("--sensor", "-s", default="", help="Center on this sensor")
+        spatial_parser.add_argument("--point", type=float, nargs=3, metavar=("A", "B", "C"),
+                                    help="Center point: X Y Z (local), E N U (enu) or LAT LON UP (geo)")
+        spatial_parser.add_argument("--frame", choices=FRAMES, default="local", help="Frame of --point")
+
+    # transform
+    transform_parser = subparsers.add_parser("transform", help="Sensor positions in the enu or geo frame")
+    transform_parser.add_argument("sensors", nargs="*", help="Sensor names (default all)")
+    transform_parser.add_argument("--platform", "-p", required=True, help="Platform name")
+    transform_parser.add_argument("--frame", choices=FRAMES, default="enu", help="Target frame")
 
     # platforms
     subparsers.add_parser("platforms", help="List available platforms")
 
+    # cache-stats
+    subparsers.add_parser("cache-stats", help="Show query embedding and result cache hit/miss counters")
+
+    # versions
+    subparsers.add_parser("versions", help="Show the table versions being served")
+
+    # batch
+    batch_parser = subparsers.add_parser("batch", help="Run many queries against all tables at once")
+    batch_parser.add_argument("queries", nargs="*", help="Search queries (default: read JSONL from stdin)")
+    batch_parser.add_argument("--platform", "-p", default="", help="Platform filter")
+    batch_parser.add_argument("--limit", "-n", type=int, default=5, help="Max results per query and table")
+    batch_parser.add_argument("--table", "-t", action="append", choices=TABLE_NAMES,
+                              help="Table to search (repeatable, default all)")
+    batch_parser.add_argument("--mode", "-m", choices=SEARCH_MODES, default="vector",
+                              help="vector (semantic), fts (BM25 keywords) or hybrid (RRF-fused)")
+    batch_parser.add_argument("--json", action="store_true", help="Typed JSON records grouped per query and table")
+
+    # index
+    index_parser = subparsers.add_parser("index", help="Build/rebuild vector, scalar and full-text indexes")
+    index_parser.add_argument("--table", "-t", action="append", choices=TABLE_NAMES,
+                              help="Table to index (repeatable, default all)")
+    index_parser.add_argument("--type", choices=sorted(INDEX_TYPES), default="ivf_pq", help="Index type")
+    index_parser.add_argument("--rebuild", action="store_true", help="Replace existing indexes")
+    index_parser.add_argument("--force", action="store_true", help="Index small tables too")
+    index_parser.add_argument("--report", action="store_true", help="Print recall@k vs latency against exact search")
+    index_parser.add_argument("--k", type=int, default=10, help="k for the recall report")
+    index_parser.add_argument("--samples", type=int, default=50, help="Query vectors sampled for the report")
+
+    # ingest
+    ingest_parser = subparsers.add_parser("ingest", help="Incrementally build tables from ChanDefResources/")
+    ingest_parser.add_argument("--table", "-t", action="append", choices=TABLE_NAMES,
+                               help="Table to ingest (repeatable, default all)")
+    ingest_parser.add_argument("--source", default=str(SOURCE_DIR), help="Source directory")
+    ingest_parser.add_argument("--rebuild", action="store_true", help="Drop the table and re-ingest everything")
+    ingest_parser.add_argument("--workers", type=int, default=PARSE_WORKERS, help="Parser processes")
+
+    # maintain
+    maintain_parser = subparsers.add_parser("maintain", help="Fragment stats, compaction and version pruning")
+    maintain_parser.add_argument("--table", "-t", action="append", choices=TABLE_NAMES,
+                                 help="Table to maintain (repeatable, default all)")
+    maintain_parser.add_argument("--dry-run", action="store_true", help="Report and list due actions only")
+    maintain_parser.add_argument("--force", action="store_true", help="Compact and reindex regardless of thresholds")
+    maintain_parser.add_argument("--max-fragments", type=int, default=MAX_FRAGMENTS,
+                                 help="Compact above this many fragments")
+    maintain_parser.add_argument("--max-deleted", type=float, default=MAX_DELETED_RATIO,
+                                 help="Compact above this deleted-row ratio")
+    maintain_parser.add_argument("--keep-days", type=float, default=KEEP_VERSIONS_DAYS,
+                                 help="Keep versions newer than this")
+    maintain_parser.add_argument("--grace-minutes", type=float, default=READER_GRACE_MINUTES,
+                                 help="Keep versions superseded less than this long ago (live readers)")
+
+    # daemon control
+    serve_parser = subparsers.add_parser("serve", help="Run the warm search daemon")
+    serve_parser.add_argument("--idle-timeout", type=float, default=DAEMON_IDLE_TIMEOUT,
+                              help="Exit after this many idle seconds (0 = never)")
+    subparsers.add_parser("stop", help="Stop the warm search daemon")
+
     args = parser.parse_args()
 
-    if args.command == "descriptions":
-        print(search_descriptions(args.query, args.platform, args.device, args.limit))
-    elif args.command == "dependencies":
-        print(search_dependencies(args.query, args.platform, args.limit))
-    elif args.command == "coordinates":
-        print(search_coordinates(args.query, args.platform, args.limit))
-    elif args.command == "oandm":
-        print(search_oandm(args.query, args.platform, args.limit))
-    elif args.command == "lineage":
-        print(get_channel_lineage(args.channel, args.platform))
-    elif args.command == "platforms":
-        print(list_platforms())
-    else:
+    if args.command is None:
         parser.print_help()
+        return
+    if args.command == "serve":
+        serve(args.idle_timeout)
+        return
+    if args.command == "stop":
+        print(query_daemon("stop", {}, autostart=False) or "Search daemon is not running.")
+        return
+
+    params = {k: v for k, v in vars(args).items() if k not in ("command", "no_daemon")}
+
+    if args.command == "batch":
+        queries = params.pop("queries")
+        params["requests"] = [{"query": q} for q in queries] if queries else parse_batch_lines(sys.stdin)
+
+    if args.command in LOCAL_COMMANDS:
+        # Writes run locally; the daemon sees the new table versions on its next request
+        print(run_command(args.command, params))
+        return
+
+    output = None
+    if not (args.no_daemon or os.environ.get("LANCEDB_CLI_NO_DAEMON")):
+        output = query_daemon(args.command, params)
+    if output is None:
+        output = run_command(args.command, params)
+    print(output)
 
 
 if __name__ == "__main__":
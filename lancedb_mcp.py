@@ -8,19 +8,62 @@ Provides vector search tools for:
 - O&M manual content
 """
 
+import functools
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from mcp.server.fastmcp import FastMCP
 
+from access_mode import PlatformUnavailable, enforce, get_policy
+from async_tools import IO_WORKERS, MicroBatcher, offload
+from batch_search import run_batch
+from embedding_cache import EmbeddingCache, format_stats
+from encoders import cache_name, load_encoder
+from equivalents import GROUPS_TABLE, format_equivalents, get_equivalent_index
+from geometry import format_nearest, format_transform, format_within, get_geometry
+from hybrid_search import format_snippet, run_search, snippet_search, to_rows
+from lineage_graph import format_closure, format_cycles, format_path, get_lineage_graph
+from metrics import format_server_stats, request, start_metrics_server, timed
+from name_index import resolve_channel_names, resolve_then_search
+from oandm_context import expand_hits, format_context, format_passages
+from pagination import check_output, cursor_footer, format_json, page_offset, search_page
+from platform_catalog import format_catalog, platform_catalog
+from result_cache import RESULTS, format_result_stats
+from scalar_index import platform_filter, quote
+from table_registry import TableRegistry, format_versions
+
 # Initialize MCP server
 mcp = FastMCP("LanceDB Channel Search")
 
 # Database path (relative to this file)
 DB_PATH = Path(__file__).parent / "channel_summary_vectordb"
 
+# Embedding model
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+TABLE_NAMES = ["descriptions", "dependencies", "coordinates", "oandm_manuals"]
+
+# Columns each search formats; searches never fetch the vector or search_text
+RESULT_COLUMNS = {
+    "descriptions": ["platform_name", "system", "device", "channame", "chanunits", "description"],
+    "dependencies": ["platform_name", "name", "device", "units", "inputs", "outputs", "input_count"],
+    "coordinates": ["platform_name", "sensor_name", "x", "y", "z", "coord_system_x", "coord_system_y",
+                    "coord_system_z", "heading_deg", "latitude", "longitude"],
+    "lineage": ["platform_name", "platform_alias", "system", "name", "device", "units", "category",
+                "inputs", "outputs", "input_count"],
+}
+
+# Lance queries run here so tool calls never block the event loop
+_io_pool = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="lance-io")
+
 # Lazy-loaded globals
 _db = None
 _model = None
+_embedding_cache = None
+_batcher = None
+_registry = None
+_lock = threading.Lock()
 
 
 def get_db():
@@ -32,99 +75,198 @@ def get_db():
     return _db
 
 
+def get_registry() -> TableRegistry:
+    """Lazy create the version-aware table registry"""
+    global _registry
+    with _lock:
+        if _registry is None:
+            _registry = TableRegistry(DB_PATH, get_db)
+    return _registry
+
+
+def get_table(name: str):
+    """Open a table once and reuse the handle until a newer version is committed"""
+    return get_registry().get(name)
+
+
 def get_model():
-    """Lazy load embedding model"""
+    """Lazy load embedding model (backend from LANCEDB_ENCODER)"""
     global _model
-    if _model is None:
-        from sentence_transformers import SentenceTransformer
-        _model = SentenceTransformer('all-MiniLM-L6-v2')
+    with _lock:
+        if _model is None:
+            with timed("model_load"):
+                _model = load_encoder(MODEL_NAME)
     return _model
 
 
-def format_results(results: list, fields: list, max_results: int = 10) -> str:
-    """Format search results as readable text"""
-    if not results:
+def get_batcher():
+    """Lazy start the micro-batching encoder"""
+    global _batcher
+    with _lock:
+        if _batcher is None:
+            _batcher = MicroBatcher(lambda texts: get_model().encode(texts).tolist())
+    return _batcher
+
+
+def get_embedding_cache():
+    """Lazy load the query embedding cache"""
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(cache_name(MODEL_NAME))
+    return _embedding_cache
+
+
+def encode_text(text: str) -> list:
+    """Encode one query on the micro-batcher (the encode stage, including the batching wait)"""
+    batcher = get_batcher()
+    with timed("encode"):
+        return batcher.encode(text)
+
+
+def encode_texts(texts: list) -> list:
+    """Encode a list of queries in one model call (the encode stage)"""
+    model = get_model()
+    with timed("encode"):
+        return model.encode(texts).tolist()
+
+
+def embed_query(query: str) -> list:
+    """Embed a query, skipping the model entirely on cache hits (misses are micro-batched)"""
+    return get_embedding_cache().encode(query, encode_text)
+
+
+def embed_queries(queries: list) -> list:
+    """Embed several queries, encoding all cache misses in one batched model call"""
+    return get_embedding_cache().encode_many(queries, encode_texts)
+
+
+def tool(fn):
+    """
+    Register a sync tool as an async MCP tool running on the I/O pool, with one table
+    snapshot and one metrics request per call, and the access mode applied to its
+    arguments and answer; returns fn unchanged
+    """
+    @functools.wraps(fn)
+    def snapshotted(*args, **kwargs):
+        try:
+            kwargs = enforce(kwargs)
+        except PlatformUnavailable as e:
+            return str(e)
+        with get_registry().snapshot(), request(fn.__name__, kwargs):
+            return get_policy().mask(fn(*args, **kwargs))
+
+    mcp.tool()(offload(snapshotted, _io_pool))
+    return fn
+
+
+def format_results(results: list, fields: list, max_results: int = 10, start: int = 1) -> str:
+    """Format search results as readable text (numbered from start)"""
+    rows = to_rows(results, max_results)
+    if not rows:
         return "No results found."
 
-    output = []
-    for i, r in enumerate(results[:max_results], 1):
-        parts = [f"[{i}]"]
-        for field in fields:
-            if field in r and r[field]:
-                parts.append(f"{field}: {r[field]}")
-        output.append(" | ".join(parts))
+    with timed("format"):
+        output = []
+        for i, r in enumerate(rows, start):
+            parts = [f"[{i}]"]
+            for field in fields:
+                if field in r and r[field]:
+                    parts.append(f"{field}: {r[field]}")
+            output.append(" | ".join(parts))
 
-    return "\n".join(output)
+        return "\n".join(output)
 
 
-@mcp.tool()
-def search_descriptions(query: str, platform: str = "", device: str = "", limit: int = 5) -> str:
+@tool
+def search_descriptions(query: str, platform: str = "", device: str = "", limit: int = 5,
+                        nprobes: int = 0, refine_factor: int = 0, mode: str = "vector",
+                        output: str = "text", cursor: str = "") -> str:
     """
     Search channel descriptions by semantic similarity.
 
+    In vector mode, literal channel names (exact, unique prefix or close typo) are
+    matched from a name index and listed first; semantic results fill the rest.
+
     Args:
         query: Natural language search query (e.g., "roll rate", "wind speed")
         platform: Optional platform name filter (e.g., "Constitution", "Atlantis")
         device: Optional device filter (e.g., "6DOF", "GPS")
         limit: Maximum results to return (default 5)
+        nprobes: IVF partitions to probe when a vector index exists (0 = default)
+        refine_factor: Re-rank limit * refine_factor candidates exactly (0 = off)
+        mode: "vector" (semantic), "fts" (BM25 keywords, e.g. tag names/part numbers) or "hybrid" (both, RRF-fused)
+        output: "text" (readable) or "json" (typed records with scores and next_cursor)
+        cursor: next_cursor from a previous call with the same query and filters, for the next page
 
     Returns:
         Matching channel descriptions with platform, device, name, units, and description
     """
-    db = get_db()
-    model = get_model()
-
-    table = db.open_table("descriptions")
-    query_vector = model.encode(query).tolist()
-
-    # Build search
-    search = table.search(query_vector)
+    check_output(output)
+    table = get_table("descriptions")
 
     # Apply filters
     filters = []
     if platform:
-        filters.append(f"(platform_name = '{platform}' OR platform_alias = '{platform}')")
+        filters.append(platform_filter(table, platform))
     if device:
-        filters.append(f"device = '{device}'")
+        filters.append(f"device = {quote(device)}")
 
-    if filters:
-        search = search.where(" AND ".join(filters))
+    def fetch(n):
+        # Literal channel names come first; the search fills the remaining slots
+        return resolve_then_search(table, query, lambda k: run_search(
+            table, query, filters, k, mode, nprobes, refine_factor, embed_query, RESULT_COLUMNS["descriptions"]),
+            platform, device, n, mode)
 
-    results = search.limit(limit).to_list()
+    results, next_cursor = search_page(table, (query, filters, mode, nprobes, refine_factor), fetch, limit, cursor)
+    if output == "json":
+        return format_json(table, query, results, next_cursor, page_offset(cursor))
 
     fields = ["platform_name", "system", "device", "channame", "chanunits", "description"]
-    return format_results(results, fields)
+    return (format_results(results, fields, max_results=len(results), start=page_offset(cursor) + 1)
+            + cursor_footer(next_cursor))
 
 
-@mcp.tool()
-def search_dependencies(query: str, platform: str = "", limit: int = 5) -> str:
+@tool
+def search_dependencies(query: str, platform: str = "", limit: int = 5,
+                        nprobes: int = 0, refine_factor: int = 0, mode: str = "vector",
+                        output: str = "text", cursor: str = "") -> str:
     """
     Search channel dependencies and lineage information.
 
+    Literal channel names are matched directly from a name index before falling
+    back to semantic search.
+
     Args:
         query: Search query (e.g., "wind speed", "derived channels")
         platform: Optional platform name filter
         limit: Maximum results to return
+        nprobes: IVF partitions to probe when a vector index exists (0 = default)
+        refine_factor: Re-rank limit * refine_factor candidates exactly (0 = off)
+        mode: "vector" (semantic), "fts" (BM25 keywords, e.g. tag names/part numbers) or "hybrid" (both, RRF-fused)
+        output: "text" (readable) or "json" (typed records with scores and next_cursor)
+        cursor: next_cursor from a previous call with the same query and filters, for the next page
 
     Returns:
         Matching channels with their inputs (upstream) and outputs (downstream) connections
     """
-    db = get_db()
-    model = get_model()
+    check_output(output)
+    table = get_table("dependencies")
 
-    table = db.open_table("dependencies")
-    query_vector = model.encode(query).tolist()
+    filters = [platform_filter(table, platform)] if platform else []
 
-    search = table.search(query_vector)
+    def fetch(n):
+        # Literal channel names come first; the search fills the remaining slots
+        return resolve_then_search(table, query, lambda k: run_search(
+            table, query, filters, k, mode, nprobes, refine_factor, embed_query, RESULT_COLUMNS["dependencies"]),
+            platform, limit=n, mode=mode)
 
-    if platform:
-        search = search.where(f"(platform_name = '{platform}' OR platform_alias = '{platform}')")
-
-    results = search.limit(limit).to_list()
+    results, next_cursor = search_page(table, (query, filters, mode, nprobes, refine_factor), fetch, limit, cursor)
+    if output == "json":
+        return format_json(table, query, results, next_cursor, page_offset(cursor))
 
     # Format with lineage info
-    output = []
-    for i, r in enumerate(results[:limit], 1):
+    lines = []
+    for i, r in enumerate(results, page_offset(cursor) + 1):
         node_type = "DERIVED" if r.get("input_count", 0) > 0 else "RAW"
         inputs = r.get("inputs", "")
         outputs = r.get("outputs", "")
@@ -135,13 +277,15 @@ def search_dependencies(query: str, platform: str = "", limit: int = 5) -> str:
             line += f"\n    <- Inputs: {inputs}"
         if outputs:
             line += f"\n    -> Outputs: {outputs}"
-        output.append(line)
+        lines.append(line)
 
-    return "\n\n".join(output) if output else "No results found."
+    return "\n\n".join(lines) + cursor_footer(next_cursor) if lines else "No results found."
 
 
-@mcp.tool()
-def search_coordinates(query: str, platform: str = "", limit: int = 5) -> str:
+@tool
+def search_coordinates(query: str, platform: str = "", limit: int = 5,
+                       nprobes: int = 0, refine_factor: int = 0, mode: str = "vector",
+                       output: str = "text", cursor: str = "") -> str:
     """
     Search platform and sensor coordinate system information.
 
@@ -149,37 +293,44 @@ def search_coordinates(query: str, platform: str = "", limit: int = 5) -> str:
         query: Search query (e.g., "GPS location", "6DOF sensor")
         platform: Optional platform name filter
         limit: Maximum results to return
+        nprobes: IVF partitions to probe when a vector index exists (0 = default)
+        refine_factor: Re-rank limit * refine_factor candidates exactly (0 = off)
+        mode: "vector" (semantic), "fts" (BM25 keywords, e.g. tag names/part numbers) or "hybrid" (both, RRF-fused)
+        output: "text" (readable) or "json" (typed records with scores and next_cursor)
+        cursor: next_cursor from a previous call with the same query and filters, for the next page
 
     Returns:
         Coordinate system info including orientation (+X, +Y, +Z) and sensor locations
     """
-    db = get_db()
-    model = get_model()
+    check_output(output)
+    table = get_table("coordinates")
 
-    table = db.open_table("coordinates")
-    query_vector = model.encode(query).tolist()
+    filters = [platform_filter(table, platform)] if platform else []
 
-    search = table.search(query_vector)
+    def fetch(n):
+        return run_search(table, query, filters, n, mode, nprobes, refine_factor, embed_query,
+                          RESULT_COLUMNS["coordinates"])
 
-    if platform:
-        search = search.where(f"(platform_name = '{platform}' OR platform_alias = '{platform}')")
+    results, next_cursor = search_page(table, (query, filters, mode, nprobes, refine_factor), fetch, limit, cursor)
+    if output == "json":
+        return format_json(table, query, results, next_cursor, page_offset(cursor))
 
-    results = search.limit(limit).to_list()
-
-    output = []
-    for i, r in enumerate(results[:limit], 1):
+    lines = []
+    for i, r in enumerate(results, page_offset(cursor) + 1):
         line = f"[{i}] {r.get('platform_name', '')} | Sensor: {r.get('sensor_name', '')}"
         line += f"\n    Location: X={r.get('x', 'N/A')}, Y={r.get('y', 'N/A')}, Z={r.get('z', 'N/A')}"
         line += f"\n    Coord System: +X={r.get('coord_system_x', '')}, +Y={r.get('coord_system_y', '')}, +Z={r.get('coord_system_z', '')}"
         line += f"\n    Platform Heading: {r.get('heading_deg', 'N/A')}° from True North"
         line += f"\n    Lat/Lon: {r.get('latitude', '')}, {r.get('longitude', '')}"
-        output.append(line)
+        lines.append(line)
 
-    return "\n\n".join(output) if output else "No results found."
+    return "\n\n".join(lines) + cursor_footer(next_cursor) if lines else "No results found."
 
 
-@mcp.tool()
-def search_oandm(query: str, platform: str = "", limit: int = 5) -> str:
+@tool
+def search_oandm(query: str, platform: str = "", limit: int = 5,
+                 nprobes: int = 0, refine_factor: int = 0, mode: str = "vector",
+                 output: str = "text", cursor: str = "", expand: int = 0) -> str:
     """
     Search Operations & Maintenance manual content.
 
@@ -187,70 +338,138 @@ def search_oandm(query: str, platform: str = "", limit: int = 5) -> str:
         query: Search query (e.g., "calibration procedure", "maintenance schedule")
         platform: Optional platform name filter
         limit: Maximum results to return
+        nprobes: IVF partitions to probe when a vector index exists (0 = default)
+        refine_factor: Re-rank limit * refine_factor candidates exactly (0 = off)
+        mode: "vector" (semantic), "fts" (BM25 keywords, e.g. tag names/part numbers) or "hybrid" (both, RRF-fused)
+        output: "text" (readable) or "json" (typed records with scores and next_cursor)
+        cursor: next_cursor from a previous call with the same query and filters, for the next page
+        expand: Also read N neighbor chunks on each side of every hit and merge them into
+                contiguous passages (use when a procedure runs across chunk boundaries)
 
     Returns:
         Relevant excerpts from O&M manuals with source document info
     """
-    db = get_db()
-    model = get_model()
+    check_output(output)
+    table = get_table("oandm_manuals")
+
+    filters = [f"platform_name = {quote(platform)}"] if platform else []
+    # The snippet is cut around the best-matching terms (by Lance where it can), not returned whole
+    columns = {name: name for name in ["platform_name", "document_name", "chunk_id", "total_chunks"]}
+
+    def fetch(n):
+        return snippet_search(table, query, filters, n, mode, nprobes, refine_factor, embed_query, columns)
+
+    results, next_cursor = search_page(table, (query, filters, mode, nprobes, refine_factor), fetch, limit, cursor)
+    # Neighbor chunks of all hits, merged into passages and read with one take
+    passages = expand_hits(table, results, expand, page_offset(cursor) + 1) if expand else None
+    if output == "json":
+        return format_json(table, query, results, next_cursor, page_offset(cursor),
+                           {"passages": passages} if expand else None)
+    if expand:
+        return format_passages(passages) + cursor_footer(next_cursor)
+
+    lines = []
+    for i, r in enumerate(results, page_offset(cursor) + 1):
+        line = f"[{i}] {r.get('platform_name', '')} | {r.get('document_name', '')}"
+        line += f"\n    (Chunk {r.get('chunk_id', 0)+1} of {r.get('total_chunks', '?')})"
+        line += f"\n    Content: {format_snippet(r)}"
+        lines.append(line)
 
-    table = db.open_table("oandm_manuals")
-    query_vector = model.encode(query).tolist()
+    return "\n\n".join(lines) + cursor_footer(next_cursor) if lines else "No results found."
 
-    search = table.search(query_vector)
 
-    if platform:
-        search = search.where(f"platform_name = '{platform}'")
+@tool
+def get_oandm_context(document: str, chunk_id: int, window: int = 1, platform: str = "") -> str:
+    """
+    Read an O&M chunk together with its neighboring chunks, without another search.
 
-    results = search.limit(limit).to_list()
+    Args:
+        document: Document name as returned by search_oandm (e.g., "Pump_Manual.pdf")
+        chunk_id: 0-based chunk id (search_oandm shows "Chunk k of N" with k = chunk_id + 1)
+        window: Neighbor chunks to include on each side (default 1, max 10)
+        platform: Platform name, needed only when several platforms have a document of that name
+
+    Returns:
+        The chunks merged into one contiguous passage, with the chunk range it covers
+    """
+    return format_context(get_table("oandm_manuals"), document, chunk_id, window, platform)
 
-    output = []
-    for i, r in enumerate(results[:limit], 1):
-        content = r.get("content", "")[:500]  # Truncate for readability
-        line = f"[{i}] {r.get('platform_name', '')} | {r.get('document_name', '')}"
-        line += f"\n    (Chunk {r.get('chunk_id', 0)+1} of {r.get('total_chunks', '?')})"
-        line += f"\n    Content: {content}..."
-        output.append(line)
 
-    return "\n\n".join(output) if output else "No results found."
+# Per-table searches fanned out by batch queries: (query, platform, limit, mode, output) -> text/JSON
+BATCH_SEARCHES = {
+    "descriptions": lambda q, p, n, m, o="text": search_descriptions(q, p, "", n, mode=m, output=o),
+    "dependencies": lambda q, p, n, m, o="text": search_dependencies(q, p, n, mode=m, output=o),
+    "coordinates": lambda q, p, n, m, o="text": search_coordinates(q, p, n, mode=m, output=o),
+    "oandm_manuals": lambda q, p, n, m, o="text": search_oandm(q, p, n, mode=m, output=o),
+}
 
 
-@mcp.tool()
-def get_channel_lineage(channel_name: str, platform: str) -> str:
+@tool
+def search_all(queries: list[str], platform: str = "", limit: int = 5,
+               tables: list[str] = None, mode: str = "vector", output: str = "text") -> str:
     """
-    Get the complete lineage (upstream and downstream) for a specific channel.
+    Run several queries against all four tables in one call.
+
+    All queries are embedded in a single batched model call and the per-table
+    searches run concurrently, instead of one tool call per query and table.
 
     Args:
-        channel_name: Name of the channel to look up
-        platform: Platform name (required for specificity)
+        queries: Search queries (e.g., ["roll rate", "wind speed"])
+        platform: Optional platform name filter applied to every query
+        limit: Maximum results per query and table (default 5)
+        tables: Subset of "descriptions", "dependencies", "coordinates", "oandm_manuals" (default all)
+        mode: "vector", "fts" or "hybrid" (see search_descriptions)
+        output: "text" or "json" (one JSON document with the per-table results of every query)
 
     Returns:
-        Channel details with all upstream (input) and downstream (output) connections
+        Results grouped per query, then per table
     """
-    db = get_db()
-    model = get_model()
+    check_output(output)
+    requests = [{"query": q} for q in queries]
+    return run_batch(requests, BATCH_SEARCHES, embed_queries, tables, platform, limit, mode, output)
 
-    table = db.open_table("dependencies")
 
-    # Search for the specific channel
-    query_vector = model.encode(f"{channel_name} {platform}").tolist()
+def _semantic_channel_match(table, channel_name: str, platform: str):
+    """Fuzzy channel lookup: vector search, preferring a name containing channel_name"""
+    query_vector = embed_query(f"{channel_name} {platform}")
 
-    results = table.search(query_vector).where(
-        f"(platform_name = '{platform}' OR platform_alias = '{platform}')"
+    results = table.search(query_vector).select(RESULT_COLUMNS["lineage"]).where(
+        platform_filter(table, platform), prefilter=True
     ).limit(10).to_list()
 
-    if not results:
-        return f"No channel matching '{channel_name}' found for platform '{platform}'."
-
-    # Find best match
-    best_match = None
     for r in results:
         if channel_name.lower() in r.get("name", "").lower():
-            best_match = r
-            break
+            return r
+
+    return results[0] if results else None  # closest semantic match
 
-    if not best_match:
-        best_match = results[0]  # Use closest semantic match
+
+@tool
+def get_channel_lineage(channel_name: str, platform: str, depth: int = 1) -> str:
+    """
+    Get the complete lineage (upstream and downstream) for a specific channel.
+
+    Args:
+        channel_name: Name of the channel to look up
+        platform: Platform name (required for specificity)
+        depth: Also list the full upstream/downstream closure up to this many hops (default 1)
+
+    Returns:
+        Channel details with all upstream (input) and downstream (output) connections
+    """
+    table = get_table("dependencies")
+
+    # Exact channel names are answered from the compiled lineage graph
+    graph = get_lineage_graph(table).platform(platform)
+    node = graph.find(channel_name) if graph else None
+    best_match = graph.rows[node] if node is not None else None
+
+    if best_match is None:
+        # Prefix/typo matches from the name index, then fuzzy semantic lookup
+        resolved = resolve_channel_names(table, channel_name, platform, limit=1)
+        best_match = resolved[0] if resolved else _semantic_channel_match(table, channel_name, platform)
+    if best_match is None:
+        return f"No channel matching '{channel_name}' found for platform '{platform}'."
 
     # Format detailed lineage
     output = f"Channel: {best_match.get('name', 'Unknown')}"
@@ -280,40 +499,204 @@ def get_channel_lineage(channel_name: str, platform: str) -> str:
     else:
         output += "\n\nDownstream Outputs: None (terminal channel)"
 
+    if depth > 1 and graph is not None:
+        node = graph.find(best_match.get("name", ""))
+        if node is not None:
+            output += format_closure(graph, node, depth)
+
     return output
 
 
-@mcp.tool()
+@tool
+def get_derivation_path(source_channel: str, target_channel: str, platform: str) -> str:
+    """
+    Find the shortest derivation path between two channels (no embedding involved).
+
+    Args:
+        source_channel: Exact channel name at one end (e.g., "EC Wind Speed")
+        target_channel: Exact channel name at the other end (e.g., "Best Wind Speed")
+        platform: Platform name
+
+    Returns:
+        The chain of channels connecting the two, from input towards output
+    """
+    graph = get_lineage_graph(get_table("dependencies")).platform(platform)
+    if graph is None:
+        return f"No lineage data found for platform '{platform}'."
+    return format_path(graph, source_channel, target_channel)
+
+
+@tool
+def find_lineage_cycles(platform: str) -> str:
+    """
+    Detect circular dependencies in a platform's channel lineage.
+
+    Args:
+        platform: Platform name
+
+    Returns:
+        Groups of channels that (directly or indirectly) derive from each other
+    """
+    graph = get_lineage_graph(get_table("dependencies")).platform(platform)
+    if graph is None:
+        return f"No lineage data found for platform '{platform}'."
+    return format_cycles(graph)
+
+
+@tool
+def find_equivalents(channel: str, platform: str, include_same_platform: bool = False) -> str:
+    """
+    Find the same channel type on other platforms in one lookup (step 2 of the search workflow).
+
+    Answers from precomputed cross-platform channel groups (clustered by meaning, with
+    units normalized and device prefixes removed) instead of an unfiltered search.
+
+    Args:
+        channel: Channel name on the given platform (e.g., "Wind Speed")
+        platform: Platform name
+        include_same_platform: Also list equivalent channels on the same platform
+
+    Returns:
+        The channel's group and its members on other platforms, most similar first
+    """
+    if GROUPS_TABLE not in get_db().table_names():
+        return "Channel groups have not been built yet; run `python lancedb_cli.py cluster`."
+    index = get_equivalent_index(get_table(GROUPS_TABLE))
+    descriptions = get_table("descriptions")
+    if index.find(channel, platform) is None:
+        # Prefix/typo matches from the name index
+        resolved = resolve_channel_names(descriptions, channel, platform, limit=1)
+        if resolved:
+            channel = resolved[0].get("channame", channel)
+    return format_equivalents(index, channel, platform, descriptions.version, include_same_platform)
+
+
+def _platform_geometry(platform: str):
+    geometry = get_geometry(get_table("coordinates")).platform(platform)
+    if geometry is None:
+        raise ValueError(f"No coordinate data found for platform '{platform}'.")
+    return geometry
+
+
+@tool
+def sensors_within_radius(platform: str, radius: float, sensor: str = "", point: list[float] = None,
+                          frame: str = "local") -> str:
+    """
+    Find the sensors within a radius of another sensor or of a point (no embedding involved).
+
+    Args:
+        platform: Platform name
+        radius: Radius in metres
+        sensor: Exact sensor name to center on (e.g., "MRU"), or
+        point: Center point as [X, Y, Z] (local), [East, North, Up] (enu) or [lat, lon, up] (geo)
+        frame: Frame of point: "local" (platform +X/+Y/+Z), "enu" or "geo"
+
+    Returns:
+        Sensors ordered by straight-line distance, with their local positions
+    """
+    try:
+        return format_within(_platform_geometry(platform), radius, sensor, point, frame)
+    except ValueError as e:
+        return str(e)
+
+
+@tool
+def nearest_sensors(platform: str, sensor: str = "", point: list[float] = None, frame: str = "local",
+                    k: int = 5) -> str:
+    """
+    Find the k sensors nearest to another sensor or to a point (no embedding involved).
+
+    Args:
+        platform: Platform name
+        sensor: Exact sensor name to start from, or
+        point: Point as [X, Y, Z] (local), [East, North, Up] (enu) or [lat, lon, up] (geo)
+        frame: Frame of point: "local", "enu" or "geo"
+        k: Number of sensors (default 5)
+
+    Returns:
+        The nearest sensors with distances in metres
+    """
+    try:
+        return format_nearest(_platform_geometry(platform), k, sensor, point, frame)
+    except ValueError as e:
+        return str(e)
+
+
+@tool
+def transform_sensor_coordinates(platform: str, sensors: list[str] = None, frame: str = "enu") -> str:
+    """
+    Convert sensor positions from the platform-local frame, applying the platform heading.
+
+    Args:
+        platform: Platform name
+        sensors: Exact sensor names (default all placed sensors of the platform)
+        frame: "enu" (east/north/up metres from the platform origin, True North aligned),
+               "geo" (latitude/longitude/up) or "local"
+
+    Returns:
+        One line per sensor with its transformed coordinates
+    """
+    try:
+        return format_transform(_platform_geometry(platform), sensors, frame)
+    except ValueError as e:
+        return str(e)
+
+
+@tool
 def list_platforms() -> str:
     """
     List all available platforms in the database.
 
     Returns:
-        List of platform names with data availability in each table
+        List of platform names (with alias) and row counts in each table, plus table versions
     """
-    db = get_db()
+    return format_catalog(platform_catalog(get_table, TABLE_NAMES))
 
-    platforms = {}
 
-    for table_name in ["descriptions", "dependencies", "coordinates", "oandm_manuals"]:
-        try:
-            table = db.open_table(table_name)
-            df = table.to_pandas()
-            for p in df["platform_name"].unique():
-                if p:
-                    if p not in platforms:
-                        platforms[p] = []
-                    platforms[p].append(table_name[:4])  # Abbreviate
-        except:
-            continue
-
-    output = "Available Platforms:\n" + "-" * 50
-    for p in sorted(platforms.keys()):
-        tables = ", ".join(platforms[p])
-        output += f"\n{p}: [{tables}]"
+@tool
+def embedding_cache_stats() -> str:
+    """
+    Report query embedding and search result cache usage.
 
-    return output
+    Returns:
+        Memory/disk hit counts, misses (actual model encodes), hit rate and cache sizes,
+        then result cache hits, misses (searches run), evictions and invalidations
+    """
+    output = format_stats(get_embedding_cache().stats())
+    if _batcher is not None and _batcher.batches:
+        output += f"\nEncode batches: {_batcher.batches} ({_batcher.requests / _batcher.batches:.1f} queries/batch)"
+    return output + "\n\n" + format_result_stats(RESULTS.stats())
+
+
+@tool
+def table_versions() -> str:
+    """
+    Report the table versions this server is currently serving.
+
+    Tables are opened once and reopened only when a newer version is committed
+    (e.g. after an ingest or index build).
+
+    Returns:
+        Version and age of each open table handle, plus the number of refreshes
+    """
+    return format_versions(get_registry(), TABLE_NAMES)
+
+
+@tool
+def server_stats() -> str:
+    """
+    Report per-tool and per-stage latency for this server.
+
+    Stages: model_load, encode, open_table, name_index, search (Lance scan/filter/ANN)
+    and format. Calls slower than LANCEDB_SLOW_QUERY_MS are logged with their query,
+    filters, stage timings and Lance plan.
+
+    Returns:
+        Call counts, p50/p95/p99 and total time per tool and per stage, plus slow query count
+    """
+    return format_server_stats()
 
 
 if __name__ == "__main__":
+    start_metrics_server()
     mcp.run()
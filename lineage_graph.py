@@ -0,0 +1,250 @@
+"""
+Channel Lineage Graph compiled from the dependencies table
+
+The dependencies table stores each channel's direct inputs/outputs as comma-joined
+name strings. This module compiles them once into per-platform adjacency indexes
+(CSR arrays over interned channel IDs, forward and reverse) so lineage questions are
+answered by graph traversal with no embedding at all:
+- exact channel lookup (case-insensitive)
+- upstream/downstream closure to depth N
+- shortest derivation path between two channels
+- cycle detection
+
+The compiled graph is rebuilt only when the table version changes.
+"""
+
+from array import array
+from collections import deque
+
+GRAPH_COLUMNS = [
+    "platform_name", "platform_alias", "name", "system", "device",
+    "units", "category", "inputs", "outputs", "input_count",
+]
+
+# (table name, table version, LineageGraph) of the last compiled graph
+_graph = None
+
+
+def split_names(names: str) -> list:
+    """Split a comma-joined inputs/outputs string into channel names"""
+    return [n.strip() for n in (names or "").split(",") if n.strip()]
+
+
+class CSR:
+    """Compressed sparse row adjacency: neighbors of node i are indices[indptr[i]:indptr[i+1]]"""
+
+    def __init__(self, num_nodes: int, edges: list):
+        counts = [0] * (num_nodes + 1)
+        for src, _ in edges:
+            counts[src + 1] += 1
+        for i in range(num_nodes):
+            counts[i + 1] += counts[i]
+        self.indptr = array("l", counts)
+
+        cursor = counts[:-1]
+        indices = [0] * len(edges)
+        for src, dst in edges:
+            indices[cursor[src]] = dst
+            cursor[src] += 1
+        self.indices = array("l", indices)
+
+    def neighbors(self, node: int):
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+
+class PlatformGraph:
+    """Lineage graph of one platform"""
+
+    def __init__(self, platform_name: str, platform_alias: str = ""):
+        self.platform_name = platform_name
+        self.platform_alias = platform_alias
+        self.ids = {}    # lowercased channel name -> id
+        self.names = []  # id -> channel name
+        self.rows = []   # id -> dependencies row (None if only referenced as an input/output)
+        self._edges = set()
+        self.forward = None  # input -> output
+        self.reverse = None  # output -> input
+
+    def intern(self, name: str) -> int:
+        key = " ".join(name.split()).lower()
+        if key not in self.ids:
+            self.ids[key] = len(self.names)
+            self.names.append(name)
+            self.rows.append(None)
+        return self.ids[key]
+
+    def add_row(self, row: dict):
+        node = self.intern(row["name"])
+        if self.rows[node] is None:
+            self.rows[node] = row
+        for name in split_names(row.get("inputs")):
+            self._edges.add((self.intern(name), node))
+        for name in split_names(row.get("outputs")):
+            self._edges.add((node, self.intern(name)))
+
+    def compile(self):
+        edges = sorted(self._edges)
+        self.forward = CSR(len(self.names), edges)
+        self.reverse = CSR(len(self.names), [(dst, src) for src, dst in edges])
+        self._edges = set()
+
+    def find(self, channel: str):
+        """Node id for an exact (case-insensitive) channel name, or None"""
+        return self.ids.get(" ".join(channel.split()).lower())
+
+    def closure(self, node: int, depth: int, upstream: bool) -> list:
+        """[(node, hops)] reachable within depth hops, in BFS order"""
+        csr = self.reverse if upstream else self.forward
+        seen = {node}
+        result = []
+        frontier = [node]
+        for hops in range(1, depth + 1):
+            next_frontier = []
+            for current in frontier:
+                for neighbor in csr.neighbors(current):
+                    if neighbor not in seen:
+                        seen.add(neighbor)
+                        result.append((neighbor, hops))
+                        next_frontier.append(neighbor)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        return result
+
+    def path(self, source: int, target: int):
+        """Shortest derivation path source -> ... -> target as a list of node ids, or None"""
+        parents = {source: None}
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            if current == target:
+                path = []
+                while current is not None:
+                    path.append(current)
+                    current = parents[current]
+                return path[::-1]
+            for neighbor in self.forward.neighbors(current):
+                if neighbor not in parents:
+                    parents[neighbor] = current
+                    queue.append(neighbor)
+        return None
+
+    def cycles(self) -> list:
+        """Strongly connected components that contain a cycle (iterative Tarjan)"""
+        index, low, on_stack = {}, {}, set()
+        stack, result = [], []
+        counter = 0
+
+        for root in range(len(self.names)):
+            if root in index:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, i = work[-1]
+                if i == 0:
+                    index[node] = low[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack.add(node)
+
+                neighbors = self.forward.neighbors(node)
+                if i < len(neighbors):
+                    work[-1] = (node, i + 1)
+                    neighbor = neighbors[i]
+                    if neighbor not in index:
+                        work.append((neighbor, 0))
+                    elif neighbor in on_stack:
+                        low[node] = min(low[node], index[neighbor])
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in neighbors:
+                        result.append(component[::-1])
+        return result
+
+
+class LineageGraph:
+    """Per-platform lineage graphs, addressable by actual platform name or alias"""
+
+    def __init__(self, rows: list):
+        self.platforms = {}
+        self.aliases = {}
+        for row in rows:
+            name = row.get("platform_name")
+            if not name or not row.get("name"):
+                continue
+            graph = self.platforms.get(name)
+            if graph is None:
+                graph = self.platforms[name] = PlatformGraph(name, row.get("platform_alias") or "")
+                if graph.platform_alias:
+                    self.aliases[graph.platform_alias] = name
+            graph.add_row(row)
+        for graph in self.platforms.values():
+            graph.compile()
+
+    def platform(self, platform: str):
+        """PlatformGraph for an actual name or alias, or None"""
+        return self.platforms.get(platform) or self.platforms.get(self.aliases.get(platform, ""))
+
+
+def get_lineage_graph(table) -> LineageGraph:
+    """Compiled lineage graph for the dependencies table, rebuilt on a new table version"""
+    global _graph
+    if _graph is None or _graph[0] != table.name or _graph[1] != table.version:
+        columns = [c for c in GRAPH_COLUMNS if c in table.schema.names]
+        rows = table.to_lance().to_table(columns=columns).to_pylist()
+        _graph = (table.name, table.version, LineageGraph(rows))
+    return _graph[2]
+
+
+def format_closure(graph: PlatformGraph, node: int, depth: int) -> str:
+    """Multi-hop upstream and downstream sections for get_channel_lineage"""
+    output = ""
+    for upstream, arrow, label in [(True, "<-", "Upstream"), (False, "->", "Downstream")]:
+        reached = graph.closure(node, depth, upstream)
+        output += f"\n\n{label} Closure (up to {depth} hops): {len(reached)} channels"
+        for other, hops in reached:
+            output += f"\n  {'  ' * (hops - 1)}{arrow} {graph.names[other]} (hop {hops})"
+    return output
+
+
+def format_path(graph: PlatformGraph, source: str, target: str) -> str:
+    """Shortest derivation path between two channels, in either direction"""
+    source_id, target_id = graph.find(source), graph.find(target)
+    for name, node in [(source, source_id), (target, target_id)]:
+        if node is None:
+            return f"No channel named '{name}' found for platform '{graph.platform_name}'."
+
+    path = graph.path(source_id, target_id)
+    if path is None:
+        path = graph.path(target_id, source_id)
+    if path is None:
+        return f"No derivation path between '{source}' and '{target}'."
+
+    output = f"Derivation Path ({len(path) - 1} hops):"
+    for i, node in enumerate(path):
+        output += f"\n  {'-> ' if i else ''}{graph.names[node]}"
+    return output
+
+
+def format_cycles(graph: PlatformGraph) -> str:
+    """Dependency cycles in a platform's lineage graph"""
+    cycles = graph.cycles()
+    if not cycles:
+        return f"No dependency cycles found for platform '{graph.platform_name}'."
+
+    output = f"Dependency Cycles ({len(cycles)}):"
+    for i, component in enumerate(cycles, 1):
+        output += f"\n[{i}] {len(component)} channels: " + ", ".join(graph.names[n] for n in component)
+    return output
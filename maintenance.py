@@ -0,0 +1,159 @@
+"""
+Dataset Maintenance for the channel_summary_vectordb tables
+
+Every incremental ingest commits new fragments, deletion files and a new version.
+lance.auto_cleanup eventually drops old versions, but nothing merges small fragments
+or materializes deletions, so scans slow down as updates accumulate. For each table
+this module:
+1. Reports fragment count (and how many are small), deleted-row ratio, unindexed
+   rows, version count and on-disk size
+2. Compacts fragments (materializing deletions) when a threshold is exceeded, then
+   folds new rows into the existing indexes
+3. Prunes old versions without breaking readers: a version is only removed once
+   its successor has existed for a grace period, so the MCP server (which re-checks
+   table versions every LANCEDB_REFRESH_INTERVAL seconds and pins a version per
+   request) has long since moved off it
+4. Times a projected full scan before and after
+
+Compaction and index optimization only add versions, so readers are never blocked.
+"""
+
+import statistics
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Compaction triggers
+MAX_FRAGMENTS = 8           # more fragments than this
+MAX_DELETED_RATIO = 0.10    # or more than 10% of physical rows deleted
+MAX_UNINDEXED_RATIO = 0.05  # optimize indexes when more than 5% of rows are unindexed
+TARGET_ROWS_PER_FRAGMENT = 1024 * 1024
+SMALL_FRAGMENT_ROWS = TARGET_ROWS_PER_FRAGMENT // 8
+
+# Version pruning
+KEEP_VERSIONS_DAYS = 7.0
+READER_GRACE_MINUTES = 10.0
+PRUNE_MARGIN = timedelta(seconds=1)
+
+SCAN_REPEATS = 3
+
+
+def disk_size(path: Path) -> int:
+    """Bytes under a dataset directory (0 for non-local URIs)"""
+    if not path.is_dir():
+        return 0
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def dataset_stats(dataset) -> dict:
+    """Fragment, deletion, index and version statistics of a Lance dataset"""
+    fragments = dataset.get_fragments()
+    physical = live = small = 0
+    for fragment in fragments:
+        rows = fragment.metadata.physical_rows
+        physical += rows
+        live += fragment.count_rows()
+        small += rows < SMALL_FRAGMENT_ROWS
+
+    unindexed = 0
+    for index in dataset.list_indices():
+        stats = dataset.stats.index_stats(index["name"])
+        unindexed = max(unindexed, stats.get("num_unindexed_rows", 0))
+
+    return {
+        "version": dataset.version,
+        "versions": len(dataset.versions()),
+        "fragments": len(fragments),
+        "small_fragments": small,
+        "rows": live,
+        "deleted_rows": physical - live,
+        "deleted_ratio": (physical - live) / physical if physical else 0.0,
+        "unindexed_rows": unindexed,
+        "bytes": disk_size(Path(dataset.uri)),
+    }
+
+
+def scan_latency(dataset, repeats: int = SCAN_REPEATS) -> float:
+    """Median seconds for a full scan of the first non-vector column"""
+    column = next((f.name for f in dataset.schema if f.name != "vector"), None)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        dataset.to_table(columns=[column] if column else [])
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def prune_cutoff(versions: list, keep: timedelta, grace: timedelta, margin: timedelta = PRUNE_MARGIN):
+    """
+    Timestamp before which versions may be removed: older than keep, and superseded by
+    a version that has existed for at least grace, less margin (so the newest settled
+    version is never caught). None when no version is that old, i.e. nothing to prune.
+    """
+    if len(versions) < 2:
+        return None
+    timestamps = sorted(v["timestamp"] for v in versions)
+    now = datetime.now(timestamps[-1].tzinfo)
+    settled = [t for t in timestamps if t <= now - grace]
+    if not settled:
+        return None
+    cutoff = min(now - keep, settled[-1]) - margin
+    return cutoff if timestamps[0] < cutoff else None
+
+
+def maintain_table(table, dry_run: bool = False, force: bool = False, max_fragments: int = MAX_FRAGMENTS,
+                   max_deleted_ratio: float = MAX_DELETED_RATIO, keep_days: float = KEEP_VERSIONS_DAYS,
+                   grace_minutes: float = READER_GRACE_MINUTES) -> dict:
+    """Report on one table and compact / reindex / prune it as needed"""
+    dataset = table.to_lance()
+    before = dataset_stats(dataset)
+    result = {"table": table.name, "before": before, "actions": [], "scan_before": scan_latency(dataset)}
+
+    compact = force or before["fragments"] > max_fragments or before["deleted_ratio"] > max_deleted_ratio
+    reindex = force or before["unindexed_rows"] > MAX_UNINDEXED_RATIO * max(before["rows"], 1)
+    cutoff = prune_cutoff(dataset.versions(), timedelta(days=keep_days), timedelta(minutes=grace_minutes))
+
+    if dry_run:
+        due = [("compact", compact), ("optimize indexes", compact or reindex), ("prune", cutoff is not None)]
+        result["actions"] = [f"would {action}" for action, needed in due if needed]
+        result["after"], result["scan_after"] = before, result["scan_before"]
+        return result
+
+    if compact:
+        metrics = dataset.optimize.compact_files(target_rows_per_fragment=TARGET_ROWS_PER_FRAGMENT,
+                                                 materialize_deletions=True,
+                                                 materialize_deletions_threshold=max_deleted_ratio)
+        result["actions"].append(f"compacted {metrics.fragments_removed} -> {metrics.fragments_added} fragments")
+        dataset = dataset.checkout_version(dataset.latest_version)
+    if (compact or reindex) and dataset.list_indices():
+        dataset.optimize.optimize_indices()  # compaction remaps rows; fold unindexed rows in too
+        result["actions"].append("optimized indexes")
+        dataset = dataset.checkout_version(dataset.latest_version)
+    if cutoff is not None:
+        older_than = datetime.now(cutoff.tzinfo) - cutoff
+        stats = dataset.cleanup_old_versions(older_than=older_than, delete_unverified=False)
+        if stats.old_versions:
+            result["actions"].append(f"pruned {stats.old_versions} versions ({stats.bytes_removed / 1e6:.1f} MB)")
+
+    result["after"] = dataset_stats(dataset)
+    result["scan_after"] = scan_latency(dataset)
+    return result
+
+
+def format_maintenance(results: list, dry_run: bool = False) -> str:
+    """Per-table before/after report"""
+    output = "Maintenance" + (" (dry run)" if dry_run else "") + ":\n" + "-" * 50
+    for r in results:
+        b, a = r["before"], r["after"]
+        version = f"v{b['version']}" + (f" -> v{a['version']}" if a["version"] != b["version"] else "")
+        output += f"\n{r['table']} ({version}):"
+        output += f"\n    rows: {a['rows']}  versions: {b['versions']} -> {a['versions']}"
+        output += (f"\n    fragments: {b['fragments']} ({b['small_fragments']} small) -> "
+                   f"{a['fragments']} ({a['small_fragments']} small)")
+        output += (f"\n    deleted rows: {b['deleted_rows']} ({b['deleted_ratio']:.1%}) -> "
+                   f"{a['deleted_rows']} ({a['deleted_ratio']:.1%})")
+        output += f"\n    unindexed rows: {b['unindexed_rows']} -> {a['unindexed_rows']}"
+        output += f"\n    size on disk: {b['bytes'] / 1e6:.1f} MB -> {a['bytes'] / 1e6:.1f} MB"
+        output += f"\n    scan: {r['scan_before'] * 1000:.1f} ms -> {r['scan_after'] * 1000:.1f} ms"
+        output += f"\n    actions: {', '.join(r['actions']) or 'none needed'}"
+    return output
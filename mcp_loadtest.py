@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""
+Load Test for the LanceDB MCP tools: throughput vs concurrent clients
+
+Calls the registered (async) tools through FastMCP's call_tool, the same path an MCP
+client takes, with an increasing number of concurrent clients.
+
+Usage:
+    python mcp_loadtest.py
+    python mcp_loadtest.py --tool search_oandm --clients 1 4 16 --requests 128 --unique
+"""
+
+import argparse
+import asyncio
+import time
+
+from lancedb_mcp import mcp
+
+SAMPLE_QUERIES = [
+    "roll rate", "wind speed", "Northings", "heave acceleration", "GPS sensor",
+    "calibration procedure", "pitch angle", "current direction",
+]
+
+
+async def run_level(tool: str, clients: int, requests: int, platform: str, unique: bool) -> dict:
+    """Issue `requests` tool calls from `clients` concurrent workers"""
+    latencies = []
+    counter = iter(range(requests))
+
+    async def client():
+        for i in counter:
+            query = SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)]
+            if unique:
+                query = f"{query} {clients}-{i}"  # defeat the embedding cache
+            start = time.perf_counter()
+            await mcp.call_tool(tool, {"query": query, "platform": platform})
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "clients": clients,
+        "qps": requests / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="MCP tool load test")
+    parser.add_argument("--tool", default="search_descriptions", help="Tool to call")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="Concurrency levels")
+    parser.add_argument("--requests", type=int, default=64, help="Requests per level")
+    parser.add_argument("--platform", "-p", default="", help="Platform filter")
+    parser.add_argument("--unique", action="store_true", help="Make every query unique so each one is encoded")
+    args = parser.parse_args()
+
+    # Warm-up: load the model and open the table outside the measurement
+    await mcp.call_tool(args.tool, {"query": "warm up", "platform": args.platform})
+
+    print(f"{'clients':>8} {'QPS':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    print("-" * 36)
+    for clients in args.clients:
+        r = await run_level(args.tool, clients, args.requests, args.platform, args.unique)
+        print(f"{r['clients']:>8} {r['qps']:>8.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
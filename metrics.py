@@ -0,0 +1,266 @@
+"""
+Per-Stage Timing Metrics shared by lancedb_cli.py and lancedb_mcp.py
+
+Every tool call / CLI command runs inside request(), and the expensive stages inside
+it are wrapped in timed(stage):
+- model_load: loading the embedding model
+- encode:     running the model on query text
+- open_table: (re)opening a Lance table
+- name_index: literal channel-name resolution
+- search:     the Lance scan / filter / ANN query itself
+- format:     building the text answer (where measured separately)
+
+Timings go into fixed-bucket histograms (per stage and per tool), per-request stage
+breakdowns (CLI --profile) and a slow-query log with the query, filters and Lance
+plan. Set LANCEDB_METRICS=0 to disable: timed() then costs a ContextVar lookup.
+LANCEDB_METRICS_PORT serves the histograms as Prometheus text on /metrics.
+"""
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_ENABLED = os.environ.get("LANCEDB_METRICS", "1") != "0"
+SLOW_QUERY_MS = float(os.environ.get("LANCEDB_SLOW_QUERY_MS", "1000"))
+METRICS_PORT = int(os.environ.get("LANCEDB_METRICS_PORT", "0"))  # 0 = no endpoint
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Stage timings of the current request (None outside request()). Batch fan-out
+# threads share one request's dict through copy_context(), so updates take the lock.
+_request = ContextVar("request_timings", default=None)
+_timings_lock = threading.Lock()
+
+slow_log = logging.getLogger("lancedb.slow")
+
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> float:
+        """Approximate quantile (linear within the bucket, as Prometheus histogram_quantile)"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= target and n:
+                low = BUCKETS[i - 1] if i > 0 else 0.0
+                high = BUCKETS[i] if i < len(BUCKETS) else BUCKETS[-1]
+                return low + (high - low) * (target - seen) / n
+            seen += n
+        return BUCKETS[-1]
+
+
+class Metrics:
+    """Histograms keyed by (family, label) plus named counters"""
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self.started = time.time()
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, family: str, label: str, seconds: float):
+        with self._lock:
+            histogram = self._histograms.get((family, label))
+            if histogram is None:
+                histogram = self._histograms[(family, label)] = Histogram()
+            histogram.observe(seconds)
+
+    def inc(self, name: str, label: str = "", n: int = 1):
+        with self._lock:
+            self._counters[(name, label)] = self._counters.get((name, label), 0) + n
+
+    def histograms(self, family: str) -> dict:
+        with self._lock:
+            return {label: h for (f, label), h in sorted(self._histograms.items()) if f == family}
+
+    def counter(self, name: str, label: str = "") -> int:
+        return self._counters.get((name, label), 0)
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        for family in sorted({f for (f, _), _ in histograms}):
+            metric = f"lancedb_{family}_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            for (f, label), h in histograms:
+                if f != family:
+                    continue
+                cumulative = 0
+                for bound, n in zip(list(BUCKETS) + ["+Inf"], h.counts):
+                    cumulative += n
+                    lines.append(f'{metric}_bucket{{{family}="{label}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{{family}="{label}"}} {h.sum}')
+                lines.append(f'{metric}_count{{{family}="{label}"}} {h.count}')
+
+        for name in sorted({n for (n, _), _ in counters}):
+            lines.append(f"# TYPE lancedb_{name}_total counter")
+            for (n, label), value in counters:
+                if n == name:
+                    labels = f'{{tool="{label}"}}' if label else ""
+                    lines.append(f"lancedb_{name}_total{labels} {value}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+@contextmanager
+def timed(stage: str):
+    """Time a stage into the stage histogram and the current request's breakdown"""
+    timings = _request.get()
+    if timings is None and not METRICS.enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if METRICS.enabled:
+            METRICS.observe("stage", stage, elapsed)
+        if timings is not None:
+            with _timings_lock:
+                timings[stage] = timings.get(stage, 0.0) + elapsed
+
+
+def note(key: str, value):
+    """Attach detail (filters, the Lance query builder) to the current request for the slow log"""
+    timings = _request.get()
+    if timings is not None:
+        with _timings_lock:
+            timings.setdefault("_notes", {})[key] = value
+
+
+@contextmanager
+def request(tool: str, params: dict, force: bool = False):
+    """
+    Time one tool call / command; yields its stage breakdown (seconds, plus "total"),
+    or None when metrics are off and force (--profile) is not set
+    """
+    if not (METRICS.enabled or force) or _request.get() is not None:
+        yield None
+        return
+
+    timings = {}
+    token = _request.set(timings)
+    start = time.perf_counter()
+    try:
+        yield timings
+    except Exception:
+        if METRICS.enabled:
+            METRICS.inc("errors", tool)
+        raise
+    finally:
+        _request.reset(token)
+        timings["total"] = time.perf_counter() - start
+        if METRICS.enabled:
+            METRICS.observe("tool", tool, timings["total"])
+            METRICS.inc("requests", tool)
+        if timings["total"] * 1000 >= SLOW_QUERY_MS:
+            METRICS.inc("slow_queries", tool)
+            _log_slow(tool, params, timings)
+
+
+def _log_slow(tool: str, params: dict, timings: dict):
+    notes = timings.get("_notes", {})
+    plan = ""
+    search = notes.get("search")
+    if search is not None:
+        try:
+            plan = search.explain_plan()
+        except Exception as e:
+            plan = f"(unavailable: {e})"
+    record = {
+        "tool": tool,
+        "params": {k: v for k, v in params.items() if isinstance(v, (str, int, float, bool)) or v is None},
+        "filters": notes.get("filters", []),
+        "stages_ms": {k: round(v * 1000, 2) for k, v in timings.items() if not k.startswith("_")},
+        "plan": plan,
+    }
+    slow_log.warning("slow query: %s", json.dumps(record, default=str))
+
+
+def stage_breakdown(timings: dict) -> list:
+    """[(stage, seconds)] in order, with the unmeasured remainder as "other" """
+    stages = [(k, v) for k, v in timings.items() if not k.startswith("_") and k != "total"]
+    other = timings.get("total", 0.0) - sum(v for _, v in stages)
+    return stages + [("other", max(0.0, other)), ("total", timings.get("total", 0.0))]
+
+
+def format_profile(timings: dict) -> str:
+    """Per-request stage breakdown (CLI --profile)"""
+    total = timings.get("total", 0.0) or 1e-9
+    output = "Profile:\n" + "-" * 50
+    for stage, seconds in stage_breakdown(timings):
+        output += f"\n{stage:<12} {seconds * 1000:>9.2f} ms {seconds / total:>7.1%}"
+    return output
+
+
+def format_server_stats(metrics: Metrics = METRICS) -> str:
+    """Per-tool and per-stage latency summary"""
+    if not metrics.enabled:
+        return "Metrics are disabled (LANCEDB_METRICS=0)."
+
+    output = f"Server Stats (uptime {time.time() - metrics.started:.0f}s):\n" + "-" * 50
+    for family, title in (("tool", "Tools"), ("stage", "Stages")):
+        output += f"\n{title}:\n  {'':<22} {'calls':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'total s':>8}"
+        for label, h in metrics.histograms(family).items():
+            output += (f"\n  {label:<22} {h.count:>7} {h.quantile(0.5) * 1000:>8.1f} "
+                       f"{h.quantile(0.95) * 1000:>8.1f} {h.quantile(0.99) * 1000:>8.1f} {h.sum:>8.2f}")
+            if family == "tool" and metrics.counter("errors", label):
+                output += f"  ({metrics.counter('errors', label)} errors)"
+        output += "\n"
+    slow = sum(metrics.counter("slow_queries", label) for label in metrics.histograms("tool"))
+    output += f"\nSlow queries (>= {SLOW_QUERY_MS:.0f} ms): {slow}"
+    output += "\n(percentiles are interpolated within histogram buckets)"
+    return output
+
+
+def start_metrics_server(port: int = METRICS_PORT, metrics: Metrics = METRICS):
+    """Serve Prometheus text on 127.0.0.1:port/metrics from a daemon thread (no-op for port 0)"""
+    if not port:
+        return None
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,205 @@
+"""
+Channel Name Resolver Index
+
+Many queries are literal channel names ("Roll Rate", "Spar Northings"). This index
+answers them directly, ahead of the embedding path, from per-platform structures over
+the channel name columns:
+- hash map for exact (case/whitespace-insensitive) matches
+- sorted key array for prefix matches (bisect)
+- trigram index for typos (Jaccard similarity)
+
+resolve_channel_names() only returns rows when the match is confident; otherwise it
+returns []. Searches use it through resolve_then_search(): in vector mode only (fts
+and hybrid are explicit choices), resolved rows come first and the search fills the
+remaining slots, so a name hit never cuts a result list short. Indexes are rebuilt
+only when the table version changes.
+"""
+
+import os
+from bisect import bisect_left
+
+from metrics import timed
+
+# Name columns indexed per table (channel names only: bare channel numbers such as
+# "1" would take over ordinary queries)
+NAME_COLUMNS = {
+    "descriptions": ["channame"],
+    "dependencies": ["name"],
+}
+
+# Columns identifying a channel row, to drop search rows the resolver already returned
+IDENTITY_COLUMNS = {
+    "descriptions": ["platform_name", "device", "channame"],
+    "dependencies": ["platform_name", "name"],
+}
+
+# Columns kept per row, so resolved channels can be formatted without reading vectors
+DETAIL_COLUMNS = {
+    "descriptions": [
+        "platform_name", "platform_alias", "system", "device",
+        "channo", "channame", "chanunits", "description",
+    ],
+    "dependencies": [
+        "platform_name", "platform_alias", "name", "system", "device", "units",
+        "category", "inputs", "outputs", "input_count",
+    ],
+}
+
+# Prefix matches need at least this many characters and at most `limit` distinct names
+MIN_PREFIX_LENGTH = 4
+
+# Typo matches need this trigram similarity and a clear lead over the runner-up
+FUZZY_MIN_SIMILARITY = float(os.environ.get("LANCEDB_NAME_FUZZY_MIN", "0.6"))
+FUZZY_MIN_MARGIN = 0.1
+
+# table name -> (table version, NameIndex)
+_indexes = {}
+
+
+def normalize_name(text: str) -> str:
+    """Case- and whitespace-insensitive lookup key"""
+    return " ".join(str(text).split()).lower()
+
+
+def trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PlatformNames:
+    """Exact, prefix and trigram structures for one platform"""
+
+    def __init__(self):
+        self.exact = {}  # key -> [row positions]
+        self.keys = []   # sorted keys
+        self.grams = {}  # trigram -> [keys]
+
+    def add(self, key: str, position: int):
+        self.exact.setdefault(key, []).append(position)
+
+    def compile(self):
+        self.keys = sorted(self.exact)
+        for key in self.keys:
+            for gram in trigrams(key):
+                self.grams.setdefault(gram, []).append(key)
+
+    def prefix(self, key: str) -> list:
+        matches = []
+        i = bisect_left(self.keys, key)
+        while i < len(self.keys) and self.keys[i].startswith(key):
+            matches.append(self.keys[i])
+            i += 1
+        return matches
+
+    def fuzzy(self, key: str) -> list:
+        """[(similarity, key)] best first"""
+        query = trigrams(key)
+        shared = {}
+        for gram in query:
+            for candidate in self.grams.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        scored = [
+            (count / (len(query) + len(trigrams(candidate)) - count), candidate)
+            for candidate, count in shared.items()
+        ]
+        return sorted(scored, reverse=True)
+
+
+class NameIndex:
+    """Channel-name index over one table, per platform"""
+
+    def __init__(self, rows: list, name_columns: list):
+        self.rows = rows
+        self.platforms = {}
+        self.aliases = {}
+        for position, row in enumerate(rows):
+            platform = row.get("platform_name")
+            if not platform:
+                continue
+            names = self.platforms.get(platform)
+            if names is None:
+                names = self.platforms[platform] = PlatformNames()
+                if row.get("platform_alias"):
+                    self.aliases[row["platform_alias"]] = platform
+            for column in name_columns:
+                if row.get(column):
+                    names.add(normalize_name(row[column]), position)
+        for names in self.platforms.values():
+            names.compile()
+
+    def _scopes(self, platform: str) -> list:
+        if not platform:
+            return list(self.platforms.values())
+        names = self.platforms.get(platform) or self.platforms.get(self.aliases.get(platform, ""))
+        return [names] if names else []
+
+    def resolve(self, text: str, platform: str = "", limit: int = 5):
+        """(match type, rows) for a confident name match, or (None, [])"""
+        key = normalize_name(text)
+        scopes = self._scopes(platform)
+        if not key or not scopes:
+            return None, []
+
+        exact = [p for names in scopes for p in names.exact.get(key, ())]
+        if exact:
+            return "exact", [self.rows[p] for p in exact]
+
+        if len(key) >= MIN_PREFIX_LENGTH:
+            hits = [(names, k) for names in scopes for k in names.prefix(key)]
+            if 0 < len({k for _, k in hits}) <= limit:
+                return "prefix", [self.rows[p] for names, k in hits for p in names.exact[k]]
+
+        # The same name on several platforms counts as one candidate
+        candidates = {}
+        for names in scopes:
+            for similarity, k in names.fuzzy(key)[:2]:
+                candidates.setdefault(k, [similarity, []])[1].append(names)
+        ranked = sorted(candidates.items(), key=lambda item: item[1][0], reverse=True)
+        if ranked and ranked[0][1][0] >= FUZZY_MIN_SIMILARITY:
+            runner_up = ranked[1][1][0] if len(ranked) > 1 else 0.0
+            if ranked[0][1][0] - runner_up >= FUZZY_MIN_MARGIN:
+                k, (_, matched) = ranked[0]
+                return "fuzzy", [self.rows[p] for names in matched for p in names.exact[k]]
+
+        return None, []
+
+
+def get_name_index(table) -> NameIndex:
+    """Name index for a table, rebuilt on a new table version"""
+    cached = _indexes.get(table.name)
+    if cached is None or cached[0] != table.version:
+        columns = [c for c in DETAIL_COLUMNS[table.name] if c in table.schema.names]
+        rows = table.to_lance().to_table(columns=columns).to_pylist()
+        cached = _indexes[table.name] = (table.version, NameIndex(rows, NAME_COLUMNS[table.name]))
+    return cached[1]
+
+
+def resolve_channel_names(table, query: str, platform: str = "", device: str = "", limit: int = 5) -> list:
+    """Rows whose channel name confidently matches the query, or [] to fall back to semantic search"""
+    if table.name not in NAME_COLUMNS:
+        return []
+    with timed("name_index"):
+        _, rows = get_name_index(table).resolve(query, platform, limit)
+    if device:
+        rows = [r for r in rows if r.get("device") == device]
+    return rows[:limit]
+
+
+def resolve_then_search(table, query: str, search, platform: str = "", device: str = "", limit: int = 5,
+                        mode: str = "vector") -> list:
+    """
+    Up to limit rows: confident channel-name matches first (vector mode only), then
+    search(limit) rows that are not already among them. When the matches alone fill
+    limit the search is skipped; otherwise the list is exactly as complete as the
+    search's, so paging and exhaustion follow the search, never the resolver.
+    """
+    resolved = resolve_channel_names(table, query, platform, device, limit) if mode == "vector" else []
+    if len(resolved) >= limit:
+        return resolved[:limit]
+    results = search(limit)
+    if not resolved:
+        return results
+    columns = IDENTITY_COLUMNS[table.name]
+    seen = {tuple(r.get(c) for c in columns) for r in resolved}
+    rows = results if isinstance(results, list) else results.to_pylist()
+    return (resolved + [r for r in rows if tuple(r.get(c) for c in columns) not in seen])[:limit]
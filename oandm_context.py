@@ -0,0 +1,175 @@
+"""
+O&M Neighbor-Chunk Context from a (document, chunk_id) -> row index
+
+search_oandm returns isolated chunks; when a procedure runs across a chunk boundary
+agents used to issue more semantic searches hoping to hit the neighbors. This module
+keeps a per-table-version index from (platform, document, chunk_id) to the row's
+position in the dataset, so the neighbors of any set of hits are read with a single
+positional take:
+1. each hit asks for chunk_id - window .. chunk_id + window of its document
+2. overlapping / adjacent windows of the same document are merged
+3. all rows of all merged windows are fetched in one take
+4. consecutive chunks are stitched into one passage, dropping the words each chunk
+   repeats from the previous one (ingest overlaps chunks by ~200 characters)
+
+The index is rebuilt only when the table version changes; positions are only valid
+for the version they were read from.
+"""
+
+from array import array
+
+from metrics import timed
+
+INDEX_COLUMNS = ["platform_name", "document_name", "chunk_id"]
+MAX_WINDOW = 10
+MAX_OVERLAP_WORDS = 120  # longest repeated run looked for between consecutive chunks
+
+# (table name, table version, ChunkIndex) of the last built index
+_index = None
+
+
+class ChunkIndex:
+    """(platform, document) -> row positions by chunk_id (-1 where a chunk is missing)"""
+
+    def __init__(self, rows: list):
+        self.positions = {}
+        self.platforms = {}  # document -> platforms holding a document of that name
+        for position, row in enumerate(rows):
+            key = (row["platform_name"], row["document_name"])
+            chunk_id = row["chunk_id"]
+            if key[1] is None or chunk_id is None or chunk_id < 0:
+                continue
+            slots = self.positions.setdefault(key, array("l"))
+            if len(slots) <= chunk_id:
+                slots.extend([-1] * (chunk_id + 1 - len(slots)))
+            slots[chunk_id] = position
+            self.platforms.setdefault(key[1], set()).add(key[0])
+
+    def document(self, document: str, platform: str = ""):
+        """(platform, document) key for a document name, or None if unknown or ambiguous"""
+        platforms = self.platforms.get(document, set())
+        if platform:
+            return (platform, document) if platform in platforms else None
+        return (next(iter(platforms)), document) if len(platforms) == 1 else None
+
+
+def get_chunk_index(table) -> ChunkIndex:
+    """(document, chunk_id) position index for the oandm_manuals table, rebuilt on a new version"""
+    global _index
+    if _index is None or _index[0] != table.name or _index[1] != table.version:
+        rows = table.to_lance().to_table(columns=INDEX_COLUMNS).to_pylist()
+        _index = (table.name, table.version, ChunkIndex(rows))
+    return _index[2]
+
+
+def merge_windows(hits: list, window: int) -> list:
+    """
+    [(platform, document, first, last, ranks)] from hits [(rank, platform, document, chunk_id)]:
+    overlapping or adjacent windows of one document become one range
+    """
+    by_document = {}
+    for rank, platform, document, chunk_id in hits:
+        by_document.setdefault((platform, document), []).append((max(0, chunk_id - window), chunk_id + window, rank))
+
+    merged = []
+    for (platform, document), ranges in by_document.items():
+        ranges.sort()
+        first, last, ranks = ranges[0][0], ranges[0][1], [ranges[0][2]]
+        for start, end, rank in ranges[1:]:
+            if start <= last + 1:
+                last = max(last, end)
+                ranks.append(rank)
+            else:
+                merged.append((platform, document, first, last, sorted(ranks)))
+                first, last, ranks = start, end, [rank]
+        merged.append((platform, document, first, last, sorted(ranks)))
+    return sorted(merged, key=lambda m: m[4][0])  # in order of the best hit in each passage
+
+
+def stitch(chunks: list) -> str:
+    """Join consecutive chunks, dropping the run of words each repeats from the previous one"""
+    words = []
+    for chunk in chunks:
+        chunk_words = chunk.split()
+        overlap = 0
+        for k in range(min(MAX_OVERLAP_WORDS, len(words), len(chunk_words)), 0, -1):
+            if words[-k:] == chunk_words[:k]:
+                overlap = k
+                break
+        words.extend(chunk_words[overlap:])
+    return " ".join(words)
+
+
+def fetch_passages(table, hits: list, window: int) -> list:
+    """
+    Contiguous passages around hits [(rank, platform, document, chunk_id)], read with one
+    take: [{platform_name, document_name, first_chunk, last_chunk, total_chunks, hits, content}]
+    """
+    window = max(0, min(window, MAX_WINDOW))
+    index = get_chunk_index(table)
+    plans = []
+    for platform, document, first, last, ranks in merge_windows(hits, window):
+        slots = index.positions.get((platform, document), array("l"))
+        last = min(last, len(slots) - 1)
+        chunk_positions = [(c, slots[c]) for c in range(first, last + 1) if slots[c] >= 0]
+        plans.append((platform, document, ranks, chunk_positions))
+
+    positions = sorted({p for *_, chunk_positions in plans for _, p in chunk_positions})
+    if not positions:
+        return []
+    with timed("search"):
+        rows = table.to_lance().take(positions, columns=["content", "total_chunks"]).to_pylist()
+    by_position = dict(zip(positions, rows))
+
+    passages = []
+    for platform, document, ranks, chunk_positions in plans:
+        if not chunk_positions:
+            continue
+        chunks = [by_position[p] for _, p in chunk_positions]
+        passages.append({
+            "platform_name": platform,
+            "document_name": document,
+            "first_chunk": chunk_positions[0][0],
+            "last_chunk": chunk_positions[-1][0],
+            "total_chunks": chunks[0].get("total_chunks"),
+            "hits": ranks,
+            "content": stitch([c.get("content") or "" for c in chunks]),
+        })
+    return passages
+
+
+def expand_hits(table, rows: list, window: int, start: int = 1) -> list:
+    """Passages around search_oandm result rows (ranked from start)"""
+    hits = [(rank, r.get("platform_name"), r.get("document_name"), r.get("chunk_id"))
+            for rank, r in enumerate(rows, start) if r.get("chunk_id") is not None]
+    return fetch_passages(table, hits, window)
+
+
+def format_passage(passage: dict) -> str:
+    first, last = passage["first_chunk"] + 1, passage["last_chunk"] + 1
+    chunks = f"Chunk {first}" if first == last else f"Chunks {first}-{last}"
+    return (f"{passage['platform_name']} | {passage['document_name']}\n"
+            f"    ({chunks} of {passage.get('total_chunks') or '?'})\n"
+            f"    Content: {passage['content']}")
+
+
+def format_passages(passages: list) -> str:
+    """search_oandm(expand=N) text: one block per passage, listing the hits it covers"""
+    blocks = [f"[{', '.join(str(r) for r in p['hits'])}] {format_passage(p)}" for p in passages]
+    return "\n\n".join(blocks) if blocks else "No results found."
+
+
+def format_context(table, document: str, chunk_id: int, window: int = 1, platform: str = "") -> str:
+    """get_oandm_context: a chunk of a document with `window` neighbors on each side"""
+    index = get_chunk_index(table)
+    key = index.document(document, platform)
+    if key is None:
+        platforms = sorted(index.platforms.get(document, ()))
+        if len(platforms) > 1 and not platform:
+            return f"Document '{document}' exists on several platforms ({', '.join(platforms)}); give the platform."
+        return f"No O&M document named '{document}'" + (f" for platform '{platform}'." if platform else ".")
+    slots = index.positions[key]
+    if not 0 <= chunk_id < len(slots) or slots[chunk_id] < 0:
+        return f"Document '{document}' has no chunk {chunk_id} (chunk_id is 0-based, {len(slots)} chunks)."
+    passages = fetch_passages(table, [(1, key[0], key[1], chunk_id)], window)
+    return format_passage(passages[0]) if passages else "No results found."
@@ -0,0 +1,129 @@
+"""
+Structured (JSON) Results and Cursor Pagination for the search tools
+
+A search fetches PAGE_PREFETCH pages of candidates up front and keeps them in the
+result cache (result_cache.py) keyed by (table, table version, query hash). The
+returned cursor is an opaque token holding that query hash, the table version and
+the next offset, so follow-up pages (and repeated or smaller calls) are sliced from
+the cached candidates: no re-encode and no re-search. When the candidates were
+evicted the search is re-run; its query vector is still in the embedding cache.
+
+A cursor is only valid for the same query, filters and mode, and for the table
+version it was issued on; otherwise a ValueError explains what to do.
+"""
+
+import base64
+import hashlib
+import json
+import os
+
+from embedding_cache import normalize_query
+from result_cache import RESULTS
+
+PAGE_PREFETCH = int(os.environ.get("LANCEDB_PAGE_PREFETCH", "3"))
+
+OUTPUT_FORMATS = ["text", "json"]
+
+# Score columns added by Lance / fusion -> score type reported in JSON records, in
+# precedence order: fused hybrid rows also carry the _score / _distance of the list
+# that found them, but only _rrf_score is comparable across the page
+SCORE_COLUMNS = {"_rrf_score": "rrf", "_score": "bm25", "_distance": "distance"}
+HIDDEN_COLUMNS = {"_rowid"}
+
+
+def check_output(output: str):
+    """ValueError unless output is one of OUTPUT_FORMATS"""
+    if output not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format '{output}' (expected one of {', '.join(OUTPUT_FORMATS)})")
+
+
+def query_hash(*parts) -> str:
+    """Stable hash of everything that determines a result list"""
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def encode_cursor(table_name: str, key: str, version: int, offset: int) -> str:
+    state = json.dumps({"t": table_name, "k": key, "v": version, "o": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(state.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return {"table": state["t"], "key": state["k"], "version": state["v"], "offset": int(state["o"])}
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor; pass the next_cursor value from a previous result unchanged")
+
+
+def _rows(results) -> list:
+    return results if isinstance(results, list) else results.to_pylist()
+
+
+def search_page(table, key_parts: tuple, fetch, limit: int, cursor: str = "") -> tuple:
+    """
+    One page of results: (rows, next_cursor or "").
+
+    key_parts: everything that determines the result list (query, filters, mode, ...);
+               the query (first part) is compared case- and whitespace-insensitively
+    fetch(n): up to n candidates in rank order (Arrow table or list of dicts)
+    """
+    query, *rest = key_parts
+    key = query_hash(table.name, normalize_query(query), *rest)
+    offset = 0
+    if cursor:
+        state = decode_cursor(cursor)
+        if state["table"] != table.name or state["key"] != key:
+            raise ValueError("Cursor belongs to a different search; repeat the same query, filters and mode")
+        if state["version"] != table.version:
+            raise ValueError(
+                f"Table '{table.name}' changed since this cursor was issued "
+                f"(v{state['version']} -> v{table.version}); re-run the search without a cursor"
+            )
+        offset = state["offset"]
+
+    cached = RESULTS.get(table.name, table.version, key, offset + limit)
+    if cached is not None:
+        candidates, exhausted = cached
+    else:
+        wanted = max(offset + limit, limit * PAGE_PREFETCH)
+        candidates = _rows(fetch(wanted))
+        exhausted = len(candidates) < wanted
+        RESULTS.put(table.name, table.version, key, candidates, exhausted)
+
+    page = candidates[offset:offset + limit]
+    more = offset + limit < len(candidates) or not exhausted
+    next_cursor = encode_cursor(table.name, key, table.version, offset + limit) if page and more else ""
+    return page, next_cursor
+
+
+def to_record(row: dict) -> dict:
+    """Typed JSON record: the row's columns plus score / score_type (None for name-index matches)"""
+    record = {k: v for k, v in row.items() if k not in SCORE_COLUMNS and k not in HIDDEN_COLUMNS}
+    record["score"], record["score_type"] = None, "name_match"
+    for column, score_type in SCORE_COLUMNS.items():
+        if row.get(column) is not None:
+            record["score"], record["score_type"] = row[column], score_type
+            break
+    return record
+
+
+def format_json(table, query: str, rows: list, next_cursor: str, offset: int = 0, extra: dict = None) -> str:
+    """JSON document for one page of results (plus any extra top-level keys)"""
+    return json.dumps({
+        "table": table.name,
+        "table_version": table.version,
+        "query": query,
+        "results": [dict(to_record(r), rank=offset + i) for i, r in enumerate(rows, 1)],
+        "next_cursor": next_cursor or None,
+        **(extra or {}),
+    }, default=str)
+
+
+def page_offset(cursor: str) -> int:
+    """Offset a cursor resumes at (0 without a cursor)"""
+    return decode_cursor(cursor)["offset"] if cursor else 0
+
+
+def cursor_footer(next_cursor: str) -> str:
+    """Text-mode hint for fetching the next page"""
+    return f"\n\n(more results: cursor={next_cursor})" if next_cursor else ""
@@ -0,0 +1,82 @@
+"""
+Platform Catalog
+
+Listing platforms used to read every row of all four tables (including the 384-float
+vectors) just to take platform_name.unique(). The catalog keeps, per table, the
+distinct (platform_name, platform_alias) pairs with row counts taken from a
+column-projected scan, and only rescans a table when its version changes.
+"""
+
+PLATFORM_COLUMNS = ["platform_name", "platform_alias"]
+
+# table name -> (table version, {platform_name: {"alias": str, "rows": int}})
+_tables = {}
+
+
+def table_platforms(table) -> dict:
+    """Platforms in one table with alias and row count, rescanned only on a new version"""
+    cached = _tables.get(table.name)
+    if cached is not None and cached[0] == table.version:
+        return cached[1]
+
+    columns = [c for c in PLATFORM_COLUMNS if c in table.schema.names]
+    counts = (
+        table.to_lance()
+        .to_table(columns=columns)
+        .group_by(columns)
+        .aggregate([("platform_name", "count")])
+    )
+
+    platforms = {}
+    for row in counts.to_pylist():
+        name = row["platform_name"]
+        if not name:
+            continue
+        entry = platforms.setdefault(name, {"alias": "", "rows": 0})
+        entry["alias"] = entry["alias"] or row.get("platform_alias") or ""
+        entry["rows"] += row["platform_name_count"]
+
+    _tables[table.name] = (table.version, platforms)
+    return platforms
+
+
+def platform_catalog(open_table, table_names: list) -> dict:
+    """
+    Merge the per-table entries into one catalog.
+
+    Returns:
+        {"platforms": {platform_name: {"alias": str, "tables": {table: rows}}},
+         "versions": {table: version}, "errors": {table: message}}
+    """
+    catalog = {"platforms": {}, "versions": {}, "errors": {}}
+    for table_name in table_names:
+        try:
+            table = open_table(table_name)
+            entries = table_platforms(table)
+        except Exception as e:
+            catalog["errors"][table_name] = f"{type(e).__name__}: {e}"
+            continue
+
+        catalog["versions"][table_name] = table.version
+        for name, entry in entries.items():
+            platform = catalog["platforms"].setdefault(name, {"alias": "", "tables": {}})
+            platform["alias"] = platform["alias"] or entry["alias"]
+            platform["tables"][table_name] = entry["rows"]
+    return catalog
+
+
+def format_catalog(catalog: dict) -> str:
+    """Format the catalog as readable text"""
+    output = "Available Platforms:\n" + "-" * 50
+    for name in sorted(catalog["platforms"]):
+        platform = catalog["platforms"][name]
+        tables = ", ".join(f"{t[:4]} {rows}" for t, rows in platform["tables"].items())
+        alias = f" ({platform['alias']})" if platform["alias"] else ""
+        output += f"\n{name}{alias}: [{tables}]"
+
+    versions = ", ".join(f"{t} v{v}" for t, v in catalog["versions"].items())
+    if versions:
+        output += f"\n\nTable versions: {versions}"
+    for table_name, error in catalog["errors"].items():
+        output += f"\nWarning: {table_name} unavailable ({error})"
+    return output
@@ -0,0 +1,125 @@
+"""
+Search Result Cache keyed by table version, query and filters
+
+A search's ranked rows are deterministic for a given table version, and agents
+re-issue identical tool calls when they retry or re-plan. This cache keeps the
+ranked candidate rows of recent searches under (table, table version, hash of the
+normalized query, filters, mode and ANN knobs), so a repeated call is a dict lookup
+and a slice: no encode, no Lance query.
+
+- The limit is not part of the key: an entry holding N rows serves every request
+  for up to N rows (and pages within them); a larger request re-runs the search
+  and replaces the entry
+- Entries are evicted LRU beyond LANCEDB_RESULT_CACHE_SIZE entries or
+  LANCEDB_RESULT_CACHE_ROWS rows in total, and expire after LANCEDB_RESULT_CACHE_TTL
+  seconds
+- The table version is part of the key, so a new version can never be served stale
+  rows; entries of superseded versions are dropped as soon as a newer one is seen
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+RESULT_CACHE_SIZE = int(os.environ.get("LANCEDB_RESULT_CACHE_SIZE", "256"))
+RESULT_CACHE_ROWS = int(os.environ.get("LANCEDB_RESULT_CACHE_ROWS", "20000"))
+RESULT_CACHE_TTL = float(os.environ.get("LANCEDB_RESULT_CACHE_TTL", "600"))
+
+
+class ResultCache:
+    """(table, version, key) -> (ranked rows, exhausted), bounded by entries, rows and age"""
+
+    def __init__(self, max_entries: int = RESULT_CACHE_SIZE, max_rows: int = RESULT_CACHE_ROWS,
+                 ttl: float = RESULT_CACHE_TTL):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.ttl = ttl
+        self._entries = OrderedDict()  # (table, version, key) -> (expires, rows, exhausted)
+        self._versions = {}            # table -> newest version seen
+        self._rows = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def get(self, table: str, version: int, key: str, wanted: int):
+        """(rows, exhausted) when a live entry can serve `wanted` rows, else None"""
+        if self.max_entries <= 0:
+            return None
+        with self._lock:
+            self._see_version(table, version)
+            entry = self._entries.get((table, version, key))
+            if entry is not None and entry[0] < time.monotonic():
+                self._drop((table, version, key))
+                entry = None
+            if entry is None or (len(entry[1]) < wanted and not entry[2]):
+                self.misses += 1
+                return None
+            self._entries.move_to_end((table, version, key))
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, table: str, version: int, key: str, rows: list, exhausted: bool):
+        if self.max_entries <= 0 or len(rows) > self.max_rows:
+            return
+        with self._lock:
+            self._see_version(table, version)
+            if self._versions[table] != version:
+                return  # a newer version was seen while this search ran
+            self._drop((table, version, key))
+            self._entries[(table, version, key)] = (time.monotonic() + self.ttl, rows, exhausted)
+            self._rows += len(rows)
+            while len(self._entries) > self.max_entries or self._rows > self.max_rows:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._rows = 0
+
+    def _see_version(self, table: str, version: int):
+        """Drop the entries of older versions of table once a newer version shows up"""
+        if self._versions.get(table, -1) >= version:
+            return
+        self._versions[table] = version
+        stale = [k for k in self._entries if k[0] == table and k[1] < version]
+        for k in stale:
+            self._drop(k)
+        self.invalidations += len(stale)
+
+    def _drop(self, k):
+        entry = self._entries.pop(k, None)
+        if entry is not None:
+            self._rows -= len(entry[1])
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "rows": self._rows,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "max_entries": self.max_entries,
+                "max_rows": self.max_rows,
+                "ttl": self.ttl,
+            }
+
+
+RESULTS = ResultCache()
+
+
+def format_result_stats(stats: dict) -> str:
+    """Format result cache stats as readable text"""
+    output = "Result Cache:\n" + "-" * 50
+    output += f"\nHits: {stats['hits']}"
+    output += f"\nMisses (searches run): {stats['misses']}"
+    output += f"\nHit rate: {stats['hit_rate']:.1%}"
+    output += f"\nEntries: {stats['entries']}/{stats['max_entries']} ({stats['rows']}/{stats['max_rows']} rows)"
+    output += f"\nEvicted: {stats['evictions']}, invalidated by new table versions: {stats['invalidations']}"
+    output += f"\nTTL: {stats['ttl']:g}s"
+    return output
@@ -0,0 +1,138 @@
+"""
+Scalar Indexes and Filter Planning for platform/device scoped searches
+
+Platform-scoped tools filter on platform_name / platform_alias / device. With bitmap
+indexes on those columns the filter resolves from the index instead of scanning
+string columns, and:
+- the "(platform_name = X OR platform_alias = X)" pattern is rewritten to a single
+  indexed equality on platform_name (the alias is resolved once and cached)
+- prefilter vs postfilter is chosen from the filter's selectivity
+"""
+
+import math
+import threading
+from collections import OrderedDict
+
+from vector_index import indexed_columns
+
+SCALAR_INDEX_COLUMNS = ["platform_name", "platform_alias", "device"]
+
+# Columns with at most this many distinct values get a BITMAP index, others a BTREE
+BITMAP_MAX_CARDINALITY = 1_000
+
+# Filters matching at least this fraction of rows are applied after the vector search
+POSTFILTER_MIN_SELECTIVITY = 0.5
+
+# Resolved platform names / filter selectivities kept (LRU) across all tables
+PLAN_CACHE_SIZE = 1024
+
+
+class _PlanCache:
+    """
+    (table name, key) -> value for the table's current version only: entries of older
+    versions are dropped once a newer version is seen, and at most max_entries are kept
+    (keys include user-supplied platform strings, so the set is otherwise unbounded)
+    """
+
+    def __init__(self, max_entries: int = PLAN_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (table name, version, key) -> value
+        self._versions = {}            # table name -> newest version seen
+        self._lock = threading.Lock()
+
+    def get(self, table, key, compute):
+        """Cached value for key in this version of table, else compute() (stored unless superseded)"""
+        entry = (table.name, table.version, key)
+        with self._lock:
+            if entry in self._entries:
+                self._entries.move_to_end(entry)
+                return self._entries[entry]
+        value = compute()
+        with self._lock:
+            newest = self._versions.get(table.name, -1)
+            if table.version > newest:
+                self._versions[table.name] = table.version
+                for stale in [k for k in self._entries if k[0] == table.name]:
+                    del self._entries[stale]
+            elif table.version < newest:
+                return value  # a pinned older snapshot: answer, but do not keep
+            self._entries[entry] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+
+# platform -> platform_name, and filter -> selectivity
+_platform_names = _PlanCache()
+_selectivity = _PlanCache()
+
+
+def quote(value: str) -> str:
+    """Quote a string literal for a Lance SQL filter"""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def build_scalar_indexes(table, rebuild: bool = False) -> str:
+    """Build scalar indexes on the filter columns present in the table"""
+    import pyarrow.compute as pc
+
+    existing = indexed_columns(table)
+    built = []
+    for column in SCALAR_INDEX_COLUMNS:
+        if column not in table.schema.names or (column in existing and not rebuild):
+            continue
+        values = table.to_lance().to_table(columns=[column]).column(column)
+        cardinality = pc.count_distinct(values).as_py()
+        index_type = "BITMAP" if cardinality <= BITMAP_MAX_CARDINALITY else "BTREE"
+        table.create_scalar_index(column, index_type=index_type, replace=True)
+        built.append(f"{column}={index_type}({cardinality})")
+
+    return "built " + ", ".join(built) if built else "skipped: scalar indexes already exist"
+
+
+def _first_platform_name(table, where: str):
+    rows = table.search().where(where).select(["platform_name"]).limit(1).to_list()
+    return rows[0]["platform_name"] if rows else None
+
+
+def resolve_platform(table, platform: str):
+    """Actual platform_name for an actual name or alias, or None if unknown in this table"""
+    def lookup():
+        name = _first_platform_name(table, f"platform_name = {quote(platform)}")
+        if name is None and "platform_alias" in table.schema.names:
+            name = _first_platform_name(table, f"platform_alias = {quote(platform)}")
+        return name
+
+    return _platform_names.get(table, platform, lookup)
+
+
+def platform_filter(table, platform: str) -> str:
+    """Single indexed equality selecting one platform by actual name or alias"""
+    return f"platform_name = {quote(resolve_platform(table, platform) or platform)}"
+
+
+def filter_selectivity(table, where: str) -> float:
+    """Fraction of rows matching a filter (answered from the scalar indexes)"""
+    def count():
+        total = table.count_rows()
+        return table.count_rows(where) / total if total else 0.0
+
+    return _selectivity.get(table, where, count)
+
+
+def apply_filters(table, search, filters: list, limit: int):
+    """
+    Attach filters and the result limit to a vector search.
+
+    Selective filters are applied before the search (the search only visits matching
+    rows); filters matching most of the table are applied afterwards with the limit
+    over-fetched by 1/selectivity, so callers must slice results to `limit`.
+    """
+    if not filters:
+        return search.limit(limit)
+
+    where = " AND ".join(filters)
+    selectivity = filter_selectivity(table, where)
+    if selectivity >= POSTFILTER_MIN_SELECTIVITY:
+        return search.where(where, prefilter=False).limit(math.ceil(limit / selectivity))
+    return search.where(where, prefilter=True).limit(limit)
@@ -0,0 +1,128 @@
+"""
+Version-aware Table Registry shared by lancedb_cli.py and lancedb_mcp.py
+
+Opening a table re-reads its manifest, so doing it per request costs metadata I/O on
+every query. The registry opens each table once and keeps that handle (a fixed
+version). A refresh is cheap: at most once per refresh interval it lists the table's
+_versions/ directory, reads the latest version number from the manifest names, and
+reopens the table only when it is newer than the handle's. (Directory mtimes are
+too coarse on some filesystems to catch back-to-back commits.)
+
+Requests that touch several tables (or one table several times) run inside
+registry.snapshot(): the first handle each table resolves to is pinned for the rest of
+the request, so a concurrent ingest cannot mix versions within one answer.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from metrics import timed
+
+# Seconds between _versions/ checks per table
+REFRESH_INTERVAL = float(os.environ.get("LANCEDB_REFRESH_INTERVAL", "1.0"))
+
+# Manifest file names under the V2 naming scheme count down from this
+MAX_VERSION = 2 ** 64 - 1
+
+# Table handles pinned by the current request (None outside registry.snapshot())
+_pinned = ContextVar("pinned_tables", default=None)
+
+
+class TableRegistry:
+    """Table name -> open handle, reopened only when a newer version is committed"""
+
+    def __init__(self, db_path, open_db, refresh_interval: float = REFRESH_INTERVAL):
+        self.db_path = Path(db_path)
+        self.open_db = open_db
+        self.refresh_interval = refresh_interval
+        self.refreshes = 0
+        self._entries = {}  # name -> {"table", "stamp", "opened", "checked"}
+        self._lock = threading.Lock()
+
+    def _stamp(self, name: str):
+        """Latest committed version, from the manifest names in _versions/ (None if unreadable)"""
+        latest = None
+        try:
+            with os.scandir(self.db_path / f"{name}.lance" / "_versions") as entries:
+                for entry in entries:
+                    stem, _, suffix = entry.name.partition(".")
+                    if suffix != "manifest" or not stem.isdigit():
+                        continue
+                    # V2 naming writes zero-padded (2^64 - 1 - version) so the newest sorts first
+                    version = MAX_VERSION - int(stem) if len(stem) == 20 else int(stem)
+                    latest = version if latest is None else max(latest, version)
+        except OSError:
+            return None
+        return latest
+
+    def _current(self, name: str):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                if now - entry["checked"] < self.refresh_interval:
+                    return entry["table"]
+                stamp = self._stamp(name)
+                entry["checked"] = now
+                if stamp == entry["stamp"]:
+                    return entry["table"]
+                self.refreshes += 1
+            else:
+                stamp = self._stamp(name)
+
+            with timed("open_table"):
+                table = self.open_db().open_table(name)
+            self._entries[name] = {"table": table, "stamp": stamp, "opened": time.time(), "checked": now}
+            return table
+
+    def get(self, name: str):
+        """Open handle for a table (the request's pinned one inside snapshot())"""
+        pinned = _pinned.get()
+        if pinned is None:
+            return self._current(name)
+        if name not in pinned:
+            pinned.setdefault(name, self._current(name))  # first resolver wins (batch jobs share it)
+        return pinned[name]
+
+    @contextmanager
+    def snapshot(self):
+        """Pin table handles for the duration of a request (nested calls share the outer one)"""
+        if _pinned.get() is not None:
+            yield
+            return
+        token = _pinned.set({})
+        try:
+            yield
+        finally:
+            _pinned.reset(token)
+
+    def clear(self):
+        """Forget all handles (after writes made through another connection)"""
+        with self._lock:
+            self._entries.clear()
+
+    def versions(self) -> dict:
+        """name -> {"version", "opened"} for every table opened so far"""
+        with self._lock:
+            entries = dict(self._entries)
+        return {
+            name: {"version": entry["table"].version, "opened": entry["opened"]}
+            for name, entry in sorted(entries.items())
+        }
+
+
+def format_versions(registry: TableRegistry, names: list) -> str:
+    """Format the table versions being served as readable text"""
+    for name in names:
+        registry.get(name)  # make sure every table is open (and up to date)
+    now = time.time()
+    output = "Table Versions:\n" + "-" * 50
+    for name, info in registry.versions().items():
+        output += f"\n{name}: v{info['version']} (opened {now - info['opened']:.0f}s ago)"
+    output += f"\n\nRefreshes since start: {registry.refreshes}"
+    output += f"\nRefresh check interval: {registry.refresh_interval:g}s"
+    return output
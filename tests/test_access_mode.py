@@ -0,0 +1,74 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from access_mode import AccessPolicy, NameMatcher, PlatformUnavailable, enforce  # noqa: E402
+
+ALIASES = {"Atlantis": "Bear", "Mad Dog": "Unicorn", "Mars": "Falcon"}
+
+
+@pytest.fixture
+def alias_policy():
+    return AccessPolicy("alias", ALIASES)
+
+
+@pytest.mark.parametrize("text, masked", [
+    ("Atlantis_OandM_Rev3.pdf", "Bear_OandM_Rev3.pdf"),
+    ("atlantis-oandm.pdf", "Bear-oandm.pdf"),
+    ("Atlantis3 riser", "Bear3 riser"),
+    ("OandM/Atlantis/Manual.pdf", "OandM/Bear/Manual.pdf"),
+    ("AtlantisPQ topsides", "BearPQ topsides"),
+    ("PQAtlantis topsides", "PQBear topsides"),
+    ("Mad  Dog spar", "Unicorn spar"),
+    ("Mad_Dog_Moorings.pdf", "Unicorn_Moorings.pdf"),
+    ("MadDog\tspar", "Unicorn\tspar"),
+    ("Mad\nDog", "Unicorn"),
+    ("On Atlantis and Mars.", "On Bear and Falcon."),
+])
+def test_alias_mode_masks_file_name_shaped_strings(alias_policy, text, masked):
+    assert alias_policy.mask(text) == masked
+
+
+@pytest.mark.parametrize("text", ["Marshall Islands", "marshes", "Atlantisian", "Bearing wear"])
+def test_names_inside_words_are_left_alone(alias_policy, text):
+    assert alias_policy.mask(text) == text
+
+
+@pytest.mark.parametrize("text", ["Atlantis_OandM_Rev3.pdf", "MAD_DOG_moorings.txt", "AtlantisPQ"])
+def test_alias_mode_refuses_hidden_names_in_arguments(alias_policy, text):
+    with pytest.raises(PlatformUnavailable):
+        alias_policy.check_text(text)
+
+
+def test_alias_mode_resolves_aliases_only(alias_policy):
+    assert alias_policy.resolve("unicorn") == "Mad Dog"
+    with pytest.raises(PlatformUnavailable):
+        alias_policy.resolve("Mad  Dog")
+
+
+def test_actual_mode_masks_aliases_in_file_names():
+    policy = AccessPolicy("actual", ALIASES)
+    assert policy.mask("Bear_OandM_Rev3.pdf") == "Atlantis_OandM_Rev3.pdf"
+    assert policy.mask("Bearing wear") == "Bearing wear"
+
+
+def test_matcher_prefers_longest_name():
+    matcher = NameMatcher({"Mad Dog": "Unicorn", "Mad Dog 2": "Griffin"}, ignore_case=True)
+    assert matcher.replace("mad_dog_2 and Mad Dog") == "Griffin and Unicorn"
+
+
+def test_mask_leaves_cursors_alone(alias_policy):
+    text = 'Atlantis roll (more results: cursor=AtlantisMars_x-1)\n{"next_cursor": "MarsAtlantis"}'
+    assert alias_policy.mask(text) == 'Bear roll (more results: cursor=AtlantisMars_x-1)\n{"next_cursor": "MarsAtlantis"}'
+
+
+def test_enforce_checks_only_platform_and_text_arguments(alias_policy):
+    params = {"platform": "Unicorn", "cursor": "AtlantisPQ", "output": "Mars.json", "mode": "vector"}
+    assert enforce(params, policy=alias_policy) == dict(params, platform="Mad Dog")
+    with pytest.raises(PlatformUnavailable):
+        enforce({"query": "Atlantis riser"}, policy=alias_policy)
+    with pytest.raises(PlatformUnavailable):
+        enforce({"sensors": ["GPS", "Mars MRU"]}, policy=alias_policy)
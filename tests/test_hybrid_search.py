@@ -0,0 +1,33 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# rrf_fuse is pure Python; the module only needs pyarrow for type hints at import time
+sys.modules.setdefault("pyarrow", SimpleNamespace(Table=object))
+
+from hybrid_search import rrf_fuse  # noqa: E402
+
+
+def ranked(*ids, column="_distance"):
+    return [{"_rowid": i, column: float(rank)} for rank, i in enumerate(ids, 1)]
+
+
+def test_rows_found_by_both_lists_rank_first():
+    fused = rrf_fuse([ranked(1, 2, 3), ranked(3, 4, 1, column="_score")], limit=10, k=60)
+    assert [r["_rowid"] for r in fused] == [1, 3, 2, 4]
+    assert fused[0]["_rrf_score"] == pytest.approx(1 / 61 + 1 / 63)
+    assert all(a["_rrf_score"] >= b["_rrf_score"] for a, b in zip(fused, fused[1:]))
+
+
+def test_rows_keep_the_columns_of_the_first_list():
+    fused = rrf_fuse([ranked(1), ranked(1, column="_score")], limit=1)
+    assert "_distance" in fused[0] and "_score" not in fused[0]
+
+
+def test_limit_and_empty_lists():
+    assert [r["_rowid"] for r in rrf_fuse([ranked(5, 6, 7), []], limit=2)] == [5, 6]
+    assert rrf_fuse([[], []], limit=5) == []
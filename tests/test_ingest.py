@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ingest import chunk_text  # noqa: E402
+
+
+def words(n):
+    return " ".join(f"w{i:03d}" for i in range(n))  # 5 characters per word with its space
+
+
+def test_short_text_is_one_chunk():
+    assert chunk_text(words(10), size=100, overlap=20) == [words(10)]
+    assert chunk_text("", size=100, overlap=20) == []
+    assert chunk_text("   \n ", size=100, overlap=20) == []
+
+
+def test_exact_fill_has_no_tail_only_chunk():
+    chunks = chunk_text(words(20), size=100, overlap=20)
+    assert chunks == [words(20)]
+
+
+@pytest.mark.parametrize("n", [21, 35, 57, 100])
+def test_chunks_overlap_and_cover_the_text(n):
+    chunks = chunk_text(words(n), size=100, overlap=20)
+    assert len(chunks) > 1
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert len(previous.split()) <= 20
+        tail = previous.split()[-4:]
+        assert chunk.split()[:4] == tail  # 4 words = the 20-character overlap
+        assert len(chunk.split()) > 4    # every chunk adds new words
+    covered = []
+    for chunk in chunks:
+        for word in chunk.split():
+            if word not in covered:
+                covered.append(word)
+    assert " ".join(covered) == words(n)
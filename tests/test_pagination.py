@@ -0,0 +1,71 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pagination  # noqa: E402
+from pagination import decode_cursor, encode_cursor, search_page  # noqa: E402
+from result_cache import ResultCache  # noqa: E402
+
+ROWS = [{"channame": f"Channel {i}", "_distance": i / 10} for i in range(7)]
+
+
+@pytest.fixture(autouse=True)
+def fresh_results(monkeypatch):
+    monkeypatch.setattr(pagination, "RESULTS", ResultCache())
+
+
+class Fetch:
+    """fetch(n) over ROWS, counting the searches run"""
+
+    def __init__(self, rows=ROWS):
+        self.rows = rows
+        self.calls = []
+
+    def __call__(self, n):
+        self.calls.append(n)
+        return self.rows[:n]
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("descriptions", "abc123", 4, 10)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == {"table": "descriptions", "key": "abc123", "version": 4, "offset": 10}
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "e30", encode_cursor("t", "k", 1, 0)[:-3] + "!!!"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+def test_pages_until_exhausted():
+    table, fetch = SimpleNamespace(name="descriptions", version=1), Fetch()
+    seen, cursor = [], ""
+    while True:
+        page, cursor = search_page(table, ("roll rate", ""), fetch, 3, cursor)
+        seen += page
+        if not cursor:
+            break
+    assert seen == ROWS
+    assert fetch.calls == [3 * pagination.PAGE_PREFETCH]  # later pages come from the cache
+
+
+def test_exact_fill_ends_without_cursor():
+    table = SimpleNamespace(name="descriptions", version=1)
+    page, cursor = search_page(table, ("roll rate",), Fetch(ROWS[:3]), 3)
+    assert page == ROWS[:3] and cursor == ""
+
+
+def test_cursor_rejected_for_other_query_or_version():
+    table = SimpleNamespace(name="descriptions", version=1)
+    _, cursor = search_page(table, ("roll rate", ""), Fetch(), 2)
+    # The query is compared case- and whitespace-insensitively
+    assert search_page(table, ("Roll  Rate", ""), Fetch(), 2, cursor)[0] == ROWS[2:4]
+    with pytest.raises(ValueError, match="different search"):
+        search_page(table, ("pitch", ""), Fetch(), 2, cursor)
+    with pytest.raises(ValueError, match="changed since"):
+        search_page(SimpleNamespace(name="descriptions", version=2), ("roll rate", ""), Fetch(), 2, cursor)
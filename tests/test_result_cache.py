@@ -0,0 +1,71 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import result_cache  # noqa: E402
+from result_cache import ResultCache  # noqa: E402
+
+
+def rows(n):
+    return [{"i": i} for i in range(n)]
+
+
+def test_serves_smaller_requests_and_refetches_larger():
+    cache = ResultCache()
+    cache.put("t", 1, "k", rows(5), False)
+    assert cache.get("t", 1, "k", 5) == (rows(5), False)
+    assert cache.get("t", 1, "k", 6) is None
+    cache.put("t", 1, "j", rows(2), True)
+    assert cache.get("t", 1, "j", 10) == (rows(2), True)  # exhausted: nothing more to fetch
+
+
+def test_lru_eviction_by_entries():
+    cache = ResultCache(max_entries=2)
+    cache.put("t", 1, "a", rows(1), False)
+    cache.put("t", 1, "b", rows(1), False)
+    assert cache.get("t", 1, "a", 1) is not None  # a is now the most recent
+    cache.put("t", 1, "c", rows(1), False)
+    assert cache.get("t", 1, "b", 1) is None
+    assert cache.get("t", 1, "a", 1) is not None and cache.get("t", 1, "c", 1) is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_eviction_by_rows():
+    cache = ResultCache(max_rows=10)
+    cache.put("t", 1, "a", rows(6), False)
+    cache.put("t", 1, "b", rows(6), False)
+    assert cache.get("t", 1, "a", 1) is None
+    assert cache.stats()["rows"] == 6
+    cache.put("t", 1, "c", rows(11), False)  # larger than the whole cache: not stored
+    assert cache.get("t", 1, "c", 1) is None and cache.get("t", 1, "b", 1) is not None
+
+
+def test_entries_expire(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(result_cache.time, "monotonic", lambda: now[0])
+    cache = ResultCache(ttl=10)
+    cache.put("t", 1, "k", rows(3), False)
+    now[0] = 109.0
+    assert cache.get("t", 1, "k", 3) is not None
+    now[0] = 111.0
+    assert cache.get("t", 1, "k", 3) is None
+    assert cache.stats()["rows"] == 0
+
+
+def test_new_version_invalidates_older_entries():
+    cache = ResultCache()
+    cache.put("t", 1, "k", rows(3), False)
+    cache.put("u", 1, "k", rows(3), False)
+    assert cache.get("t", 2, "k", 3) is None
+    assert cache.get("t", 1, "k", 3) is None
+    assert cache.get("u", 1, "k", 3) is not None
+    cache.put("t", 1, "k", rows(3), False)  # a search that started on the old version
+    assert cache.get("t", 1, "k", 3) is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_size_zero_disables_cache():
+    cache = ResultCache(max_entries=0)
+    cache.put("t", 1, "k", rows(3), False)
+    assert cache.get("t", 1, "k", 3) is None
@@ -0,0 +1,135 @@
+"""
+ANN Index Build and Tuning for the channel_summary_vectordb tables
+
+Without a vector index every table.search(query_vector) is a brute-force flat scan.
+This module builds IVF-PQ / IVF-HNSW indexes with size-aware defaults and measures
+recall and latency of the ANN search against exact search so nprobes/refine_factor
+can be chosen with evidence.
+"""
+
+import math
+import time
+
+VECTOR_COLUMN = "vector"
+
+# Below this many rows an exact flat scan is already fast, so no index is built
+FLAT_SCAN_MAX_ROWS = 5_000
+
+# Index types accepted by `lancedb_cli.py index --type`
+INDEX_TYPES = {
+    "ivf_pq": "IVF_PQ",
+    "hnsw": "IVF_HNSW_SQ",
+}
+
+# Settings swept by the recall report
+REPORT_NPROBES = [5, 10, 20, 50]
+REPORT_REFINE_FACTORS = [0, 5, 10]
+
+
+def tune_search(search, nprobes: int = 0, refine_factor: int = 0):
+    """Apply ANN knobs to a vector search (0 = LanceDB default / no refinement)"""
+    if nprobes:
+        search = search.nprobes(nprobes)
+    if refine_factor:
+        search = search.refine_factor(refine_factor)
+    return search
+
+
+def indexed_columns(table) -> dict:
+    """Map of column name -> index type for every index on the table"""
+    columns = {}
+    for index in table.list_indices():
+        if isinstance(index, dict):
+            names, index_type = index.get("columns", []), index.get("index_type", "")
+        else:
+            names, index_type = index.columns, index.index_type
+        for name in names:
+            columns[name] = str(index_type)
+    return columns
+
+
+def default_index_params(num_rows: int, dim: int, index_type: str = "ivf_pq") -> dict:
+    """
+    Size-aware index parameters.
+
+    - num_partitions ~ sqrt(rows), so each IVF list holds about sqrt(rows) vectors
+    - num_sub_vectors = dim / 8 (8 dims per PQ code; 48 for 384-dim MiniLM vectors)
+    """
+    params = {
+        "index_type": INDEX_TYPES[index_type],
+        "num_partitions": max(1, min(4096, round(math.sqrt(num_rows)))),
+    }
+    if index_type == "ivf_pq":
+        params["num_sub_vectors"] = max(1, dim // 8)
+    return params
+
+
+def build_vector_index(table, index_type: str = "ivf_pq", rebuild: bool = False, force: bool = False) -> str:
+    """Build (or rebuild) the vector index on one table and describe what happened"""
+    num_rows = table.count_rows()
+
+    if not force and num_rows < FLAT_SCAN_MAX_ROWS:
+        return f"skipped: {num_rows} rows (flat scan is exact and fast below {FLAT_SCAN_MAX_ROWS} rows)"
+    if not rebuild and VECTOR_COLUMN in indexed_columns(table):
+        return "skipped: vector index already exists (use --rebuild)"
+
+    dim = table.schema.field(VECTOR_COLUMN).type.list_size
+    params = default_index_params(num_rows, dim, index_type)
+
+    start = time.perf_counter()
+    table.create_index(metric="L2", vector_column_name=VECTOR_COLUMN, replace=True, **params)
+    elapsed = time.perf_counter() - start
+
+    settings = ", ".join(f"{k}={v}" for k, v in params.items())
+    return f"built {settings} on {num_rows} rows in {elapsed:.1f}s"
+
+
+def _percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _timed_search(search, k: int):
+    start = time.perf_counter()
+    rows = search.select(["platform_name"]).with_row_id(True).limit(k).to_list()
+    return (time.perf_counter() - start) * 1000, {r["_rowid"] for r in rows}
+
+
+def recall_report(table, k: int = 10, samples: int = 50) -> str:
+    """
+    Recall@k and latency of ANN search vs exact search for a sweep of settings.
+
+    Query vectors are sampled from the table itself, so no embedding model is needed.
+    """
+    sample = table.to_lance().sample(min(samples, table.count_rows()), columns=[VECTOR_COLUMN])
+    queries = sample.column(VECTOR_COLUMN).to_pylist()
+    if not queries:
+        return "No rows to sample."
+
+    exact_ms, truth = [], []
+    for q in queries:
+        ms, ids = _timed_search(table.search(q).bypass_vector_index(), k)
+        exact_ms.append(ms)
+        truth.append(ids)
+
+    output = f"{'nprobes':>8} {'refine':>7} {'recall@' + str(k):>10} {'p50 ms':>8} {'p95 ms':>8}"
+    output += "\n" + "-" * 45
+    output += f"\n{'exact':>8} {'-':>7} {1.0:>10.3f} {_percentile(exact_ms, 50):>8.2f} {_percentile(exact_ms, 95):>8.2f}"
+
+    if VECTOR_COLUMN not in indexed_columns(table):
+        return output + "\n(no vector index: searches are exact flat scans)"
+
+    for nprobes in REPORT_NPROBES:
+        for refine_factor in REPORT_REFINE_FACTORS:
+            latencies, hits = [], 0
+            for q, expected in zip(queries, truth):
+                ms, ids = _timed_search(tune_search(table.search(q), nprobes, refine_factor), k)
+                latencies.append(ms)
+                hits += len(ids & expected)
+            recall = hits / max(1, sum(len(t) for t in truth))
+            output += (
+                f"\n{nprobes:>8} {refine_factor or '-':>7} {recall:>10.3f}"
+                f" {_percentile(latencies, 50):>8.2f} {_percentile(latencies, 95):>8.2f}"
+            )
+
+    return output